@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+bench_parsers.py - Offline benchmark parser product table
+- Jalankan semua parser terhadap fixtures/*.html (tanpa hit logammulia.com)
+- Report per parser x fixture: waktu per page (median), peak alokasi (tracemalloc),
+  dan kesamaan output dengan <fixture>.expected.json
+- Bandingkan dengan baseline.json: exit 1 jika output beda atau lebih lambat / boros
+
+Usage:
+    python bench/bench_parsers.py                    # bench + cek baseline
+    python bench/bench_parsers.py --update-baseline  # simpan hasil sebagai baseline baru
+    python bench/bench_parsers.py --repeat=50 --parser=lxml
+"""
+
+import os, sys, json, time, glob, statistics, tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from parsers import BACKENDS
+from product import products_json
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+REPEAT = 20
+TIME_TOLERANCE = 0.5     # Gagal jika > baseline + 50% ...
+TIME_NOISE_MS = 1.0      # ... dan selisihnya lebih dari 1 ms
+ALLOC_TOLERANCE = 0.25   # Gagal jika peak alokasi > baseline + 25%
+
+def load_parsers():
+    """Nama -> function. Entry point scraper + semua backend di parsers.BACKENDS"""
+    found = {}
+    try:
+        from scraper_ultrafast import parse_products
+        found["ultrafast.parse_products"] = parse_products
+    except ImportError as e:
+        print(f"⚠️ skip scraper_ultrafast: {e}")
+    try:
+        from scraper_ultralight import parse_products_minimal
+        found["ultralight.parse_products_minimal"] = parse_products_minimal
+    except ImportError as e:
+        print(f"⚠️ skip scraper_ultralight: {e}")
+    for name, fn in BACKENDS.items():
+        found[f"parsers.{name}"] = fn
+    return found
+
+def load_fixtures():
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        name = os.path.basename(path)[:-len('.html')]
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        expected_path = os.path.join(FIXTURES_DIR, f"{name}.expected.json")
+        expected = None
+        if os.path.exists(expected_path):
+            with open(expected_path, encoding='utf-8') as f:
+                expected = json.load(f)
+        fixtures[name] = (html, expected)
+    return fixtures
+
+def measure(fn, html, repeat):
+    """(median ms, peak alokasi KB, output json)"""
+    output = products_json(fn(html))  # Warm-up (import lxml/bs4, cache regex)
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), peak / 1024, output
+
+def run(parsers, fixtures, repeat):
+    results = {}
+    for pname, fn in parsers.items():
+        for fname, (html, expected) in fixtures.items():
+            try:
+                ms, peak_kb, output = measure(fn, html, repeat)
+                error = None
+            except Exception as e:
+                ms, peak_kb, output, error = None, None, None, str(e)
+            results[f"{pname}/{fname}"] = {
+                "ms": round(ms, 3) if ms is not None else None,
+                "peakKB": round(peak_kb, 1) if peak_kb is not None else None,
+                "products": len(output) if output is not None else None,
+                "equivalent": expected is None or output == expected,
+                "error": error,
+                "_output": output,
+            }
+    return results
+
+def check(results, baseline):
+    """List pesan kegagalan (kosong = lolos)"""
+    failures = []
+    outputs_by_fixture = {}
+    for key, r in results.items():
+        fixture = key.split('/', 1)[1]
+        if r["error"]:
+            failures.append(f"{key}: error {r['error']}")
+            continue
+        if not r["equivalent"]:
+            failures.append(f"{key}: output beda dengan expected")
+        outputs_by_fixture.setdefault(fixture, {})[key] = r["_output"]
+
+        base = baseline.get(key)
+        if not base:
+            continue
+        if r["ms"] > base["ms"] * (1 + TIME_TOLERANCE) and r["ms"] - base["ms"] > TIME_NOISE_MS:
+            failures.append(f"{key}: {r['ms']:.2f} ms vs baseline {base['ms']:.2f} ms")
+        if r["peakKB"] > base["peakKB"] * (1 + ALLOC_TOLERANCE):
+            failures.append(f"{key}: peak {r['peakKB']:.0f} KB vs baseline {base['peakKB']:.0f} KB")
+
+    # Semua parser harus menghasilkan output identik untuk fixture yang sama
+    for fixture, outputs in outputs_by_fixture.items():
+        values = list(outputs.values())
+        if any(v != values[0] for v in values[1:]):
+            failures.append(f"{fixture}: output antar parser tidak identik ({', '.join(outputs)})")
+    return failures
+
+def print_table(results, baseline):
+    print(f"\n{'parser/fixture':<52} {'ms':>8} {'base':>8} {'peak KB':>9} {'rows':>5}  eq")
+    print("-" * 90)
+    for key, r in results.items():
+        base = baseline.get(key, {}).get("ms")
+        ms = f"{r['ms']:.2f}" if r["ms"] is not None else "ERR"
+        base = f"{base:.2f}" if base is not None else "-"
+        peak = f"{r['peakKB']:.0f}" if r["peakKB"] is not None else "-"
+        eq = "ok" if r["equivalent"] and not r["error"] else "DIFF"
+        print(f"{key:<52} {ms:>8} {base:>8} {peak:>9} {str(r['products']):>5}  {eq}")
+
+def main():
+    repeat = REPEAT
+    only = None
+    update = "--update-baseline" in sys.argv
+    for arg in sys.argv:
+        if arg.startswith("--repeat="):
+            repeat = int(arg.split("=")[1])
+        elif arg.startswith("--parser="):
+            only = arg.split("=")[1]
+
+    parsers = load_parsers()
+    if only:
+        parsers = {k: v for k, v in parsers.items() if only in k}
+    fixtures = load_fixtures()
+    if not fixtures:
+        print("❌ Tidak ada fixture, jalankan bench/make_fixtures.py dulu")
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(f"{len(parsers)} parser x {len(fixtures)} fixture, repeat {repeat}")
+    results = run(parsers, fixtures, repeat)
+    print_table(results, baseline)
+
+    if update:
+        data = dict(baseline)
+        data.update({k: {"ms": r["ms"], "peakKB": r["peakKB"]} for k, r in results.items() if not r["error"]})
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        print(f"\n💾 Baseline disimpan: {BASELINE_FILE}")
+        return
+
+    failures = check(results, baseline)
+    if failures:
+        print(f"\n❌ {len(failures)} regression:")
+        for msg in failures:
+            print(f"  - {msg}")
+        sys.exit(1)
+    print("\n✅ Tidak ada regression")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+make_fixtures.py - Generate HTML fixtures gold page untuk bench_parsers.py
+- Struktur sama dengan halaman purchase/gold (.ct-body .ctr, .ctd.item-1/.item-2, span.no-stock)
+- Deterministik (seed tetap), ukuran ~ halaman asli (header/nav/script/footer)
+- Tiap fixture punya <name>.expected.json: products yang seharusnya keluar dari parser
+
+Halaman asli (hasil record, lihat README) bisa ditambahkan sebagai fixture:
+    python bench/make_fixtures.py --add=nama --from=path/ke/page.html
+
+Usage: python bench/make_fixtures.py
+"""
+
+import os, sys, json, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import parse_bs4
+from product import Product, products_json
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+GOLD_WEIGHTS = [0.5, 1, 2, 3, 5, 10, 25, 50, 100, 250, 500, 1000]
+GIFT_WEIGHTS = [0.5, 1, 2, 5]
+SILVER_WEIGHTS = [100, 250, 500]
+
+def format_weight(grams):
+    return f"{grams:g}"
+
+def format_price(rupiah):
+    return "Rp" + f"{rupiah:,}".replace(",", ".")
+
+def catalog(rng, silver=False):
+    """List (title, price, weight, is_gold)"""
+    rows = []
+    for grams in GOLD_WEIGHTS:
+        rows.append((f"Emas Batangan - {format_weight(grams)} gr", int(grams * rng.randint(1_480_000, 1_520_000) // 1000 * 1000), grams, True))
+    for grams in GIFT_WEIGHTS:
+        rows.append((f"Emas Batangan Gift Series - {format_weight(grams)} gr", int(grams * rng.randint(1_550_000, 1_600_000) // 1000 * 1000), grams, True))
+    if silver:
+        for grams in SILVER_WEIGHTS:
+            rows.append((f"Batangan Perak Murni - {format_weight(grams)} gr", grams * 23_000, grams, False))
+        rows.append(("Silver Coin Antam - 31.1 gram", 1_150_000, 31.1, False))
+    return rows
+
+def render_row(title, price, in_stock):
+    stock = '' if in_stock else '\n<span class="no-stock">Belum tersedia</span>'
+    button = ('<button class="btn btn-primary add-to-cart">Tambah ke Keranjang</button>' if in_stock
+              else '<button class="btn btn-disabled" disabled>Stok Habis</button>')
+    return f'''
+      <div class="ctr">
+        <div class="ctd item-1">
+          <img src="/assets/img/product/thumb.png" alt="" class="thumb">
+          <span class="ngc-text">{title}{stock}</span>
+        </div>
+        <div class="ctd item-2">{format_price(price)}<br><small>Harga(Belum termasuk pajak)</small></div>
+        <div class="ctd item-3"><input type="number" class="qty" value="0" min="0"></div>
+        <div class="ctd item-4">{button}</div>
+      </div>'''
+
+def render_table(rows_html):
+    return f'''
+    <div class="ct">
+      <div class="ct-head">
+        <div class="cth item-1">Produk</div><div class="cth item-2">Harga</div>
+        <div class="cth item-3">Jumlah</div><div class="cth item-4"></div>
+      </div>
+      <div class="ct-body">{rows_html}
+      </div>
+    </div>'''
+
+def render_page(rng, rows_html, sections=None):
+    """sections: list rows_html per tabel (.ct-body sendiri-sendiri), default satu tabel"""
+    nav = "\n".join(f'<li><a href="/id/page/{i}" class="nav-link">Menu item {i}</a></li>' for i in range(120))
+    script = "var config = " + json.dumps({f"key{i}": "x" * 40 for i in range(400)}) + ";"
+    tables = ''.join(render_table(section) for section in (sections or [rows_html]))
+    footer = "\n".join(f'<p class="footer-text">Informasi {i}: {"lorem ipsum " * rng.randint(5, 15)}</p>' for i in range(150))
+    return f'''<!DOCTYPE html>
+<html lang="id">
+<head>
+  <meta charset="utf-8">
+  <title>Logam Mulia - Purchase Gold</title>
+  <link rel="stylesheet" href="/assets/css/app.css">
+  <script>{script}</script>
+</head>
+<body>
+  <header><nav><ul class="nav">{nav}</ul></nav></header>
+  <main>
+    <div class="location-info">Lokasi: BELM - Bandung</div>{tables}
+  </main>
+  <footer>{footer}</footer>
+</body>
+</html>
+'''
+
+def expected_products(rows):
+    return [Product.from_row(title, format_price(price), in_stock)
+            for title, price, _, is_gold, in_stock in rows if is_gold]
+
+def build(name, rng, silver=False, stock_ratio=0.4, truncate=False, split=False):
+    rows = [(title, price, grams, is_gold, rng.random() < stock_ratio)
+            for title, price, grams, is_gold in catalog(rng, silver)]
+    if silver:
+        rng.shuffle(rows)
+
+    rows_html = ''.join(render_row(title, price, in_stock) for title, price, _, _, in_stock in rows)
+    sections = None
+    if split:
+        # Dua tabel (.ct-body) di satu halaman: batangan lalu gift series
+        gift = [r for r in rows if 'Gift' in r[0]]
+        bars = [r for r in rows if 'Gift' not in r[0]]
+        rows = bars + gift
+        sections = [''.join(render_row(title, price, in_stock) for title, price, _, _, in_stock in part)
+                    for part in (bars, gift)]
+    html = render_page(rng, rows_html, sections)
+
+    if truncate:
+        # Response terpotong: berhenti di tengah row ke-N (row itu belum punya judul)
+        keep = len(rows) // 2
+        cut = html.index('<div class="ctr">')
+        for _ in range(keep):
+            cut = html.index('<div class="ctr">', cut + 1)
+        html = html[:cut] + '<div class="ctr">\n        <div class="ctd item-1">\n          <img src="/ass'
+        rows = rows[:keep]
+
+    save(name, html, products_json(expected_products(rows)))
+
+def save(name, html, expected):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.html"), 'w', encoding='utf-8') as f:
+        f.write(html)
+    with open(os.path.join(FIXTURES_DIR, f"{name}.expected.json"), 'w', encoding='utf-8') as f:
+        json.dump(expected, f, indent=1, ensure_ascii=False)
+    print(f"  {name}: {len(html) // 1024} KB, {len(expected)} products")
+
+def add_recorded(name, path):
+    """Halaman asli: expected diambil dari parser bs4 (referensi), cek manual sebelum commit"""
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    save(name, html, products_json(parse_bs4(html)))
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    name = path = None
+    for arg in sys.argv:
+        if arg.startswith("--add="):
+            name = arg.split("=", 1)[1]
+        elif arg.startswith("--from="):
+            path = arg.split("=", 1)[1]
+    if name and path:
+        add_recorded(name, path)
+        return
+
+    rng = random.Random(20260101)
+    build("normal", rng)
+    build("all_out_of_stock", rng, stock_ratio=0)
+    build("silver_mixed", rng, silver=True)
+    build("truncated", rng, truncate=True)
+    build("split_sections", rng, split=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+browser_session.py - Persistent warm Chromium untuk scheduler
+- Satu browser hidup lintas run (tidak cold launch tiap cycle)
+- Health check sebelum tiap run (crash / hang / PSS threshold)
+- Relaunch hanya jika perlu
+"""
+
+import sys, os, time
+from datetime import datetime
+
+# Relaunch jika PSS process tree Chromium melewati batas ini (USS / RSS jika smaps tidak terbaca)
+MAX_BROWSER_PSS_MB = int(os.environ.get("MAX_BROWSER_PSS_MB", "500"))
+# Batas waktu JS ping untuk deteksi browser hang
+HEALTH_CHECK_TIMEOUT = 5
+
+def log(msg):
+    ts = datetime.now().strftime("%d/%m/%Y, %H.%M.%S")
+    print(f"[{ts}] {msg}", file=sys.stderr)
+
+def browser_pid(page):
+    """PID proses utama Chromium dari ChromiumPage (None jika tidak tersedia)"""
+    for attr in ('process_id', 'pid'):
+        pid = getattr(page, attr, None)
+        if pid:
+            return pid
+    browser = getattr(page, 'browser', None)
+    return getattr(browser, 'process_id', None) if browser else None
+
+def process_tree_stats(pid, full=False):
+    """
+    {"rssMB", "processes", "renderers"} untuk proses + semua child.
+    full=True: + "pssMB" (Linux, None di OS lain) dan "ussMB" dari smaps (lebih mahal).
+    RSS dijumlah per proses menghitung shared page berkali-kali; PSS tidak.
+    None jika psutil tidak ada / pid hilang
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+    except psutil.Error:
+        return None
+    total = count = renderers = 0
+    uss = pss = 0
+    for p in procs:
+        try:
+            info = None
+            if full:
+                try:
+                    info = p.memory_full_info()
+                    uss += getattr(info, 'uss', 0)
+                    pss += getattr(info, 'pss', 0)
+                except psutil.AccessDenied:
+                    pass
+            info = info or p.memory_info()
+            total += info.rss
+            count += 1
+            if '--type=renderer' in p.cmdline():
+                renderers += 1
+        except psutil.Error:
+            continue
+    stats = {"rssMB": total / 1024 / 1024, "processes": count, "renderers": renderers}
+    if full:
+        stats["pssMB"] = pss / 1024 / 1024 if pss else None
+        stats["ussMB"] = uss / 1024 / 1024 if uss else None
+    return stats
+
+def tree_memory_mb(stats):
+    """(MB, metric) dari process_tree_stats(full=True): PSS, lalu USS, lalu RSS jika smaps tidak terbaca"""
+    if stats.get("pssMB"):
+        return stats["pssMB"], "pss"
+    if stats.get("ussMB"):
+        return stats["ussMB"], "uss"
+    return stats["rssMB"], "rss"
+
+class BrowserSession:
+    """
+    Long-lived ChromiumPage milik scheduler.
+
+    Usage:
+        session = BrowserSession(create_browser_options)
+        page = session.ensure()   # sebelum tiap run
+        ...
+        session.quit()            # saat shutdown
+    """
+
+    def __init__(self, options_factory, setup=None, max_pss_mb=MAX_BROWSER_PSS_MB):
+        self.options_factory = options_factory
+        self.setup = setup
+        self.max_pss_mb = max_pss_mb
+        self.page = None
+        # State per browser (mis. spec form change-location), reset saat relaunch
+        self.state = {}
+        self.launches = 0
+        self.last_restart_reason = None
+
+    def launch(self):
+        from DrissionPage import ChromiumPage
+        start = time.time()
+        self.page = ChromiumPage(self.options_factory())
+        self.state = {}
+        if self.setup:
+            self.setup(self.page)
+        self.launches += 1
+        log(f"🌐 Browser launched (#{self.launches}) in {time.time() - start:.1f}s")
+        return self.page
+
+    def health_problem(self):
+        """Return alasan restart, atau None jika browser sehat"""
+        if self.page is None:
+            return "not started"
+        try:
+            if self.page.run_js('return 1;', timeout=HEALTH_CHECK_TIMEOUT) != 1:
+                return "hang (no JS response)"
+        except Exception as e:
+            return f"crash ({e.__class__.__name__})"
+
+        pid = browser_pid(self.page)
+        if pid and self.max_pss_mb:
+            stats = process_tree_stats(pid, full=True)
+            if stats is None:
+                return "crash (process gone)"
+            memory, metric = tree_memory_mb(stats)
+            if memory > self.max_pss_mb:
+                return f"{metric} {memory:.0f}MB > {self.max_pss_mb}MB"
+        return None
+
+    def ensure(self):
+        """Health check, relaunch hanya jika crash / hang / PSS terlalu besar"""
+        problem = self.health_problem()
+        if problem is None:
+            return self.page
+        if self.page is not None:
+            log(f"♻️ Restart browser: {problem}")
+        self.last_restart_reason = problem
+        self.quit()
+        return self.launch()
+
+    def quit(self):
+        if self.page is not None:
+            try:
+                self.page.quit()
+            except Exception:
+                pass
+            self.page = None
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+chrome_process.py - Chromium di process group sendiri + watchdog
+- launch(): start Chromium sendiri (start_new_session, Linux) lalu DrissionPage
+  connect lewat debugging port; PID/PGID dicatat di chrome_pids.json
+- BrowserProcess.kill(): kill satu process group (SIGTERM -> SIGKILL),
+  bukan semua chrome.exe di mesin
+- Watchdog: deadline per lokasi, kill hanya tree browser yang hang
+- reap_orphans(): saat startup, bersihkan Chromium sisa crash run sebelumnya
+
+Usage: python chrome_process.py --reap
+"""
+
+import os, sys, json, time, shutil, atexit, signal, socket, threading, subprocess
+from datetime import datetime
+
+PID_FILE = os.path.join(os.path.dirname(__file__), 'chrome_pids.json')
+LAUNCH_TIMEOUT = 15     # Tunggu debugging port siap
+KILL_GRACE = 3          # SIGTERM -> SIGKILL
+BROWSER_NAMES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+IS_POSIX = os.name == 'posix'
+_registry_lock = threading.Lock()
+_live = set()   # BrowserProcess milik proses ini (session sendiri -> tidak ikut Ctrl-C)
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", file=sys.stderr)
+
+# =====================================================
+# PID registry (chrome_pids.json)
+# =====================================================
+def _process_started(pid):
+    """create_time proses (untuk deteksi PID reuse), None jika tidak ada / tanpa psutil"""
+    try:
+        import psutil
+        return round(psutil.Process(pid).create_time(), 2)
+    except Exception:
+        return None
+
+def load_registry():
+    try:
+        with open(PID_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_registry(data):
+    tmp = f"{PID_FILE}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, PID_FILE)
+
+def register(browser):
+    with _registry_lock:
+        data = load_registry()
+        data[str(browser.pid)] = {
+            "pgid": browser.pgid,
+            "port": browser.port,
+            "profile": browser.profile_dir,
+            "leaderStarted": _process_started(browser.pid),
+            "owner": os.getpid(),
+            "ownerStarted": _process_started(os.getpid()),
+            "started": datetime.now().isoformat(timespec='seconds'),
+        }
+        _save_registry(data)
+
+def unregister(pid):
+    with _registry_lock:
+        data = load_registry()
+        if data.pop(str(pid), None) is not None:
+            _save_registry(data)
+
+def _owner_alive(entry):
+    owner = entry.get("owner")
+    if not owner:
+        return False
+    try:
+        os.kill(owner, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    except OSError:
+        return False
+    started = entry.get("ownerStarted")
+    # PID owner dipakai proses lain -> owner asli sudah mati
+    return started is None or _process_started(owner) in (None, started)
+
+def _leader_matches(pid, entry):
+    """
+    True jika pid masih leader Chromium dari entry ini: create_time sama, cmdline
+    memakai profile entry, dan (Linux) masih leader pgid-nya. Setelah reboot / PID
+    reuse pid/pgid bisa milik proses lain -> False (jangan di-kill)
+    """
+    started, profile = entry.get("leaderStarted"), entry.get("profile")
+    if started is None or not profile:
+        return False
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        if round(proc.create_time(), 2) != started:
+            return False
+        if f'--user-data-dir={profile}' not in proc.cmdline():
+            return False
+        if IS_POSIX and entry.get("pgid") and os.getpgid(pid) != entry["pgid"]:
+            return False
+    except Exception:
+        return False
+    return True
+
+# =====================================================
+# Kill
+# =====================================================
+def kill_group(pgid, grace=KILL_GRACE, proc=None):
+    """SIGTERM ke process group, SIGKILL jika masih hidup setelah grace (proc: leader, di-reap)"""
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    deadline = time.time() + grace
+    while time.time() < deadline:
+        if proc is not None:
+            proc.poll()  # Leader zombie tetap dihitung anggota group sampai di-reap
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.1)
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    return True
+
+def kill_tree(pid, grace=KILL_GRACE):
+    """Kill pid + semua child (Windows / browser yang bukan group sendiri)"""
+    if not IS_POSIX:
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True, timeout=10)
+        return True
+    try:
+        import psutil
+    except ImportError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+        return True
+    try:
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return True
+    for proc in procs:
+        try:
+            proc.terminate()
+        except psutil.Error:
+            pass
+    _, alive = psutil.wait_procs(procs, timeout=grace)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    return True
+
+class BrowserProcess:
+    """Satu Chromium yang di-launch sendiri (pid == pgid di Linux)"""
+
+    def __init__(self, proc, port, profile_dir):
+        self.proc = proc
+        self.pid = proc.pid
+        self.pgid = os.getpgid(proc.pid) if IS_POSIX else None
+        self.port = port
+        self.profile_dir = profile_dir
+        self.killed = None
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self, reason="quit", grace=KILL_GRACE):
+        """Kill seluruh process group browser ini saja"""
+        if self.killed is None:
+            self.killed = reason
+        try:
+            if IS_POSIX and self.pgid and self.pgid != os.getpgid(0):
+                kill_group(self.pgid, grace, self.proc)
+            else:
+                kill_tree(self.pid, grace)
+            self.proc.wait(timeout=grace)
+        except Exception:
+            pass
+        _live.discard(self)
+        unregister(self.pid)
+
+@atexit.register
+def _kill_live():
+    for browser in list(_live):
+        browser.kill("exit", grace=1)
+
+# =====================================================
+# Launch
+# =====================================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def find_browser_path(opts):
+    path = getattr(opts, 'browser_path', None)
+    if path and os.path.isfile(path):
+        return path
+    if path:
+        found = shutil.which(path)
+        if found:
+            return found
+    for name in BROWSER_NAMES:
+        found = shutil.which(name)
+        if found:
+            return found
+    return None
+
+def wait_debugger(port, proc, timeout=LAUNCH_TIMEOUT):
+    """True jika debugging port menerima koneksi sebelum timeout"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def launch(opts, profile_dir):
+    """
+    Start Chromium sesuai ChromiumOptions di process group baru, catat PID,
+    lalu arahkan opts ke debugging port-nya (ChromiumPage(opts) tinggal connect).
+    Returns BrowserProcess, atau None jika browser tidak ditemukan
+    (caller fallback ke launch bawaan DrissionPage).
+    """
+    path = find_browser_path(opts)
+    if not path:
+        return None
+
+    port = free_port()
+    args = [a for a in (getattr(opts, 'arguments', None) or [])
+            if not a.startswith(('--remote-debugging-port', '--user-data-dir'))]
+    if not any(a.startswith('--remote-allow-origins') for a in args):
+        args.append('--remote-allow-origins=*')
+    cmd = [path, f'--remote-debugging-port={port}', f'--user-data-dir={profile_dir}', *args, 'about:blank']
+
+    kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "stdin": subprocess.DEVNULL}
+    if IS_POSIX:
+        kwargs["start_new_session"] = True   # pgid = pid, terpisah dari scheduler
+    else:
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    proc = subprocess.Popen(cmd, **kwargs)
+    browser = BrowserProcess(proc, port, profile_dir)
+    _live.add(browser)
+    register(browser)
+
+    if not wait_debugger(port, proc):
+        browser.kill("launch timeout")
+        raise TimeoutError(f"Chromium tidak membuka debugging port {port} dalam {LAUNCH_TIMEOUT}s")
+
+    try:
+        opts.auto_port(False)
+    except Exception:
+        pass
+    opts.set_address(f'127.0.0.1:{port}')
+    return browser
+
+# =====================================================
+# Orphan sweep
+# =====================================================
+def reap_orphans(profile_dir=None):
+    """
+    Kill Chromium yang owner-nya (scheduler/scraper) sudah mati: entry registry
+    dengan owner mati (hanya jika leader terverifikasi, lihat _leader_matches),
+    plus proses Chromium yatim (ppid 1) yang memakai profile_dir.
+    Returns jumlah group/proses yang di-kill.
+    """
+    killed = 0
+    with _registry_lock:
+        data = load_registry()
+        for pid, entry in list(data.items()):
+            if _owner_alive(entry):
+                continue
+            data.pop(pid)
+            if not _leader_matches(int(pid), entry):
+                # Browser sudah mati, atau pid/pgid sekarang milik proses lain: entry dibuang saja
+                continue
+            pgid = entry.get("pgid")
+            log(f"🧹 Reap orphan Chromium {pid} (owner {entry.get('owner')} mati)")
+            if IS_POSIX and pgid:
+                killed += kill_group(pgid)
+            else:
+                killed += kill_tree(int(pid))
+        _save_registry(data)
+
+    if profile_dir and IS_POSIX:
+        try:
+            import psutil
+        except ImportError:
+            return killed
+        marker = f'--user-data-dir={profile_dir}'
+        for proc in psutil.process_iter(['pid', 'ppid', 'cmdline']):
+            cmdline = proc.info.get('cmdline') or []
+            if proc.info.get('ppid') == 1 and marker in cmdline:
+                log(f"🧹 Reap orphan Chromium {proc.pid} ({profile_dir})")
+                kill_tree(proc.pid)
+                killed += 1
+    return killed
+
+# =====================================================
+# Watchdog
+# =====================================================
+class Watchdog(threading.Thread):
+    """
+    Deadline per lokasi. Jika lewat, kill process group browser yang sedang
+    dipakai (call DrissionPage di thread utama langsung gagal, tidak hang).
+
+    Usage:
+        watchdog = Watchdog().start()
+        watchdog.arm(browser, 60, "201")
+        ... scrape ...
+        expired = watchdog.disarm()
+    """
+
+    def __init__(self, poll=0.5):
+        super().__init__(daemon=True)
+        self.poll = poll
+        self.lock = threading.Lock()
+        self.browser = None
+        self.deadline = None
+        self.label = None
+        self.expired = None
+        self._halt = threading.Event()
+
+    def start(self):
+        super().start()
+        return self
+
+    def arm(self, browser, seconds, label=None):
+        with self.lock:
+            self.browser = browser
+            self.deadline = time.time() + seconds
+            self.label = label
+            self.expired = None
+
+    def disarm(self):
+        """Returns label jika deadline sempat lewat (browser sudah di-kill)"""
+        with self.lock:
+            expired = self.expired
+            self.browser = self.deadline = None
+            return expired
+
+    def run(self):
+        while not self._halt.wait(self.poll):
+            with self.lock:
+                if self.deadline is None or time.time() < self.deadline:
+                    continue
+                browser, label = self.browser, self.label
+                self.expired = label or True
+                self.deadline = None
+            log(f"⏰ Watchdog: deadline lewat ({label}), kill browser pid {getattr(browser, 'pid', None)}")
+            if browser is not None:
+                browser.kill("deadline")
+
+    def stop(self):
+        self._halt.set()
+
+def main():
+    if "--reap" in sys.argv:
+        profile = os.path.join(os.path.dirname(__file__), 'browser_profile')
+        print(f"{reap_orphans(profile)} orphan di-kill")
+        return
+    for pid, entry in load_registry().items():
+        status = "owner hidup" if _owner_alive(entry) else "ORPHAN"
+        print(f"pid {pid} pgid {entry.get('pgid')} port {entry.get('port')} owner {entry.get('owner')} ({status})")
+
+if __name__ == "__main__":
+    main()
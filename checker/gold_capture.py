@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+gold_capture.py - Ambil HTML gold page dari network layer
+- Tangkap response body dokumen GOLD_URL lewat CDP (Network.getResponseBody)
+  begitu loadingFinished, tanpa menunggu DOM / subresource
+- Caller parse body langsung; cukup row -> Page.stopLoading, selain itu
+  page tetap loading dan caller lanjut ke jalur live DOM
+"""
+
+import base64, threading
+
+class GoldCapture:
+    """
+    Usage:
+        capture = GoldCapture(tab, GOLD_URL).start()
+        tab.get(GOLD_URL)            # load_mode none: return sebelum DOM siap
+        html = capture.wait(10)      # None jika gagal / timeout
+        capture.stop()
+    """
+
+    EVENTS = ('Network.requestWillBeSent', 'Network.loadingFinished', 'Network.loadingFailed')
+
+    def __init__(self, tab, url):
+        self.tab = tab
+        self.url = url.split('#')[0]
+        self.driver = getattr(tab, 'driver', None) or getattr(tab, '_driver', None)
+        self.request_id = None
+        self.status = None      # "finished" / "failed"
+        self.done = threading.Event()
+        self.previous = {}
+        self.active = False
+
+    def start(self):
+        handlers = getattr(self.driver, 'event_handlers', None)
+        if self.driver is None or handlers is None:
+            return self
+        try:
+            self.tab.run_cdp('Network.enable')
+        except Exception:
+            return self
+        for event in self.EVENTS:
+            self.previous[event] = handlers.get(event)
+            self.driver.set_callback(event, self._handler(event))
+        self.active = True
+        return self
+
+    def stop(self):
+        if not self.active:
+            return
+        for event in self.EVENTS:
+            try:
+                self.driver.set_callback(event, self.previous.get(event))
+            except Exception:
+                pass
+        self.active = False
+
+    def _handler(self, event):
+        previous = self.previous.get(event)
+
+        def handler(params=None, **kwargs):
+            params = params if isinstance(params, dict) else kwargs
+            try:
+                self._on_event(event, params)
+            except Exception:
+                pass
+            if previous:
+                previous(**params)
+        return handler
+
+    def _on_event(self, event, p):
+        if event == 'Network.requestWillBeSent':
+            # Dokumen pertama ke GOLD_URL; redirect memakai requestId yang sama
+            if self.request_id is None and p.get('type') == 'Document' \
+                    and p.get('request', {}).get('url', '').startswith(self.url):
+                self.request_id = p['requestId']
+        elif p.get('requestId') == self.request_id and self.request_id is not None:
+            self.status = "finished" if event == 'Network.loadingFinished' else "failed"
+            self.done.set()
+
+    def wait(self, timeout):
+        """HTML dokumen (str) setelah loadingFinished, None jika gagal / timeout / CDP tidak tersedia"""
+        if not self.active or not self.done.wait(timeout) or self.status != "finished":
+            return None
+        try:
+            resp = self.tab.run_cdp('Network.getResponseBody', requestId=self.request_id)
+        except Exception:
+            return None
+        body = resp.get('body') or ''
+        if resp.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        return body
+
+def stop_loading(tab):
+    """Hentikan subresource yang masih jalan (script, XHR, dll)"""
+    try:
+        tab.stop_loading()
+    except Exception:
+        try:
+            tab.run_cdp('Page.stopLoading')
+        except Exception:
+            pass
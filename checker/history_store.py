@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+history_store.py - Local stock history (SQLite, WAL mode)
+- Append tiap hasil scrape: 1 row per scrape + 1 row per product
+- Index (location_id, ts) dan (location_id, grams, ts) -> query range cepat
+- Retention: raw observation > RAW_RETENTION_DAYS di-compact jadi span
+  (run hasStock/harga yang sama), span > SPAN_RETENTION_DAYS dibuang
+
+Usage: python history_store.py --location=201 --gram=10 [--days=30]
+"""
+
+import os, sys, time, sqlite3
+
+DB_FILE = os.environ.get("HISTORY_DB", os.path.join(os.path.dirname(__file__), 'stock_history.db'))
+
+RAW_RETENTION_DAYS = int(os.environ.get("HISTORY_RAW_DAYS", "7"))
+SPAN_RETENTION_DAYS = int(os.environ.get("HISTORY_SPAN_DAYS", "365"))
+COMPACT_EVERY = 60 * 60     # maybe_compact() paling sering tiap 1 jam
+MAX_GAP = 30 * 60           # Observasi berjarak > 30 menit tidak digabung jadi satu window
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    location_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    source TEXT,
+    total INTEGER,
+    available INTEGER,
+    elapsed REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scrapes_loc_ts ON scrapes (location_id, ts);
+
+CREATE TABLE IF NOT EXISTS observations (
+    location_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    grams REAL,
+    price INTEGER,
+    has_stock INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_obs_loc_ts ON observations (location_id, ts);
+CREATE INDEX IF NOT EXISTS idx_obs_loc_grams_ts ON observations (location_id, grams, ts);
+
+CREATE TABLE IF NOT EXISTS spans (
+    location_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    grams REAL,
+    price INTEGER,
+    has_stock INTEGER NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    samples INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spans_loc_grams_ts ON spans (location_id, grams, start_ts);
+
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+'''
+
+def merge_windows(windows, max_gap=MAX_GAP):
+    """[(start, end)] -> window yang overlap / berjarak <= max_gap digabung"""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(w) for w in merged]
+
+class HistoryStore:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        # auto_vacuum harus di-set sebelum tabel dibuat (no-op untuk db lama)
+        self.db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # =====================================================
+    # Write
+    # =====================================================
+    def record(self, result, ts=None):
+        """Append satu hasil scrape (sukses / error)"""
+        location_id = str(result.get("locationId") or result.get("location") or "")
+        if not location_id:
+            return
+        ts = int(ts or time.time())
+        products = result.get("allProducts") or []
+
+        with self.db:
+            self.db.execute("BEGIN")
+            cur = self.db.execute(
+                "INSERT INTO scrapes (location_id, ts, source, total, available, elapsed, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (location_id, ts, result.get("source"), len(products),
+                 len(result.get("availableProducts") or []),
+                 result.get("elapsedSeconds"), result.get("error"))
+            )
+            if products and not result.get("error"):
+                self.db.executemany(
+                    "INSERT INTO observations (location_id, ts, key, grams, price, has_stock) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(location_id, ts, p.key, p.grams, p.price, int(p.has_stock)) for p in products]
+                )
+            return cur.lastrowid
+
+    # =====================================================
+    # Query
+    # =====================================================
+    def in_stock_windows(self, location_id, grams, since=None, until=None, max_gap=MAX_GAP):
+        """
+        Kapan product dengan berat `grams` tersedia di lokasi: [(start_ts, end_ts)].
+        Gabungan span (data lama hasil compact) + raw observation.
+        """
+        until = int(until or time.time())
+        since = int(since or 0)
+        location_id = str(location_id)
+
+        windows = list(self.db.execute(
+            "SELECT start_ts, end_ts FROM spans "
+            "WHERE location_id = ? AND grams = ? AND has_stock = 1 AND start_ts <= ? AND end_ts >= ?",
+            (location_id, grams, until, since)
+        ))
+
+        # Raw: per scrape, tersedia jika salah satu product dengan berat itu tersedia
+        start = last = None
+        for ts, in_stock in self.db.execute(
+            "SELECT ts, MAX(has_stock) FROM observations "
+            "WHERE location_id = ? AND grams = ? AND ts BETWEEN ? AND ? GROUP BY ts ORDER BY ts",
+            (location_id, grams, since, until)
+        ):
+            if in_stock:
+                if start is None or ts - last > max_gap:
+                    if start is not None:
+                        windows.append((start, last))
+                    start = ts
+                last = ts
+            elif start is not None:
+                windows.append((start, last))
+                start = None
+        if start is not None:
+            windows.append((start, last))
+
+        return [(max(s, since), min(e, until)) for s, e in merge_windows(windows, max_gap)]
+
+    def last_in_stock(self, location_id, grams):
+        """Timestamp terakhir product `grams` terlihat tersedia (None jika belum pernah)"""
+        row = self.db.execute(
+            "SELECT MAX(ts) FROM observations WHERE location_id = ? AND grams = ? AND has_stock = 1",
+            (str(location_id), grams)
+        ).fetchone()
+        if row and row[0]:
+            return row[0]
+        row = self.db.execute(
+            "SELECT MAX(end_ts) FROM spans WHERE location_id = ? AND grams = ? AND has_stock = 1",
+            (str(location_id), grams)
+        ).fetchone()
+        return row[0] if row else None
+
+    def scrapes(self, location_id, since=None, until=None):
+        """Riwayat scrape lokasi: [(ts, source, total, available, elapsed, error)]"""
+        return list(self.db.execute(
+            "SELECT ts, source, total, available, elapsed, error FROM scrapes "
+            "WHERE location_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (str(location_id), int(since or 0), int(until or time.time()))
+        ))
+
+    # =====================================================
+    # Retention / compaction
+    # =====================================================
+    def compact(self, now=None):
+        """Raw observation lama -> span, buang data di luar retention. Return jumlah row raw"""
+        now = now or time.time()
+        raw_cutoff = int(now - RAW_RETENTION_DAYS * 86400)
+        span_cutoff = int(now - SPAN_RETENTION_DAYS * 86400)
+
+        with self.db:
+            self.db.execute("BEGIN")
+            spans = []
+            current = {}  # (location_id, key) -> [grams, price, has_stock, start, end, samples]
+            for location_id, key, ts, grams, price, has_stock in self.db.execute(
+                "SELECT location_id, key, ts, grams, price, has_stock FROM observations "
+                "WHERE ts < ? ORDER BY location_id, key, ts", (raw_cutoff,)
+            ):
+                span = current.get((location_id, key))
+                if (span and span[1] == price and span[2] == has_stock
+                        and ts - span[4] <= MAX_GAP):
+                    span[4] = ts
+                    span[5] += 1
+                    continue
+                if span:
+                    spans.append((location_id, key, *span))
+                current[(location_id, key)] = [grams, price, has_stock, ts, ts, 1]
+            spans.extend((location_id, key, *span) for (location_id, key), span in current.items())
+
+            self.db.executemany(
+                "INSERT INTO spans (location_id, key, grams, price, has_stock, start_ts, end_ts, samples) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", spans
+            )
+            removed = self.db.execute("DELETE FROM observations WHERE ts < ?", (raw_cutoff,)).rowcount
+            self.db.execute("DELETE FROM scrapes WHERE ts < ?", (span_cutoff,))
+            self.db.execute("DELETE FROM spans WHERE end_ts < ?", (span_cutoff,))
+            self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('compacted_at', ?)",
+                            (str(int(now)),))
+
+        if removed:
+            # Kembalikan page kosong ke OS supaya ukuran file tetap terbatas
+            self.db.executescript("PRAGMA incremental_vacuum;")
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def maybe_compact(self, now=None):
+        now = now or time.time()
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'compacted_at'").fetchone()
+        if row and now - int(row[0]) < COMPACT_EVERY:
+            return 0
+        return self.compact(now)
+
+def main():
+    from datetime import datetime
+
+    location, grams, days = "201", 1, 30
+    for arg in sys.argv:
+        if arg.startswith("--location="):
+            location = arg.split("=")[1]
+        elif arg.startswith("--gram="):
+            grams = float(arg.split("=")[1])
+        elif arg.startswith("--days="):
+            days = int(arg.split("=")[1])
+
+    store = HistoryStore()
+    start = time.time()
+    windows = store.in_stock_windows(location, grams, since=time.time() - days * 86400)
+    elapsed = (time.time() - start) * 1000
+
+    print(f"{grams:g} gram di {location}, {days} hari terakhir: {len(windows)} window ({elapsed:.1f} ms)")
+    for s, e in windows:
+        fmt = "%d/%m/%Y %H:%M"
+        print(f"  {datetime.fromtimestamp(s).strftime(fmt)} - {datetime.fromtimestamp(e).strftime(fmt)}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+location_queue.py - Priority queue scheduler per lokasi
+- Heap (next_due, -subscribers, seq, locationId): tiap lokasi punya jadwal sendiri
+- Subscriber menentukan jadwal: interval lokasi ramai dipendekkan (subscriber_factor),
+  jadi lokasi dengan subscriber lebih banyak due lebih dulu
+- Lokasi yang paling lama overdue diambil duluan
+- Gagal scrape -> exponential backoff per lokasi
+- Tidak ada full sweep: tiap run hanya pop lokasi yang due (dibatasi max_batch)
+"""
+
+import time, math, heapq, random
+
+MAX_BACKOFF = 30 * 60   # Lokasi yang terus gagal tetap dicoba tiap 30 menit
+JITTER = 0.15           # +/- 15% supaya pola request tidak terlalu teratur
+SUBSCRIBER_WEIGHT = 0.5 # Interval / (1 + w * log2(subscribers)): 2 -> 0.67x, 8 -> 0.4x
+MIN_FACTOR = 0.25       # Lokasi paling ramai tetap tidak lebih dari 4x lebih sering
+
+def subscriber_factor(subscribers, weight=SUBSCRIBER_WEIGHT):
+    """Pengali interval untuk jumlah subscriber (1 subscriber -> 1.0)"""
+    return max(MIN_FACTOR, 1 / (1 + weight * math.log2(max(1, subscribers))))
+
+class LocationState:
+    __slots__ = ("location_id", "subscribers", "next_due", "failures", "last_checked",
+                 "version", "in_flight")
+
+    def __init__(self, location_id, subscribers=1):
+        self.location_id = location_id
+        self.subscribers = subscribers
+        self.next_due = 0
+        self.failures = 0
+        self.last_checked = None
+        self.version = 0  # Entry heap dengan version lama = stale (lazy delete)
+        self.in_flight = False
+
+class LocationQueue:
+    def __init__(self, max_backoff=MAX_BACKOFF):
+        self.max_backoff = max_backoff
+        self.heap = []
+        self.states = {}  # locationId -> LocationState
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    def _push(self, state):
+        state.version += 1
+        self.seq += 1
+        heapq.heappush(self.heap, (state.next_due, -state.subscribers, self.seq,
+                                   state.location_id, state.version))
+
+    def sync(self, locations, subscribers=None):
+        """
+        Samakan isi queue dengan list lokasi dari server.
+        Lokasi baru langsung due, lokasi yang hilang dibuang.
+        """
+        now = time.time()
+        subscribers = subscribers or {}
+        wanted = {str(loc) for loc in locations}
+
+        for location_id in list(self.states):
+            if location_id not in wanted:
+                del self.states[location_id]  # Entry heap-nya jadi stale
+
+        for location_id in wanted:
+            count = max(1, int(subscribers.get(location_id, 1)))
+            state = self.states.get(location_id)
+            if state is None:
+                state = self.states[location_id] = LocationState(location_id, count)
+                state.next_due = now
+                self._push(state)
+            elif state.subscribers != count:
+                state.subscribers = count
+                if not state.in_flight:
+                    self._push(state)
+
+    def _peek(self):
+        """Entry valid teratas (buang entry stale)"""
+        while self.heap:
+            next_due, _, _, location_id, version = self.heap[0]
+            state = self.states.get(location_id)
+            if state is not None and state.version == version:
+                return state
+            heapq.heappop(self.heap)
+        return None
+
+    def pop_due(self, now=None, limit=None):
+        """Lokasi due, urut paling urgent. Lokasi yang di-pop wajib di-complete()"""
+        now = now or time.time()
+        due = []
+        while limit is None or len(due) < limit:
+            state = self._peek()
+            if state is None or state.next_due > now:
+                break
+            heapq.heappop(self.heap)
+            state.in_flight = True  # Tidak ada entry di heap sampai complete()
+            due.append(state.location_id)
+        return due
+
+    def complete(self, location_id, ok, interval, now=None, weighted=True):
+        """
+        Jadwalkan ulang: sukses -> interval, gagal -> backoff.
+        weighted: interval dikali subscriber_factor (False jika interval dari caller
+        sudah memperhitungkan subscriber, mis. AdaptivePolicy dengan weights)
+        """
+        state = self.states.get(str(location_id))
+        if state is None:
+            return
+        now = now or time.time()
+        state.in_flight = False
+        state.last_checked = now
+        if weighted:
+            interval *= subscriber_factor(state.subscribers)
+        if ok:
+            state.failures = 0
+            delay = interval
+        else:
+            state.failures += 1
+            delay = min(self.max_backoff, interval * 2 ** state.failures)
+        state.next_due = now + delay + random.uniform(-JITTER, JITTER) * delay
+        self._push(state)
+
+    def seconds_until_next(self, now=None):
+        now = now or time.time()
+        state = self._peek()
+        if state is None:
+            return None
+        return max(0, state.next_due - now)
+
+    def subscribers(self):
+        return {loc: s.subscribers for loc, s in self.states.items()}
+
+    def summary(self, now=None):
+        now = now or time.time()
+        overdue = sum(1 for s in self.states.values() if s.next_due <= now and not s.in_flight)
+        backoff = sum(1 for s in self.states.values() if s.failures)
+        return f"{len(self.states)} lokasi, {overdue} due, {backoff} backoff"
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+location_source.py - Cached location list dari /api/checker/locations
+- Cache lokal dengan TTL (tidak request ke server tiap run)
+- Conditional request (If-None-Match / ETag): list tidak berubah -> 304 tanpa body
+- Server down -> tetap pakai list terakhir, DEFAULT_LOCATIONS hanya jika belum pernah dapat list
+"""
+
+import os, time
+import requests
+
+LOCATIONS_TTL = int(os.environ.get("LOCATIONS_TTL", "60"))
+
+class LocationSource:
+    def __init__(self, server_url, secret="", defaults=None, ttl=LOCATIONS_TTL, session=None, log=print):
+        self.server_url = server_url
+        self.secret = secret
+        self.defaults = list(defaults or [])
+        self.ttl = ttl
+        self.session = session or requests.Session()
+        self.log = log
+
+        self.locations = None   # List terakhir dari server (None = belum pernah)
+        self.subscribers = {}   # locationId -> jumlah subscriber aktif
+        self.subscriber_sets = {}  # locationId -> hash set userId subscriber (server lama: kosong)
+        self.etag = None
+        self.version = None
+        self.fetched_at = 0
+
+    def fresh(self):
+        return self.locations is not None and time.time() - self.fetched_at < self.ttl
+
+    def fallback(self, reason):
+        if self.locations is not None:
+            self.log(f"⚠️ {reason}, pakai list terakhir ({len(self.locations)} lokasi)")
+            return self.locations
+        self.log(f"⚠️ {reason}, using defaults")
+        return self.defaults
+
+    def get(self, force=False):
+        """List locationId aktif (cache dulu, lalu conditional GET)"""
+        if self.fresh() and not force:
+            return self.locations
+
+        headers = {}
+        if self.secret:
+            headers["Authorization"] = f"Bearer {self.secret}"
+        if self.etag and self.locations is not None:
+            headers["If-None-Match"] = self.etag
+
+        try:
+            resp = self.session.get(f"{self.server_url}/api/checker/locations", headers=headers, timeout=10)
+        except requests.exceptions.ConnectionError:
+            return self.fallback("Cannot connect to server")
+        except Exception as e:
+            return self.fallback(f"Error fetching locations: {e}")
+
+        if resp.status_code == 304:
+            self.fetched_at = time.time()
+            return self.locations
+
+        if resp.status_code != 200:
+            return self.fallback(f"Server returned {resp.status_code}")
+
+        try:
+            data = resp.json()
+        except ValueError:
+            return self.fallback("Invalid locations response")
+
+        locations = [str(loc) for loc in data.get("locations", [])]
+        self.subscribers = {str(k): v for k, v in (data.get("subscribers") or {}).items()}
+        self.subscriber_sets = {str(k): v for k, v in (data.get("subscriberSets") or {}).items()}
+        self.etag = resp.headers.get("ETag")
+        self.version = data.get("version")
+        self.fetched_at = time.time()
+
+        if not locations:
+            # Server up tapi belum ada user aktif
+            self.locations = None
+            self.log("⚠️ Server returned no locations, using defaults")
+            return self.defaults
+
+        if locations != self.locations:
+            self.log(f"📍 Locations from server (v{self.version}): {locations}")
+        self.locations = locations
+        return locations
@@ -1,14 +1,27 @@
 #!/usr/bin/env python3
 """
 memory_monitor.py - Monitor memory usage saat scraping
-Usage: python memory_monitor.py --location=bandung
+- Sampler thread poll seluruh process tree (Python + Chromium browser /
+  renderer / GPU / utility) selama scrape berjalan
+- Tiap sample di-tag fase scrape yang sedang jalan (spans.py)
+- Report: peak sebenarnya, peak per fase, peak per jenis proses, USS/PSS
+
+Usage: python memory_monitor.py --location=bandung [--locations=200,201] [--interval=0.1]
 """
 
+import os
 import sys
 import time
+import threading
 import psutil
 from datetime import datetime
 
+import spans
+
+SAMPLE_INTERVAL = 0.1   # Detik antar sample RSS
+FULL_INFO_EVERY = 10    # USS/PSS (baca smaps, mahal) tiap N sample
+TARGET_MB = 300         # Target scraper_ultralight: 200-300 MB
+
 def log(msg):
     ts = datetime.now().strftime("%H:%M:%S")
     print(f"[{ts}] {msg}")
@@ -17,65 +30,233 @@ def get_memory_mb():
     process = psutil.Process()
     return process.memory_info().rss / 1024 / 1024
 
+def process_kind(proc, root_pid):
+    """python / browser / renderer / gpu / utility / other"""
+    if proc.pid == root_pid:
+        return "python"
+    try:
+        cmdline = proc.cmdline()
+    except psutil.Error:
+        return "other"
+    for arg in cmdline:
+        if arg.startswith('--type='):
+            kind = arg.split('=', 1)[1]
+            if kind == 'gpu-process':
+                return "gpu"
+            return kind if kind in ("renderer", "utility") else "other"
+    try:
+        name = proc.name()
+    except psutil.Error:
+        name = ''
+    if 'chrom' in name.lower() or (cmdline and 'chrom' in os.path.basename(cmdline[0]).lower()):
+        return "browser"
+    return "other"
+
+class MemorySampler(threading.Thread):
+    """
+    Background sampler untuk process tree root_pid (default: proses ini).
+
+    Usage:
+        with MemorySampler() as sampler:
+            scrape(...)
+        print(sampler.report())
+    """
+
+    def __init__(self, root_pid=None, interval=SAMPLE_INTERVAL, full_info_every=FULL_INFO_EVERY):
+        super().__init__(daemon=True)
+        self.root_pid = root_pid or os.getpid()
+        self.interval = interval
+        self.full_info_every = full_info_every
+        self.phase = "idle"
+        self.samples = []
+        self.extra_pids = set()
+        self.kinds = {}      # pid -> kind (cmdline cukup dibaca sekali)
+        self._halt = threading.Event()
+        self._lock = threading.Lock()
+
+    # Phase tagging via spans.SpanTimer
+    def on_phase(self, phase):
+        self.phase = phase or "idle"
+
+    def track(self, pid):
+        """Tambah process tree lain (mis. Chromium yang bukan child proses ini)"""
+        if pid:
+            self.extra_pids.add(pid)
+
+    def processes(self):
+        procs = {}
+        for pid in [self.root_pid] + list(self.extra_pids):
+            try:
+                root = psutil.Process(pid)
+                for proc in [root] + root.children(recursive=True):
+                    procs[proc.pid] = proc
+            except psutil.Error:
+                continue
+        return list(procs.values())
+
+    def sample(self, full=False):
+        rss = {}
+        uss = pss = 0
+        count = renderers = 0
+        for proc in self.processes():
+            try:
+                if full:
+                    info = proc.memory_full_info()
+                    uss += getattr(info, 'uss', 0)
+                    pss += getattr(info, 'pss', 0)
+                else:
+                    info = proc.memory_info()
+            except psutil.Error:
+                continue
+            kind = self.kinds.get(proc.pid)
+            if kind is None:
+                kind = self.kinds[proc.pid] = process_kind(proc, self.root_pid)
+            rss[kind] = rss.get(kind, 0) + info.rss
+            count += 1
+            renderers += kind == "renderer"
+        entry = {
+            "t": time.time(),
+            "phase": self.phase,
+            "rss": sum(rss.values()),
+            "byKind": rss,
+            "processes": count,
+            "renderers": renderers,
+        }
+        if full:
+            entry["uss"] = uss
+            entry["pss"] = pss or None  # PSS hanya ada di Linux
+        with self._lock:
+            self.samples.append(entry)
+        return entry
+
+    def run(self):
+        n = 0
+        while not self._halt.is_set():
+            self.sample(full=n % self.full_info_every == 0)
+            n += 1
+            self._halt.wait(self.interval)
+
+    def start(self):
+        spans.add_listener(self.on_phase)
+        super().start()
+        return self
+
+    def stop(self):
+        self._halt.set()
+        if self.is_alive():
+            self.join(timeout=5)
+        spans.remove_listener(self.on_phase)
+        self.sample(full=True)  # Sample terakhir setelah scrape selesai
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self):
+        """Peak dalam MB: total, per fase, per jenis proses, USS/PSS"""
+        mb = 1024 * 1024
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            return {}
+        peak = max(samples, key=lambda s: s["rss"])
+        by_phase = {}
+        by_kind = {}
+        for s in samples:
+            by_phase[s["phase"]] = max(by_phase.get(s["phase"], 0), s["rss"])
+            for kind, value in s["byKind"].items():
+                by_kind[kind] = max(by_kind.get(kind, 0), value)
+        full = [s for s in samples if "uss" in s]
+        return {
+            "samples": len(samples),
+            "seconds": round(samples[-1]["t"] - samples[0]["t"], 1),
+            "peakRssMB": round(peak["rss"] / mb, 1),
+            "peakPhase": peak["phase"],
+            "peakUssMB": round(max(s["uss"] for s in full) / mb, 1) if full else None,
+            "peakPssMB": round(max(s["pss"] or 0 for s in full) / mb, 1) if full and any(s["pss"] for s in full) else None,
+            "peakProcesses": max(s["processes"] for s in samples),
+            "peakRenderers": max(s["renderers"] for s in samples),
+            "byPhaseMB": {k: round(v / mb, 1) for k, v in by_phase.items()},
+            "byKindMB": {k: round(v / mb, 1) for k, v in by_kind.items()},
+        }
+
 def monitor_scraper():
     """Run scraper dan monitor memory usage"""
-    
+
     location = "bandung"
+    locations = []
+    interval = SAMPLE_INTERVAL
     for arg in sys.argv:
         if arg.startswith("--location="):
             location = arg.split("=")[1]
-    
+        elif arg.startswith("--locations="):
+            locations = [l.strip() for l in arg.split("=")[1].split(",")]
+        elif arg.startswith("--interval="):
+            interval = float(arg.split("=")[1])
+
     log("="*60)
     log("MEMORY MONITOR - Antam Scraper")
-    log(f"Location: {location}")
+    log(f"Location: {', '.join(locations) if locations else location}")
     log("="*60)
-    
+
     baseline = get_memory_mb()
     log(f"Baseline memory: {baseline:.1f} MB")
-    
+
     log("\nStarting scraper...")
-    
+
     try:
-        from scraper_ultralight import scrape
-        
+        from scraper_ultralight import scrape, scrape_multiple
+
         pre_scrape = get_memory_mb()
         log(f"Pre-scrape memory: {pre_scrape:.1f} MB (+{pre_scrape - baseline:.1f})")
-        
-        max_memory = pre_scrape
-        memory_samples = []
-        
+
         start = time.time()
-        result = scrape(location)
+        with MemorySampler(interval=interval) as sampler:
+            if locations:
+                results = scrape_multiple(locations)
+            else:
+                results = [scrape(location)]
         elapsed = time.time() - start
-        
-        for i in range(5):
-            mem = get_memory_mb()
-            memory_samples.append(mem)
-            max_memory = max(max_memory, mem)
-            time.sleep(0.2)
-        
+
         time.sleep(1)
         post_scrape = get_memory_mb()
-        
+        report = sampler.report()
+
         log("\n" + "="*60)
         log("RESULTS")
         log("="*60)
-        
-        if result.get("error"):
-            log(f"❌ Error: {result.get('error')}")
-        else:
-            total = result.get("totalProducts", 0)
-            available = len(result.get("availableProducts", []))
-            log(f"✅ Scrape successful: {available}/{total} products")
-            log(f"⏱️  Scrape time: {elapsed:.1f}s")
-        
-        log(f"\n📊 MEMORY USAGE:")
-        log(f"  Baseline:    {baseline:.1f} MB")
+
+        for result in results:
+            if result.get("error"):
+                log(f"❌ Error: {result.get('error')}")
+            else:
+                total = result.get("totalProducts", 0)
+                available = len(result.get("availableProducts", []))
+                log(f"✅ Scrape successful: {available}/{total} products")
+        log(f"⏱️  Scrape time: {elapsed:.1f}s")
+
+        log(f"\n📊 MEMORY USAGE (process tree, {report['samples']} samples / {report['seconds']}s):")
+        log(f"  Baseline:    {baseline:.1f} MB (Python saja)")
         log(f"  Pre-scrape:  {pre_scrape:.1f} MB (+{pre_scrape - baseline:.1f})")
-        log(f"  Peak:        {max_memory:.1f} MB (+{max_memory - baseline:.1f})")
+        log(f"  Peak RSS:    {report['peakRssMB']:.1f} MB (fase {report['peakPhase']})")
+        if report["peakPssMB"] is not None:
+            log(f"  Peak PSS:    {report['peakPssMB']:.1f} MB (shared page dibagi rata)")
+        if report["peakUssMB"] is not None:
+            log(f"  Peak USS:    {report['peakUssMB']:.1f} MB (private saja)")
         log(f"  Post-scrape: {post_scrape:.1f} MB (+{post_scrape - baseline:.1f})")
-        log(f"  Average:     {sum(memory_samples)/len(memory_samples):.1f} MB")
-        
+        log(f"  Processes:   max {report['peakProcesses']} ({report['peakRenderers']} renderer)")
+
+        log(f"\n  Peak per fase:")
+        for phase, value in sorted(report["byPhaseMB"].items(), key=lambda kv: -kv[1]):
+            log(f"    {phase:<16} {value:>8.1f} MB")
+        log(f"  Peak per proses:")
+        for kind, value in sorted(report["byKindMB"].items(), key=lambda kv: -kv[1]):
+            log(f"    {kind:<16} {value:>8.1f} MB")
+
+        # RSS dijumlah per proses menghitung shared page berkali-kali -> pakai PSS jika ada
+        max_memory = report["peakPssMB"] or report["peakRssMB"]
         if max_memory < 300:
             status = "🟢 EXCELLENT"
         elif max_memory < 400:
@@ -84,15 +265,15 @@ def monitor_scraper():
             status = "🟠 OK"
         else:
             status = "🔴 HIGH"
-        
+
         log(f"\n{status} - Peak memory: {max_memory:.1f} MB")
-        
+
         log(f"\n🎯 TARGET: 200-300 MB")
-        if max_memory <= 300:
+        if max_memory <= TARGET_MB:
             log(f"✅ WITHIN TARGET! ({max_memory:.1f} MB)")
         else:
-            log(f"⚠️  OVER TARGET by {max_memory - 300:.1f} MB")
-        
+            log(f"⚠️  OVER TARGET by {max_memory - TARGET_MB:.1f} MB")
+
     except ImportError:
         log("❌ scraper_ultralight.py not found")
         sys.exit(1)
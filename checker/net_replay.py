@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+net_replay.py - Record & replay network session scraper (offline benchmark)
+- Record: semua response di tab DrissionPage (listen CDP) + HTTP fast path
+  disimpan ke satu archive JSON (change-location, redirect form, gold page,
+  resource yang di-block)
+- Replay: archive dilayani HTTP stand-in lokal, URL scraper di-rewrite ke
+  stand-in, Chromium tidak bisa resolve host lain -> full flow DrissionPage
+  jalan deterministik tanpa hit logammulia.com
+- Latency / error injection (seeded) untuk uji timeout dan retry
+
+Usage:
+    python scraper_ultrafast.py --locations=200,201 --record=session.json
+    python scraper_ultrafast.py --locations=200,201 --replay=session.json --latency=150 --error-rate=0.05
+    python net_replay.py serve session.json [--port=8765]   # stand-in saja
+    python net_replay.py info session.json
+"""
+
+import os, sys, json, gzip, time, base64, random, shutil, tempfile, threading
+from datetime import datetime
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SITE_ORIGIN = "https://www.logammulia.com"
+EXT_PREFIX = "/_ext/"          # Origin lain di-serve di /_ext/<scheme>/<host>/...
+DRAIN_TIMEOUT = 0.5            # Tunggu packet terakhir saat collect()
+
+# Header yang tidak boleh diteruskan apa adanya (body sudah di-decode / di-rewrite)
+DROP_HEADERS = {
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection',
+    'strict-transport-security', 'content-security-policy', 'alt-svc',
+}
+TEXT_TYPES = ('text/', 'javascript', 'json', 'xml')
+
+def log(msg):
+    ts = datetime.now().strftime("%d/%m/%Y, %H.%M.%S")
+    print(f"[{ts}] {msg}", file=sys.stderr)
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def strip_query(url):
+    return url.split('?', 1)[0]
+
+# =====================================================
+# Archive
+# =====================================================
+class Archive:
+    """List response yang direkam, urut sesuai waktu rekam"""
+
+    def __init__(self, entries=None, meta=None):
+        self.entries = entries or []
+        self.meta = meta or {}
+
+    @classmethod
+    def load(cls, path):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get("entries"), data.get("meta"))
+
+    def save(self, path):
+        opener = gzip.open if path.endswith('.gz') else open
+        tmp = f"{path}.tmp"
+        with opener(tmp, 'wt', encoding='utf-8') as f:
+            json.dump({"meta": self.meta, "entries": self.entries}, f)
+        os.replace(tmp, path)
+
+    def add(self, method, url, status=None, headers=None, body=None, resource_type=None,
+            error=None, source="browser"):
+        entry = {
+            "method": (method or "GET").upper(),
+            "url": url,
+            "type": resource_type,
+            "status": status,
+            "headers": headers or {},
+            "source": source,
+            "error": error,
+        }
+        if isinstance(body, bytes):
+            entry["body"] = base64.b64encode(body).decode('ascii')
+            entry["base64"] = True
+        else:
+            entry["body"] = body
+        self.entries.append(entry)
+        return entry
+
+    def origins(self):
+        return sorted({origin_of(e["url"]) for e in self.entries if "://" in e["url"]})
+
+    def summary(self):
+        by_type = {}
+        for e in self.entries:
+            kind = "blocked" if e.get("error") else (e.get("type") or "Other")
+            row = by_type.setdefault(kind, [0, 0])
+            row[0] += 1
+            row[1] += len(e.get("body") or "")
+        return by_type
+
+def entry_body(entry):
+    body = entry.get("body") or ""
+    if entry.get("base64"):
+        return base64.b64decode(body)
+    return body.encode('utf-8')
+
+# =====================================================
+# Record
+# =====================================================
+class Recorder:
+    """Rekam response dari tab DrissionPage (page.listen) dan requests.Response"""
+
+    mode = "record"
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = Archive(meta={"recordedAt": datetime.now().isoformat(), "site": SITE_ORIGIN})
+        self.lock = threading.Lock()
+        self.tabs = set()
+
+    def attach(self, tab):
+        """Mulai listen semua request di tab (panggil sebelum navigasi pertama)"""
+        if id(tab) in self.tabs:
+            return
+        try:
+            tab.listen.start(True, method=True)
+            self.tabs.add(id(tab))
+        except Exception as e:
+            log(f"⚠️ Record: listen gagal ({e})")
+
+    def collect(self, tab):
+        """Ambil semua packet yang sudah tertangkap di tab, lalu stop listen"""
+        if id(tab) not in self.tabs:
+            return 0
+        count = 0
+        try:
+            for packet in tab.listen.steps(timeout=DRAIN_TIMEOUT):
+                self.add_packet(packet)
+                count += 1
+        except Exception as e:
+            log(f"⚠️ Record: collect gagal ({e})")
+        try:
+            tab.listen.stop()
+        except Exception:
+            pass
+        self.tabs.discard(id(tab))
+        return count
+
+    def add_packet(self, packet):
+        fail = getattr(packet, 'fail_info', None) if getattr(packet, 'is_failed', False) else None
+        status = headers = body = None
+        response = getattr(packet, 'response', None)
+        if response is not None and not fail:
+            status = getattr(response, 'status', None)
+            headers = dict(getattr(response, 'headers', None) or {})
+            try:
+                body = response.body
+                # body JSON sudah di-parse DrissionPage -> simpan teks mentah
+                if not isinstance(body, (str, bytes)):
+                    body = response.raw_body
+            except Exception:
+                body = None
+        error = None
+        if fail is not None:
+            error = getattr(fail, 'errorText', None) or getattr(fail, 'blockedReason', None) or "failed"
+        with self.lock:
+            entry = self.archive.add(packet.method, packet.url, status, headers, body,
+                                     getattr(packet, 'resourceType', None), error)
+            post_data = getattr(getattr(packet, 'request', None), 'postData', None)
+            if post_data:
+                entry["postData"] = post_data if isinstance(post_data, str) else json.dumps(post_data)
+
+    def record_response(self, resp):
+        """requests.Response dari HTTP fast path"""
+        with self.lock:
+            for hop in list(resp.history) + [resp]:
+                self.archive.add(hop.request.method, hop.url, hop.status_code,
+                                 dict(hop.headers), hop.text, "Document", source="http")
+
+    def save(self):
+        with self.lock:
+            self.archive.save(self.path)
+        log(f"💾 Record: {len(self.archive.entries)} response -> {self.path}")
+
+    def close(self):
+        self.save()
+
+# =====================================================
+# Replay
+# =====================================================
+class ReplayServer(ThreadingHTTPServer):
+    """
+    HTTP stand-in yang melayani archive.
+    Request dicocokkan ke (method, url) rekaman; request berulang ke URL yang sama
+    dilayani berurutan (lokasi 1, lokasi 2, ...) lalu tetap di response terakhir.
+    """
+
+    daemon_threads = True
+    mode = "replay"
+
+    def __init__(self, archive, port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=0):
+        super().__init__(("127.0.0.1", port), ReplayHandler)
+        self.archive = archive
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.local = f"http://127.0.0.1:{self.server_address[1]}"
+        self.site = archive.meta.get("site", SITE_ORIGIN)
+        self.stats = {"served": 0, "missing": 0, "injectedErrors": 0}
+        self.cursors = {}
+        self.exact = {}
+        self.by_path = {}
+        for entry in archive.entries:
+            if entry.get("error"):
+                continue  # Di-block / gagal saat rekam -> 404 saat replay
+            self.exact.setdefault((entry["method"], entry["url"]), []).append(entry)
+            self.by_path.setdefault((entry["method"], strip_query(entry["url"])), []).append(entry)
+        self.rewrites = [(origin, self.local_url(origin)) for origin in archive.origins()]
+        self.rewrites.sort(key=lambda r: -len(r[0]))
+        self.thread = None
+        self.tmpdir = None
+
+    def local_url(self, url):
+        """URL asli -> URL di stand-in"""
+        origin = origin_of(url)
+        if origin == self.site:
+            return self.local + url[len(origin):]
+        parts = urlsplit(url)
+        return f"{self.local}{EXT_PREFIX}{parts.scheme}/{parts.netloc}{url[len(origin):]}"
+
+    def original_url(self, path):
+        """Path request di stand-in -> URL asli"""
+        if path.startswith(EXT_PREFIX):
+            scheme, _, rest = path[len(EXT_PREFIX):].partition('/')
+            host, _, tail = rest.partition('/')
+            return f"{scheme}://{host}/{tail}"
+        return self.site + path
+
+    def lookup(self, method, url):
+        key = (method, url)
+        candidates = self.exact.get(key)
+        if not candidates:
+            # Query beda (cache buster) -> cocokkan path saja
+            key = (method, strip_query(url))
+            candidates = self.by_path.get(key)
+        if not candidates:
+            return None
+        with self.lock:
+            index = self.cursors.get(key, 0)
+            self.cursors[key] = index + 1
+        return candidates[min(index, len(candidates) - 1)]
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+            fail = self.error_rate and self.random.random() < self.error_rate
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+        return fail
+
+    def rewrite(self, text):
+        for origin, local in self.rewrites:
+            text = text.replace(origin, local)
+            # Protocol-relative URL (//host/path)
+            text = text.replace(origin.split(':', 1)[1], local.split(':', 1)[1])
+        return text
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        log(f"▶️ Replay stand-in: {self.local} ({len(self.archive.entries)} response, "
+            f"latency {self.latency_ms}+{self.jitter_ms}ms, error {self.error_rate:.0%})")
+        return self
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        if self.tmpdir:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+        log(f"⏹️ Replay: {self.stats}")
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def handle_any(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        if server.delay():
+            server.stats["injectedErrors"] += 1
+            return self.send_plain(503, "injected error")
+
+        method = self.command
+        url = server.original_url(self.path)
+        entry = server.lookup(method, url)
+        if entry is None and method == "POST":
+            # Redirect form POST kadang tidak tertangkap listen -> ikuti alur site
+            target = server.archive.meta.get("postRedirect")
+            if target:
+                server.stats["served"] += 1
+                return self.send_redirect(303, server.local_url(target))
+        if entry is None:
+            server.stats["missing"] += 1
+            return self.send_plain(404, "not in archive")
+
+        server.stats["served"] += 1
+        headers = {k.lower(): v for k, v in (entry.get("headers") or {}).items()}
+        body = entry_body(entry)
+        content_type = headers.get('content-type', '')
+        if any(t in content_type for t in TEXT_TYPES):
+            body = server.rewrite(body.decode('utf-8', 'replace')).encode('utf-8')
+
+        self.send_response(entry.get("status") or 200)
+        for name, value in headers.items():
+            if name in DROP_HEADERS:
+                continue
+            for line in str(value).split('\n'):
+                if name == 'location':
+                    line = server.rewrite(line)
+                elif name == 'set-cookie':
+                    line = local_cookie(line)
+                self.send_header(name, line)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_HEAD = do_PUT = do_OPTIONS = handle_any
+
+    def send_plain(self, status, text):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_redirect(self, status, location):
+        self.send_response(status)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+def local_cookie(line):
+    """Set-Cookie untuk 127.0.0.1: buang Domain / Secure / SameSite=None"""
+    parts = [p.strip() for p in line.split(';')]
+    keep = [p for p in parts if p.split('=', 1)[0].lower() not in ('domain', 'secure', 'samesite')]
+    return '; '.join(keep)
+
+# =====================================================
+# Integrasi scraper
+# =====================================================
+current = None
+
+def from_argv(argv):
+    """--record=path / --replay=path [--latency= --jitter= --error-rate= --seed= --port=]"""
+    opts = {}
+    for arg in argv:
+        if arg.startswith("--") and "=" in arg:
+            name, value = arg[2:].split("=", 1)
+            opts[name] = value
+    if "record" in opts:
+        return Recorder(opts["record"])
+    if "replay" in opts:
+        return ReplayServer(
+            Archive.load(opts["replay"]),
+            port=int(opts.get("port", 0)),
+            latency_ms=float(opts.get("latency", 0)),
+            jitter_ms=float(opts.get("jitter", 0)),
+            error_rate=float(opts.get("error-rate", 0)),
+            seed=int(opts.get("seed", 0)),
+        )
+    return None
+
+def install(session, modules):
+    """
+    Aktifkan session (Recorder / ReplayServer) untuk modul scraper.
+    Replay: LOCATION_URL / GOLD_URL di-rewrite ke stand-in, COOKIES_FILE dan
+    POLICY_FILE diarahkan ke salinan sementara supaya file asli tidak tertimpa.
+    """
+    global current
+    current = session
+    if session is None:
+        return None
+    for module in modules:
+        if session.mode == "record" and hasattr(module, 'GOLD_URL'):
+            session.archive.meta.setdefault("postRedirect", module.GOLD_URL)
+        if session.mode != "replay":
+            continue
+        for name in ('LOCATION_URL', 'GOLD_URL'):
+            if hasattr(module, name):
+                setattr(module, name, session.local_url(getattr(module, name)))
+        for name in ('COOKIES_FILE', 'POLICY_FILE'):
+            if not hasattr(module, name):
+                continue
+            session.tmpdir = session.tmpdir or tempfile.mkdtemp(prefix='replay_')
+            original = getattr(module, name)
+            copy = os.path.join(session.tmpdir, os.path.basename(original))
+            if os.path.exists(original) and not os.path.exists(copy):
+                shutil.copy(original, copy)
+            setattr(module, name, copy)
+    if session.mode == "replay":
+        session.start()
+    return session
+
+def finish():
+    global current
+    if current is not None:
+        current.close()
+    current = None
+
+def browser_arguments():
+    """Argumen Chromium tambahan: saat replay, semua host selain stand-in tidak bisa di-resolve"""
+    if current is None or current.mode != "replay":
+        return []
+    return ['--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE 127.0.0.1']
+
+def attach(tab):
+    if current is not None and current.mode == "record":
+        current.attach(tab)
+
+def collect(tab):
+    if current is not None and current.mode == "record":
+        current.collect(tab)
+
+def record_response(resp):
+    if current is not None and current.mode == "record":
+        current.record_response(resp)
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("serve", "info"):
+        print(__doc__)
+        sys.exit(1)
+    archive = Archive.load(sys.argv[2])
+
+    if sys.argv[1] == "info":
+        print(f"{len(archive.entries)} response, recorded {archive.meta.get('recordedAt')}")
+        for kind, (count, size) in sorted(archive.summary().items()):
+            print(f"  {kind:<12} {count:>4} response {size / 1024:>9.1f} KB")
+        return
+
+    server = from_argv(["--replay=" + sys.argv[2]] + sys.argv[3:])
+    server.start()
+    print(f"Gold page: {server.local_url(SITE_ORIGIN + '/id/purchase/gold')}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.close()
+
+if __name__ == "__main__":
+    main()
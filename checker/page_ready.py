@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+page_ready.py - Event-driven page readiness (pengganti time.sleep tetap)
+- Navigation committed setelah form submit
+- Jumlah row .ct-body .ctr stabil
+- Network idle (resource timing tidak bertambah)
+Tiap signal punya timeout budget; ReadyReport mencatat waktu wait vs work.
+"""
+
+import time
+
+POLL_INTERVAL = 0.1
+
+# Timeout budget per signal (detik)
+NAV_TIMEOUT = 5
+ROWS_TIMEOUT = 10
+IDLE_TIMEOUT = 3
+
+ROWS_STABLE_FOR = 0.3   # Row count tidak berubah selama ini -> dianggap ready
+IDLE_QUIET_FOR = 0.5    # Tidak ada resource baru selama ini -> network idle
+
+class ReadyReport:
+    """Akumulasi waktu wait per signal vs waktu kerja untuk satu lokasi"""
+
+    def __init__(self):
+        self.start = time.time()
+        self.waits = {}
+        self.timeouts = []
+
+    def record(self, signal, seconds, ok):
+        self.waits[signal] = round(self.waits.get(signal, 0) + seconds, 2)
+        if not ok:
+            self.timeouts.append(signal)
+
+    def as_dict(self):
+        total = time.time() - self.start
+        waited = sum(self.waits.values())
+        return {
+            "waitSeconds": round(waited, 2),
+            "workSeconds": round(max(0.0, total - waited), 2),
+            "waits": dict(self.waits),
+            "timeouts": list(self.timeouts)
+        }
+
+def _js(tab, script, default=None):
+    # run_js bisa gagal saat dokumen sedang berganti (navigasi)
+    try:
+        return tab.run_js(script)
+    except Exception:
+        return default
+
+def _finish(report, signal, started, ok):
+    if report is not None:
+        report.record(signal, time.time() - started, ok)
+    return ok
+
+def wait_selector(tab, css, timeout=NAV_TIMEOUT, report=None):
+    """Tunggu sampai elemen css ada di DOM"""
+    started = time.time()
+    deadline = started + timeout
+    script = f"return !!document.querySelector({css!r});"
+    while time.time() < deadline:
+        if _js(tab, script, False):
+            return _finish(report, 'selector', started, True)
+        time.sleep(POLL_INTERVAL)
+    return _finish(report, 'selector', started, False)
+
+def wait_navigation(tab, away_from, timeout=NAV_TIMEOUT, report=None):
+    """Tunggu sampai URL tidak lagi mengandung away_from dan dokumen baru mulai parse"""
+    started = time.time()
+    deadline = started + timeout
+    while time.time() < deadline:
+        href = _js(tab, 'return location.href;', '') or ''
+        state = _js(tab, 'return document.readyState;', '')
+        if href and away_from not in href and state in ('interactive', 'complete'):
+            return _finish(report, 'navigation', started, True)
+        time.sleep(POLL_INTERVAL)
+    return _finish(report, 'navigation', started, False)
+
+def wait_rows_stable(tab, timeout=ROWS_TIMEOUT, min_rows=1, stable_for=ROWS_STABLE_FOR, report=None):
+    """Tunggu .ct-body .ctr muncul (>= min_rows) dan jumlahnya stabil selama stable_for"""
+    started = time.time()
+    deadline = started + timeout
+    last_count, stable_since = -1, started
+    while time.time() < deadline:
+        count = _js(tab, "return document.querySelectorAll('.ct-body .ctr').length;", 0) or 0
+        now = time.time()
+        if count != last_count:
+            last_count, stable_since = count, now
+        elif count >= min_rows and now - stable_since >= stable_for:
+            return _finish(report, 'rows', started, True)
+        time.sleep(POLL_INTERVAL)
+    return _finish(report, 'rows', started, False)
+
+def wait_network_idle(tab, timeout=IDLE_TIMEOUT, quiet_for=IDLE_QUIET_FOR, report=None):
+    """Network idle: readyState complete dan jumlah resource entries tidak bertambah"""
+    started = time.time()
+    deadline = started + timeout
+    last_count, quiet_since = -1, started
+    while time.time() < deadline:
+        state = _js(tab, 'return document.readyState;', '')
+        count = _js(tab, "return performance.getEntriesByType('resource').length;", -1)
+        now = time.time()
+        if count != last_count:
+            last_count, quiet_since = count, now
+        elif state == 'complete' and now - quiet_since >= quiet_for:
+            return _finish(report, 'network_idle', started, True)
+        time.sleep(POLL_INTERVAL)
+    return _finish(report, 'network_idle', started, False)
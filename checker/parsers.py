@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+parsers.py - Product table parser engine (pluggable backends)
+- bs4    : BeautifulSoup + CSS select (cara lama, paling toleran)
+- lxml   : lxml.html + XPath, tanpa object tree BeautifulSoup
+- stream : html.parser streaming, hanya subtree .ct-body (semua) yang di-parse
+
+Semua backend menghasilkan list Product (product.py) yang identik.
+Pilih backend via env PARSER_BACKEND (default: lxml).
+
+In-browser extraction (EXTRACT_MODE=js): satu run_js walk .ct-body .ctr di
+page dan return rows sebagai JSON kecil, page.html hanya jadi fallback.
+"""
+
+import os, json
+from html.parser import HTMLParser
+
+from product import Product
+
+PARSER_BACKEND = os.environ.get("PARSER_BACKEND", "lxml")
+# js = extract di browser (default), html = selalu page.html + parser backend
+EXTRACT_MODE = os.environ.get("EXTRACT_MODE", "js")
+
+EXCLUDE_WORDS = ('perak', 'silver')
+INCLUDE_WORDS = ('emas', 'batangan', 'gram')
+
+def keep_title(title):
+    """Filter yang sama untuk semua backend: emas/batangan/gram, bukan perak/silver"""
+    lower = title.lower()
+    if any(x in lower for x in EXCLUDE_WORDS):
+        return False
+    return any(x in lower for x in INCLUDE_WORDS)
+
+def make_product(title, price, has_stock):
+    """Row mentah -> Product (gram, harga int, key) sekali di sini untuk semua backend"""
+    return Product.from_row(title, price, has_stock)
+
+# =====================================================
+# bs4 backend
+# =====================================================
+def parse_bs4(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    products = []
+
+    for row in soup.select('.ct-body .ctr'):
+        try:
+            col = row.select_one('.ctd.item-1 .ngc-text')
+            if not col: continue
+
+            title = col.get_text(strip=True).split('\n')[0]
+            if not keep_title(title):
+                continue
+
+            price = row.select_one('.ctd.item-2')
+            price = price.get_text(strip=True) if price else ""
+            has_stock = not row.select_one('span.no-stock')
+
+            products.append(make_product(title, price, has_stock))
+        except:
+            continue
+
+    soup.decompose()
+    return products
+
+# =====================================================
+# lxml / XPath backend
+# =====================================================
+def _cls(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+XPATH_ROWS = f"//*[{_cls('ct-body')}]//*[{_cls('ctr')}]"
+XPATH_TITLE = f".//*[{_cls('ctd')} and {_cls('item-1')}]//*[{_cls('ngc-text')}]"
+XPATH_PRICE = f".//*[{_cls('ctd')} and {_cls('item-2')}]"
+XPATH_NO_STOCK = f".//span[{_cls('no-stock')}]"
+
+def _text(el):
+    # Sama dengan bs4 get_text(strip=True): tiap text node di-strip lalu digabung
+    return ''.join(t.strip() for t in el.xpath('.//text()'))
+
+def parse_lxml(html):
+    import lxml.html
+    from lxml.etree import ParserError
+
+    if not html or not html.strip():
+        return []
+    if isinstance(html, str) and html.lstrip().startswith('<?xml'):
+        # lxml menolak str dengan encoding declaration
+        html = html.encode('utf-8')
+    try:
+        root = lxml.html.fromstring(html)
+    except ParserError:
+        # Dokumen tanpa elemen (hanya doctype / comment): sama dengan bs4 -> []
+        return []
+    products = []
+
+    for row in root.xpath(XPATH_ROWS):
+        try:
+            cols = row.xpath(XPATH_TITLE)
+            if not cols: continue
+
+            title = _text(cols[0]).split('\n')[0]
+            if not keep_title(title):
+                continue
+
+            prices = row.xpath(XPATH_PRICE)
+            price = _text(prices[0]) if prices else ""
+            has_stock = not row.xpath(XPATH_NO_STOCK)
+
+            products.append(make_product(title, price, has_stock))
+        except:
+            continue
+
+    return products
+
+# =====================================================
+# Streaming backend (.ct-body subtree saja)
+# =====================================================
+STREAM_CHUNK = 16 * 1024
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+class _TableStream(HTMLParser):
+    """Event-driven parser: tidak membangun tree, hanya state per row"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []          # tag name per open element
+        self.body_depth = None   # depth .ct-body terluar
+        self.row_depth = None    # depth .ctr aktif
+        self.item1_depths = []   # depth .ctd.item-1 yang terbuka di row
+        self.title_depth = None  # depth .ngc-text yang sedang di-capture
+        self.price_depth = None  # depth .ctd.item-2 yang sedang di-capture
+        self.rows = []
+        self.text = []           # Potongan text node aktif (feed per chunk bisa memotong text)
+
+    def _new_row(self):
+        self.row = {"title": None, "price": None, "noStock": False}
+        self.title_parts = []
+        self.price_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        classes = set()
+        for k, v in attrs:
+            if k == 'class' and v:
+                classes = set(v.split())
+                break
+        void = tag in VOID_TAGS
+        depth = len(self.stack)
+
+        if self.body_depth is None:
+            if 'ct-body' in classes and not void:
+                self.body_depth = depth
+        elif self.row_depth is None:
+            if 'ctr' in classes and not void:
+                self.row_depth = depth
+                self._new_row()
+        else:
+            if tag == 'span' and 'no-stock' in classes:
+                self.row["noStock"] = True
+            if self.title_depth is None and self.row["title"] is None:
+                if 'ngc-text' in classes and self.item1_depths and not void:
+                    self.title_depth = depth
+            if 'ctd' in classes and 'item-1' in classes and not void:
+                self.item1_depths.append(depth)
+            if self.price_depth is None and self.row["price"] is None:
+                if 'ctd' in classes and 'item-2' in classes:
+                    if void:
+                        self.row["price"] = ""
+                    else:
+                        self.price_depth = depth
+
+        if not void:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Seperti browser: <div/> diperlakukan sebagai tag pembuka biasa
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in VOID_TAGS or tag not in self.stack:
+            return
+        # Tutup sampai tag yang cocok (toleran terhadap tag tidak ditutup)
+        while self.stack:
+            open_tag = self.stack.pop()
+            self._close(len(self.stack))
+            if open_tag == tag:
+                break
+
+    def _close(self, depth):
+        if self.title_depth == depth:
+            self.row["title"] = ''.join(self.title_parts)
+            self.title_depth = None
+        if self.price_depth == depth:
+            self.row["price"] = ''.join(self.price_parts)
+            self.price_depth = None
+        if self.item1_depths and self.item1_depths[-1] == depth:
+            self.item1_depths.pop()
+        if self.row_depth == depth:
+            self.rows.append(self.row)
+            self.row_depth = None
+            self.item1_depths = []
+        if self.body_depth == depth:
+            # .ct-body berikutnya (jika ada) di-scan lagi, lihat parse_stream
+            self.body_depth = None
+
+    def skip(self):
+        """Buang data yang belum di-parse + element di luar .ct-body (caller lompat ke .ct-body berikutnya)"""
+        self.reset()
+        self.stack = []
+        self.text = []
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def _flush_text(self):
+        """Satu text node utuh, di-strip seperti bs4 get_text(strip=True)"""
+        text = ''.join(self.text).strip()
+        self.text = []
+        if not text or self.row_depth is None:
+            return
+        if self.title_depth is not None:
+            self.title_parts.append(text)
+        if self.price_depth is not None:
+            self.price_parts.append(text)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        # Dokumen terpotong: tutup element yang masih terbuka
+        while self.stack:
+            self.stack.pop()
+            self._close(len(self.stack))
+
+def _ct_body_start(html, pos=0):
+    """Offset tag pembuka .ct-body berikutnya mulai dari pos, None jika tidak ada"""
+    idx = html.find('ct-body', pos)
+    while idx != -1:
+        start = html.rfind('<', pos, idx)
+        # Pastikan 'ct-body' ada di dalam tag (atribut class), bukan di text/script
+        if start != -1 and '>' not in html[start:idx]:
+            return start
+        idx = html.find('ct-body', idx + 1)
+    return None
+
+def parse_stream(html):
+    if not html:
+        return []
+    pos = _ct_body_start(html)
+    if pos is None:
+        return []
+
+    # Feed per chunk. Di luar .ct-body: lompat ke .ct-body berikutnya (dokumen bisa
+    # punya lebih dari satu, sama dengan bs4/lxml) tanpa tokenize isi di antaranya
+    parser = _TableStream()
+    while pos < len(html):
+        end = min(pos + STREAM_CHUNK, len(html))
+        parser.feed(html[pos:end])
+        pos = end
+        if parser.body_depth is None:
+            pending = pos - len(parser.rawdata)
+            following = _ct_body_start(html, pending)
+            if following is None:
+                break
+            if following > pending:
+                parser.skip()
+                pos = following
+    parser.close()
+
+    products = []
+    for row in parser.rows:
+        if row["title"] is None:
+            continue
+        title = row["title"].split('\n')[0]
+        if not keep_title(title):
+            continue
+        products.append(make_product(title, row["price"] or "", not row["noStock"]))
+    return products
+
+# =====================================================
+BACKENDS = {
+    "bs4": parse_bs4,
+    "lxml": parse_lxml,
+    "stream": parse_stream,
+}
+
+def get_parser(name=None):
+    """Parser function untuk backend name (default PARSER_BACKEND)"""
+    name = (name or PARSER_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (pilihan: {', '.join(BACKENDS)})")
+    return BACKENDS[name]
+
+def parse(html, backend=None):
+    return get_parser(backend)(html)
+
+# =====================================================
+# In-browser extraction (tanpa kirim page.html lewat CDP)
+# =====================================================
+EXTRACT_JS = '''
+    var exclude = %s, include = %s;
+    function text(el) {
+        // Sama dengan bs4 get_text(strip=True)
+        var out = '', walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        while (walker.nextNode()) out += walker.currentNode.nodeValue.trim();
+        return out;
+    }
+    var rows = [];
+    document.querySelectorAll('.ct-body .ctr').forEach(function(row) {
+        var col = row.querySelector('.ctd.item-1 .ngc-text');
+        if (!col) return;
+        var title = text(col).split('\\n')[0], lower = title.toLowerCase();
+        if (exclude.some(function(x) { return lower.indexOf(x) >= 0; })) return;
+        if (!include.some(function(x) { return lower.indexOf(x) >= 0; })) return;
+        var price = row.querySelector('.ctd.item-2');
+        rows.push([title, price ? text(price) : '', row.querySelector('span.no-stock') ? 0 : 1]);
+    });
+    return JSON.stringify(rows);
+''' % (json.dumps(EXCLUDE_WORDS), json.dumps(INCLUDE_WORDS))
+
+def extract_in_page(tab):
+    """Rows hasil run_js di page. None jika gagal (pakai fallback HTML)"""
+    try:
+        raw = tab.run_js(EXTRACT_JS)
+        rows = json.loads(raw) if isinstance(raw, str) else raw
+        return [make_product(title, price, bool(stock)) for title, price, stock in rows]
+    except Exception:
+        return None
+
+def read_products(tab, html_parser=None, mode=None):
+    """
+    Products dari tab: in-browser extraction dulu (EXTRACT_MODE=js),
+    fallback ke page.html + html_parser (default backend PARSER_BACKEND).
+    """
+    if (mode or EXTRACT_MODE) == "js":
+        products = extract_in_page(tab)
+        if products:
+            return products
+    return (html_parser or get_parser())(tab.html)
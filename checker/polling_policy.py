@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+polling_policy.py - Adaptive polling interval per lokasi
+- Catat transisi hasStock (habis -> tersedia) per lokasi + jam (0-23)
+- Lokasi / jam yang sering restock di-poll lebih sering, yang sepi lebih jarang
+- Total request tetap dalam budget global per jam
+- Report: expected detection latency adaptive vs fixed interval
+
+Usage: python polling_policy.py [--hour=10]   (report latency per jam)
+"""
+
+import os, sys, json
+from datetime import datetime
+
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), 'restock_history.json')
+
+MIN_INTERVAL = 45      # Lokasi paling "panas" tidak di-poll lebih cepat dari ini
+MAX_INTERVAL = 1800    # Lokasi paling sepi tetap di-cek minimal tiap 30 menit
+HOUR_BUDGET_RANGE = (0.5, 2.0)  # Budget jam hot/sepi relatif ke rata-rata harian
+
+# Prior (smoothing) supaya lokasi tanpa history tidak dianggap 0 restock
+PRIOR_RESTOCKS = 0.5
+PRIOR_DAYS = 5
+
+class RestockHistory:
+    """
+    Statistik per (locationId, hour):
+      restocks - jumlah transisi hasStock False -> True
+      obs      - jumlah observasi
+      days     - jumlah hari berbeda yang teramati di jam itu
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.stats = {}       # locationId -> {hour(str): {...}}
+        self.last_state = {}  # locationId -> hasStock terakhir
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.stats = data.get("stats", {})
+            self.last_state = data.get("lastState", {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"stats": self.stats, "lastState": self.last_state}, f)
+        os.replace(tmp, self.path)
+
+    def _bucket(self, location_id, hour):
+        hours = self.stats.setdefault(str(location_id), {})
+        return hours.setdefault(str(hour), {"restocks": 0, "obs": 0, "days": 0, "lastDate": None})
+
+    def observe(self, location_id, has_stock, when=None):
+        when = when or datetime.now()
+        location_id = str(location_id)
+        bucket = self._bucket(location_id, when.hour)
+        today = when.date().isoformat()
+        if bucket["lastDate"] != today:
+            bucket["days"] += 1
+            bucket["lastDate"] = today
+        bucket["obs"] += 1
+        if has_stock and self.last_state.get(location_id) is False:
+            bucket["restocks"] += 1
+        self.last_state[location_id] = bool(has_stock)
+
+    def rate(self, location_id, hour):
+        """Estimasi restock per jam untuk lokasi di jam tersebut (smoothed)"""
+        bucket = self.stats.get(str(location_id), {}).get(str(hour))
+        restocks = bucket["restocks"] if bucket else 0
+        days = bucket["days"] if bucket else 0
+        return (restocks + PRIOR_RESTOCKS) / (days + PRIOR_DAYS)
+
+class AdaptivePolicy:
+    """Bagi budget request per jam ke lokasi berdasarkan rate restock"""
+
+    def __init__(self, history, base_interval, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 hours=range(24)):
+        self.history = history
+        self.base_interval = base_interval
+        self.hours = list(hours)  # Jam operasi (budget harian dibagi ke jam-jam ini)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+    def fixed_budget(self, locations):
+        """Request per jam policy fixed (semua lokasi tiap base_interval)"""
+        return len(locations) * 3600 / self.base_interval
+
+    def demand(self, location_id, hour, weights=None):
+        """Rate restock x bobot lokasi (jumlah subscriber), default bobot 1"""
+        weight = (weights or {}).get(str(location_id), 1)
+        return self.history.rate(location_id, hour) * weight
+
+    def budget_per_hour(self, locations, hour, weights=None):
+        """
+        Budget harian = policy fixed, dibagi ke jam operasi ~ sqrt(demand):
+        jam hot dapat lebih banyak request, jam sepi lebih sedikit
+        """
+        def weight(h):
+            return sum(self.demand(loc, h, weights) ** 0.5 for loc in locations)
+
+        hours = self.hours or [hour]
+        mean = sum(weight(h) for h in hours) / len(hours)
+        factor = weight(hour) / mean if mean else 1
+        low, high = HOUR_BUDGET_RANGE
+        return self.fixed_budget(locations) * min(high, max(low, factor))
+
+    def intervals(self, locations, hour=None, weights=None):
+        """locationId -> interval (detik) untuk jam ini. weights: locationId -> subscriber"""
+        if not locations:
+            return {}
+        hour = datetime.now().hour if hour is None else hour
+        shares = {str(loc): self.demand(loc, hour, weights) ** 0.5 for loc in locations}
+        max_polls = 3600 / self.min_interval
+        min_polls = 3600 / self.max_interval
+
+        # Latency minimal (sum demand * interval/2) dengan budget tetap -> polls ~ sqrt(demand).
+        # Lokasi yang kena batas min/max di-fix, sisa budget dibagi ulang ke yang lain.
+        budget = self.budget_per_hour(locations, hour, weights)
+        polls, free = {}, dict(shares)
+        while free:
+            total = sum(free.values())
+            share = {loc: budget * w / total for loc, w in free.items()}
+            clamped = {loc: min(max_polls, max(min_polls, n)) for loc, n in share.items()
+                       if n > max_polls or n < min_polls}
+            if not clamped:
+                polls.update(share)
+                break
+            for loc, n in clamped.items():
+                polls[loc] = n
+                budget -= n
+                del free[loc]
+            budget = max(budget, 0)
+
+        return {loc: 3600 / max(n, min_polls) for loc, n in polls.items()}
+
+    def report(self, locations, hour=None, weights=None):
+        """
+        Expected detection latency: restock (Poisson) rata-rata terdeteksi
+        setelah interval/2. Dibobot dengan demand (rate x subscriber) tiap lokasi.
+        """
+        hour = datetime.now().hour if hour is None else hour
+        intervals = self.intervals(locations, hour, weights)
+        rows = []
+        weighted_adaptive = weighted_fixed = total_rate = 0
+        for loc in locations:
+            rate = self.demand(loc, hour, weights)
+            adaptive = intervals[str(loc)]
+            rows.append({
+                "locationId": str(loc),
+                "restockRate": round(self.history.rate(loc, hour), 3),
+                "subscribers": (weights or {}).get(str(loc), 1),
+                "interval": round(adaptive),
+                "latencyAdaptive": round(adaptive / 2, 1),
+                "latencyFixed": round(self.base_interval / 2, 1)
+            })
+            weighted_adaptive += rate * adaptive / 2
+            weighted_fixed += rate * self.base_interval / 2
+            total_rate += rate
+        return {
+            "hour": hour,
+            "budgetPerHour": round(self.budget_per_hour(locations, hour, weights), 1),
+            "fixedPerHour": round(self.fixed_budget(locations), 1),
+            "requestsPerHour": round(sum(3600 / i for i in intervals.values()), 1),
+            "expectedLatencyAdaptive": round(weighted_adaptive / total_rate, 1) if total_rate else None,
+            "expectedLatencyFixed": round(weighted_fixed / total_rate, 1) if total_rate else None,
+            "locations": rows
+        }
+
+def main():
+    from scheduler import BASE_INTERVAL, OPERATING_START_HOUR, OPERATING_END_HOUR
+
+    hour = None
+    for arg in sys.argv:
+        if arg.startswith("--hour="):
+            hour = int(arg.split("=")[1])
+
+    history = RestockHistory()
+    locations = sorted(history.stats) or ["201"]
+    hours = range(OPERATING_START_HOUR, OPERATING_END_HOUR)
+    policy = AdaptivePolicy(history, BASE_INTERVAL, hours=hours)
+
+    hours = [hour] if hour is not None else hours
+    for h in hours:
+        print(json.dumps(policy.report(locations, h), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+product.py - Compact typed product record
+- Dibuat sekali saat parse: gram (float), harga (int rupiah), stock (bool), key stabil
+- Downstream (server) cukup bandingkan angka, tidak perlu substring match judul
+- to_json(): dict kecil untuk dikirim ke server
+"""
+
+import re
+
+WEIGHT_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*(?:gram|gr|g)\b', re.IGNORECASE)
+PRICE_RE = re.compile(r'Rp\.?\s*([\d.,]+)', re.IGNORECASE)
+DIGITS_RE = re.compile(r'\d[\d.]*')
+KEY_RE = re.compile(r'[^a-z0-9]+')
+
+# Teks status yang kadang ikut ter-capture di kolom judul
+TITLE_NOISE = ('Belum tersedia',)
+
+def clean_title(title):
+    for noise in TITLE_NOISE:
+        title = title.replace(noise, '')
+    return title.strip()
+
+def parse_grams(text):
+    """'Emas Batangan 0,5 gram' -> 0.5, None jika tidak ada berat"""
+    match = WEIGHT_RE.search(text or '')
+    if not match:
+        return None
+    grams = float(match.group(1).replace(',', '.'))
+    return int(grams) if grams.is_integer() else grams
+
+def parse_price(text):
+    """'Rp 1.500.000 Harga(Belum termasuk pajak)' -> 1500000, None jika kosong"""
+    if not text:
+        return None
+    match = PRICE_RE.search(text) or DIGITS_RE.search(text)
+    if not match:
+        return None
+    # Format Indonesia: titik = ribuan, koma + 1-2 digit = sen (dibuang)
+    raw = match.group(1 if match.re is PRICE_RE else 0)
+    digits = re.sub(r',\d{1,2}$', '', raw).replace('.', '').replace(',', '')
+    return int(digits) if digits.isdigit() else None
+
+def product_key(title):
+    return KEY_RE.sub('-', title.lower()).strip('-')
+
+class Product:
+    __slots__ = ("key", "title", "grams", "price", "has_stock")
+
+    def __init__(self, title, price, has_stock, grams=None, key=None):
+        self.title = title
+        self.price = price          # int rupiah atau None
+        self.has_stock = has_stock
+        self.grams = grams
+        self.key = key or product_key(title)
+
+    @classmethod
+    def from_row(cls, title, price_text, has_stock):
+        """Row mentah dari parser -> record typed"""
+        title = clean_title(title)
+        return cls(title, parse_price(price_text), bool(has_stock), parse_grams(title))
+
+    def __eq__(self, other):
+        return isinstance(other, Product) and self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return f"Product({self.key!r}, {self.grams}g, {self.price}, stock={self.has_stock})"
+
+    def __getstate__(self):
+        return self.as_tuple()
+
+    def __setstate__(self, state):
+        self.key, self.title, self.grams, self.price, self.has_stock = state
+
+    def as_tuple(self):
+        return (self.key, self.title, self.grams, self.price, self.has_stock)
+
+    def to_json(self):
+        return {"key": self.key, "title": self.title, "gram": self.grams,
+                "price": self.price, "hasStock": self.has_stock}
+
+def products_json(products):
+    """List Product -> list dict untuk payload server / output CLI"""
+    return [p.to_json() if isinstance(p, Product) else p for p in products or []]
+
+def json_default(obj):
+    """json.dumps(default=...) untuk result yang berisi Product"""
+    if isinstance(obj, Product):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
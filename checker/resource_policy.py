@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+resource_policy.py - Blocking resource gold page yang dipelajari
+- NetworkStats: accounting lewat CDP (Network.*) per resource type:
+  jumlah request, bytes (encodedDataLength), waktu, jumlah yang di-block
+- ResourcePolicy: daftar blocked_urls = ALWAYS_BLOCKED + unit yang terbukti
+  tidak dibutuhkan untuk render .ct-body (stylesheet, tiap script)
+- Belajar: tiap plan mem-probe paling banyak satu unit baru (bytes terbesar dulu).
+  Sukses -> unit di-deny; gagal tapi fallback sukses -> unit di-allow
+- Policy terakhir yang sukses (lastGood) dipakai sebagai fallback probe,
+  jadi reload tanpa blocking sama sekali jarang terjadi
+- Load yang di-parse dari body dokumen (gold_capture.py) tidak menguji render:
+  hanya accounting (observe), tanpa verdict. Probe hanya di load live DOM
+
+Usage: python resource_policy.py [--reset]   (tampilkan / reset policy)
+"""
+
+import os, sys, json, threading
+from datetime import datetime
+
+POLICY_FILE = os.environ.get("RESOURCE_POLICY_FILE",
+                             os.path.join(os.path.dirname(__file__), 'resource_policy.json'))
+# POLICY_PROBE=0: pakai policy yang sudah dipelajari saja, tanpa probe unit baru
+PROBE_ENABLED = os.environ.get("POLICY_PROBE", "1") != "0"
+
+# Tidak pernah dibutuhkan untuk isi tabel product
+ALWAYS_BLOCKED = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.woff', '*.woff2', '*.ttf', '*.eot', '*.otf',
+    '*.mp4', '*.webm', '*.mp3', '*.wav',
+    '*google-analytics*', '*googletagmanager*', '*facebook*',
+    '*hotjar*', '*clarity*', '*doubleclick*',
+]
+STYLESHEET = "stylesheet"
+STYLESHEET_PATTERNS = ['*.css', '*.less', '*.scss', '*.sass']
+# Verdict awal: CSS sudah lama di-block, script belum diketahui (allow)
+DEFAULT_VERDICTS = {STYLESHEET: "deny"}
+
+_lock = threading.Lock()
+_policy = None
+
+def script_key(url):
+    """URL script tanpa query/fragment (unit yang di-probe)"""
+    return url.split('#')[0].split('?')[0]
+
+def unit_patterns(unit):
+    if unit == STYLESHEET:
+        return list(STYLESHEET_PATTERNS)
+    return [f"{unit}*"]
+
+# =====================================================
+# Network accounting (CDP)
+# =====================================================
+class NetworkStats:
+    """
+    Accounting request gold page lewat event CDP di driver tab DrissionPage.
+    Handler lama untuk event yang sama tetap dipanggil (chain).
+
+    Usage:
+        stats = NetworkStats(tab).start()
+        tab.get(GOLD_URL) ...
+        summary = stats.stop()
+    """
+
+    EVENTS = ('Network.requestWillBeSent', 'Network.responseReceived',
+              'Network.loadingFinished', 'Network.loadingFailed')
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.driver = getattr(tab, 'driver', None) or getattr(tab, '_driver', None)
+        self.requests = {}   # requestId -> {"url", "type", "start", "bytes", "ms", "status"}
+        self.previous = {}
+        self.lock = threading.Lock()
+        self.active = False
+
+    def start(self):
+        handlers = getattr(self.driver, 'event_handlers', None)
+        if self.driver is None or handlers is None:
+            return self
+        try:
+            self.tab.run_cdp('Network.enable')
+        except Exception:
+            return self
+        for event in self.EVENTS:
+            self.previous[event] = handlers.get(event)
+            self.driver.set_callback(event, self._handler(event))
+        self.active = True
+        return self
+
+    def stop(self):
+        """Lepas handler, returns summary (None jika CDP event tidak tersedia)"""
+        if not self.active:
+            return None
+        for event in self.EVENTS:
+            try:
+                self.driver.set_callback(event, self.previous.get(event))
+            except Exception:
+                pass
+        self.active = False
+        return self.summary()
+
+    def _handler(self, event):
+        on_event = {
+            'Network.requestWillBeSent': self._on_request,
+            'Network.responseReceived': self._on_response,
+            'Network.loadingFinished': self._on_finished,
+            'Network.loadingFailed': self._on_failed,
+        }[event]
+        previous = self.previous.get(event)
+
+        def handler(params=None, **kwargs):
+            params = params if isinstance(params, dict) else kwargs
+            try:
+                with self.lock:
+                    on_event(params)
+            except Exception:
+                pass
+            if previous:
+                previous(**params)
+        return handler
+
+    def _on_request(self, p):
+        self.requests[p['requestId']] = {
+            "url": p.get('request', {}).get('url', ''),
+            "type": p.get('type') or "Other",
+            "start": p.get('timestamp'),
+            "bytes": 0, "ms": 0, "status": "pending",
+        }
+
+    def _on_response(self, p):
+        entry = self.requests.get(p['requestId'])
+        if entry and p.get('type'):
+            entry["type"] = p['type']
+
+    def _done(self, p, status):
+        entry = self.requests.get(p['requestId'])
+        if entry is None:
+            return None
+        entry["status"] = status
+        if entry["start"] is not None and p.get('timestamp') is not None:
+            entry["ms"] = round((p['timestamp'] - entry["start"]) * 1000, 1)
+        return entry
+
+    def _on_finished(self, p):
+        entry = self._done(p, "ok")
+        if entry:
+            entry["bytes"] = int(p.get('encodedDataLength') or 0)
+
+    def _on_failed(self, p):
+        blocked = p.get('blockedReason') or 'BLOCKED_BY_CLIENT' in (p.get('errorText') or '')
+        self._done(p, "blocked" if blocked else "failed")
+
+    def summary(self):
+        """{"requests", "bytes", "blocked", "failed", "ms", "byType": {...}, "scripts": {url: bytes}}"""
+        with self.lock:
+            entries = list(self.requests.values())
+        by_type = {}
+        scripts = {}
+        for entry in entries:
+            row = by_type.setdefault(entry["type"], {"requests": 0, "bytes": 0, "blocked": 0, "ms": 0})
+            row["requests"] += 1
+            row["bytes"] += entry["bytes"]
+            row["ms"] = round(row["ms"] + entry["ms"], 1)
+            row["blocked"] += entry["status"] == "blocked"
+            if entry["type"] == "Script" and entry["status"] == "ok":
+                key = script_key(entry["url"])
+                scripts[key] = scripts.get(key, 0) + entry["bytes"]
+        return {
+            "requests": len(entries),
+            "bytes": sum(e["bytes"] for e in entries),
+            "blocked": sum(e["status"] == "blocked" for e in entries),
+            "failed": sum(e["status"] == "failed" for e in entries),
+            "ms": round(max((e["ms"] for e in entries), default=0), 1),
+            "byType": by_type,
+            "scripts": scripts,
+        }
+
+# =====================================================
+# Policy
+# =====================================================
+class Plan:
+    """Satu pilihan blocked_urls: unit yang di-deny + (opsional) satu unit probe"""
+
+    def __init__(self, denied, probe=None):
+        self.denied = list(denied)
+        self.probe = probe
+        self.patterns = list(ALWAYS_BLOCKED)
+        for unit in self.denied + ([probe] if probe else []):
+            self.patterns += unit_patterns(unit)
+
+    def as_dict(self):
+        return {"denied": self.denied, "probe": self.probe}
+
+class ResourcePolicy:
+    """
+    Per unit (STYLESHEET / URL script):
+      verdict - "deny" (tidak dibutuhkan), "allow" (dibutuhkan), None (belum di-probe)
+      ok      - jumlah run sukses dengan unit ini di-block
+      needed  - jumlah run gagal (dan fallback sukses) dengan unit ini di-block
+      bytes   - ukuran terakhir (dari NetworkStats), untuk urutan probe
+    """
+
+    def __init__(self, path=None):
+        self.path = path or POLICY_FILE
+        self.units = {}
+        self.last_good = None
+        self.runs = {"ok": 0, "fallback": 0, "failed": 0}
+        self.plans = 0   # jumlah plan() di proses ini, untuk probe tiap N load
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.units = data.get("units", {})
+            self.last_good = data.get("lastGood")
+            self.runs.update(data.get("runs", {}))
+        except (OSError, ValueError):
+            pass
+        for unit, verdict in DEFAULT_VERDICTS.items():
+            self.units.setdefault(unit, {"verdict": verdict, "ok": 0, "needed": 0, "bytes": 0})
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"units": self.units, "lastGood": self.last_good, "runs": self.runs,
+                           "updated": datetime.now().isoformat(timespec='seconds')}, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def denied(self):
+        return sorted(u for u, info in self.units.items() if info.get("verdict") == "deny")
+
+    def next_probe(self):
+        """Unit belum diketahui dengan bytes terbesar"""
+        unknown = [(info.get("bytes", 0), unit) for unit, info in self.units.items()
+                   if info.get("verdict") is None]
+        return max(unknown)[1] if unknown else None
+
+    def plan(self, probe=True, every=1):
+        """
+        probe=False: hanya unit yang sudah deny (load yang tidak menguji live DOM).
+        every: probe hanya di tiap plan() ke-N (0 = tidak pernah)
+        """
+        with _lock:
+            self.plans += 1
+            probing = probe and PROBE_ENABLED and every and self.plans % every == 0
+            return Plan(self.denied(), self.next_probe() if probing else None)
+
+    def fallback(self, plan):
+        """
+        Plan setelah plan gagal: lastGood jika yang gagal sedang probe,
+        selain itu tanpa blocking sama sekali ([]), seperti fallback lama.
+        """
+        with _lock:
+            if plan.probe and self.last_good is not None:
+                return Plan(self.last_good)
+            return None
+
+    def _update_bytes(self, stats):
+        """Bytes per unit dari NetworkStats.summary() (dipanggil dengan _lock)"""
+        if not stats:
+            return
+        for url, size in stats.get("scripts", {}).items():
+            info = self.units.setdefault(url, {"verdict": None, "ok": 0, "needed": 0, "bytes": 0})
+            info["bytes"] = size
+        css = stats.get("byType", {}).get("Stylesheet")
+        if css and css["bytes"]:
+            self.units[STYLESHEET]["bytes"] = css["bytes"]
+
+    def observe(self, stats):
+        """Load yang tidak menguji render (body dokumen): accounting saja, tanpa verdict"""
+        if not stats:
+            return
+        with _lock:
+            self._update_bytes(stats)
+            self.save()
+
+    def record(self, plan, ok, stats=None, fallback_ok=None):
+        """
+        Hasil satu load gold page dengan plan (live DOM).
+        ok: products >= MIN_PRODUCTS. fallback_ok: hasil reload fallback (None jika tidak ada).
+        Gagal dan fallback juga gagal -> tidak dihitung (kemungkinan masalah situs).
+        """
+        with _lock:
+            self._update_bytes(stats)
+
+            learned = plan.denied + ([plan.probe] if plan.probe else [])
+            if ok:
+                self.runs["ok"] += 1
+                for unit in learned:
+                    info = self.units.setdefault(unit, {"verdict": None, "ok": 0, "needed": 0, "bytes": 0})
+                    info["verdict"] = "deny"
+                    info["ok"] += 1
+                self.last_good = plan.denied + ([plan.probe] if plan.probe else [])
+            elif fallback_ok:
+                self.runs["fallback"] += 1
+                if plan.probe:
+                    # Probe penyebabnya: unit ini dibutuhkan
+                    info = self.units[plan.probe]
+                    info["verdict"] = "allow"
+                    info["needed"] += 1
+                else:
+                    # lastGood tidak lagi cukup: semua unit deny di-probe ulang satu per satu
+                    for unit in plan.denied:
+                        info = self.units[unit]
+                        info["verdict"] = None
+                        info["needed"] += 1
+                    self.last_good = None
+            else:
+                self.runs["failed"] += 1
+            self.save()
+
+    def report(self):
+        return {
+            "denied": self.denied(),
+            "allowed": sorted(u for u, info in self.units.items() if info.get("verdict") == "allow"),
+            "unknown": sorted(u for u, info in self.units.items() if info.get("verdict") is None),
+            "lastGood": self.last_good,
+            "runs": self.runs,
+        }
+
+def get_policy():
+    """Policy bersama satu proses (file dibaca sekali, POLICY_FILE saat pertama dipanggil)"""
+    global _policy
+    if _policy is None or _policy.path != POLICY_FILE:
+        _policy = ResourcePolicy(POLICY_FILE)
+    return _policy
+
+def main():
+    if "--reset" in sys.argv:
+        try:
+            os.remove(POLICY_FILE)
+        except OSError:
+            pass
+        print(f"Reset {POLICY_FILE}")
+        return
+    policy = get_policy()
+    print(json.dumps(policy.report(), indent=2))
+    for unit, info in sorted(policy.units.items(), key=lambda kv: -kv[1].get("bytes", 0)):
+        print(f"{str(info.get('verdict')):<6} {info.get('bytes', 0):>9} B  ok={info.get('ok', 0)} "
+              f"needed={info.get('needed', 0)}  {unit}")
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@
 scheduler.py - Local Scheduler untuk Antam Gold Stock Monitor
 - Runs every ~1 minute with random variation
 - Scrapes dengan scraper_ultrafast.py (~6-10 detik)
+- Warm browser (BrowserSession) dipakai ulang lintas run
+- Adaptive polling: interval per lokasi dari history restock (polling_policy.py)
+- Priority queue per lokasi (location_queue.py): hanya lokasi due yang di-scrape
+- Semua hasil scrape disimpan ke stock_history.db (history_store.py)
 - Sends data ke server API
 - Server handles Telegram notifications
 """
@@ -11,9 +15,16 @@ import os
 import sys
 import time
 import random
-import requests
 from datetime import datetime
 from pathlib import Path
+from snapshot import SnapshotTracker
+from stock_client import StockClient
+from polling_policy import RestockHistory, AdaptivePolicy
+from location_queue import LocationQueue
+from location_source import LocationSource
+from history_store import HistoryStore
+from spans import record_post
+from scraper_ultrafast import resolve_storage_id
 
 # Load .env from server directory
 def load_env():
@@ -34,17 +45,37 @@ load_env()
 SERVER_URL = os.environ.get("SERVER_URL", "http://localhost:3000")
 CHECKER_SECRET = os.environ.get("CHECKER_SECRET", "")
 
-# Default locations (fallback jika server tidak tersedia)
+# Jumlah tab paralel untuk batch scrape (1 = sequential)
+SCRAPE_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", "1"))
+
+# Default locations (fallback jika server belum pernah bisa dihubungi)
 DEFAULT_LOCATIONS = ["bandung"]
 
 # Interval (dalam detik)
 BASE_INTERVAL = 100  # 100 detik (~1.5 menit)
 RANDOM_VARIATION = 30  # +/- 30 detik
 
+# Maksimal lokasi per run (sisanya tetap di queue, tidak ada full sweep)
+SCRAPE_MAX_BATCH = int(os.environ.get("SCRAPE_MAX_BATCH", "20"))
+
+# 1 = interval per lokasi dari history restock, 0 = semua lokasi tiap BASE_INTERVAL
+ADAPTIVE_POLLING = os.environ.get("ADAPTIVE_POLLING", "1") == "1"
+
 # Operating hours (jam operasi) - 0-24 untuk disable
 OPERATING_START_HOUR = 8   # Disabled for testing
 OPERATING_END_HOUR = 20    # Disabled for testing
 
+# Hash snapshot terakhir per lokasi (skip full POST jika tidak berubah)
+snapshots = SnapshotTracker()
+
+# History transisi hasStock per lokasi/jam + policy interval (budget = policy fixed)
+restock_history = RestockHistory()
+polling = AdaptivePolicy(restock_history, BASE_INTERVAL,
+                         hours=range(OPERATING_START_HOUR, OPERATING_END_HOUR))
+
+# Jadwal per lokasi (heap next_due)
+location_queue = LocationQueue()
+
 # =====================================================
 def log(msg):
     ts = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
@@ -55,6 +86,13 @@ def log(msg):
         safe_msg = msg.encode('ascii', 'replace').decode('ascii')
         print(f"[{ts}] {safe_msg}")
 
+# Pooled HTTP client ke server (batch per sweep, fallback per-lokasi)
+client = StockClient(SERVER_URL, CHECKER_SECRET, log=log)
+
+# Location list + jumlah subscriber per lokasi (cache TTL + ETag)
+location_source = LocationSource(SERVER_URL, CHECKER_SECRET, defaults=DEFAULT_LOCATIONS,
+                                 session=client.session, log=log)
+
 def is_within_operating_hours():
     """Check if current time is within operating hours (08:00 - 20:00)"""
     current_hour = datetime.now().hour
@@ -75,89 +113,120 @@ def get_next_operating_time():
     return int((next_start - now).total_seconds())
 
 def get_locations_from_server():
-    """Fetch active locations dari server API"""
+    """Active locations dari server (cache TTL + ETag, server down -> list terakhir)"""
+    locations = location_source.get()
+    # Subscriber baru -> full update (heartbeat tidak memicu notifikasi di server)
+    snapshots.update_subscribers(location_source.subscribers, location_source.subscriber_sets)
+    return locations
+
+def create_browser_session():
+    """Warm browser milik scheduler (None jika DrissionPage tidak tersedia)"""
     try:
-        url = f"{SERVER_URL}/api/checker/locations"
-        
-        headers = {}
-        if CHECKER_SECRET:
-            headers["Authorization"] = f"Bearer {CHECKER_SECRET}"
-        
-        resp = requests.get(url, headers=headers, timeout=10)
-        
-        if resp.status_code == 200:
-            data = resp.json()
-            locations = data.get("locations", [])
-            if locations:
-                log(f"📍 Locations from server: {locations}")
-                return locations
-        
-        log(f"⚠️ Server returned {resp.status_code}, using defaults")
-        return DEFAULT_LOCATIONS
-        
-    except requests.exceptions.ConnectionError:
-        log(f"⚠️ Cannot connect to server, using defaults")
-        return DEFAULT_LOCATIONS
+        from browser_session import BrowserSession
+        from scraper_ultrafast import create_browser_options, setup_page
+        return BrowserSession(create_browser_options, setup=setup_page)
+    except ImportError as e:
+        log(f"⚠️ Warm browser disabled: {e}")
+        return None
+
+def get_warm_page(session):
+    """Health check + relaunch jika perlu. None -> scraper launch browser sendiri"""
+    if session is None:
+        return None
+    try:
+        return session.ensure()
     except Exception as e:
-        log(f"⚠️ Error fetching locations: {e}")
-        return DEFAULT_LOCATIONS
+        log(f"⚠️ Browser launch error: {e}")
+        return None
+
+def warm_page_getter(session):
+    """get_warm_page yang ditunda: dipanggil scrape() hanya jika HTTP fast path gagal"""
+    def get_page():
+        page = get_warm_page(session)
+        return page, (session.state if page else None)
+    return get_page
 
-def run_scraper(location):
+def run_scraper(location, page=None, state=None, get_page=None):
     try:
         from scraper_ultrafast import scrape
-        result = scrape(location)
+        result = scrape(location, page=page, state=state, get_page=get_page)
         return result
     except Exception as e:
         log(f"❌ Error: {e}")
         return {"error": str(e)}
 
-def run_scraper_batch(locations):
+def run_scraper_batch(locations, page=None, state=None):
     """Run scraper for multiple locations in one browser session (faster)"""
     try:
         from scraper_ultrafast import scrape_multiple
-        results = scrape_multiple(locations)
+        results = scrape_multiple(locations, page=page, concurrency=SCRAPE_CONCURRENCY, state=state)
         return results
     except Exception as e:
         log(f"❌ Batch scrape error: {e}")
         return [{"error": str(e)}]
 
-def send_to_server(location, location_id, stock_data):
+def open_history_store():
+    """Local history store (None jika db tidak bisa dibuka, scheduler tetap jalan)"""
     try:
-        url = f"{SERVER_URL}/api/stock/update"
-        
-        payload = {
-            "locationId": location_id,
-            "locationName": location.capitalize(),
-            "stockData": {
-                "hasStock": stock_data.get("hasStock", False),
-                "availableProducts": stock_data.get("availableProducts", []),
-                "allProducts": stock_data.get("allProducts", []),  # Include all products
-                "totalProducts": stock_data.get("totalProducts", 0),
-                "timestamp": stock_data.get("timestamp"),
-                "checkedCount": stock_data.get("totalProducts", 0)  # For client display
-            }
-        }
-        
-        if CHECKER_SECRET:
-            payload["secret"] = CHECKER_SECRET
-        
-        resp = requests.post(url, json=payload, timeout=30)
-        
-        if resp.status_code == 200:
-            result = resp.json()
-            notified = result.get("data", {}).get("notified", 0)
-            log(f"✅ Server: {notified} users notified")
-            return True
-        else:
-            log(f"⚠️ Server: {resp.status_code}")
-            return False
-            
-    except requests.exceptions.ConnectionError:
-        log(f"❌ Cannot connect to {SERVER_URL}")
-        return False
+        return HistoryStore()
+    except Exception as e:
+        log(f"⚠️ History store disabled: {e}")
+        return None
+
+history_store = open_history_store()
+
+def record_results(results):
+    """Catat hasStock tiap lokasi yang sukses ke restock history + append semua hasil ke history store"""
+    for result in results:
+        # locationId dari storage_id yang benar-benar di-scrape, bukan nama yang di-echo
+        if result.get("error") or not result.get("locationId"):
+            continue
+        restock_history.observe(result["locationId"], result.get("hasStock", False))
+    try:
+        restock_history.save()
     except Exception as e:
-        log(f"❌ Server error: {e}")
-        return False
+        log(f"⚠️ Gagal simpan restock history: {e}")
+
+    if history_store is None:
+        return
+    try:
+        for result in results:
+            history_store.record(result)
+        history_store.maybe_compact()
+    except Exception as e:
+        log(f"⚠️ Gagal simpan history: {e}")
+
+def reschedule(locations, checked, results):
+    """
+    Masukkan lagi lokasi yang baru di-cek ke queue (gagal / tidak ada hasil -> backoff).
+    Sukses dicocokkan lewat locationId hasil vs storage_id lokasi yang diminta.
+    """
+    ok = {str(r["locationId"]) for r in results if not r.get("error") and r.get("locationId")}
+    if ADAPTIVE_POLLING:
+        intervals = polling.intervals(locations, weights=location_source.subscribers)
+    else:
+        intervals = {}
+    for location in checked:
+        interval = intervals.get(str(location), BASE_INTERVAL)
+        location_id = resolve_storage_id(location) or str(location)
+        # Interval adaptive sudah diberi bobot subscriber, BASE_INTERVAL belum
+        location_queue.complete(location, location_id in ok, interval,
+                                weighted=str(location) not in intervals)
+
+def next_sleep():
+    """Detik sampai lokasi berikutnya due (max BASE_INTERVAL supaya list lokasi tetap fresh)"""
+    wait = location_queue.seconds_until_next()
+    if wait is None:
+        interval = BASE_INTERVAL + random.randint(-RANDOM_VARIATION, RANDOM_VARIATION)
+        return max(30, interval)
+    return int(min(BASE_INTERVAL, max(15, wait)))
+
+def log_policy_report(locations):
+    """Expected detection latency adaptive vs fixed untuk jam sekarang"""
+    report = polling.report(locations, weights=location_source.subscribers)
+    log(f"📈 Jam {report['hour']:02d}: latency ~{report['expectedLatencyAdaptive']}s adaptive "
+        f"vs ~{report['expectedLatencyFixed']}s fixed "
+        f"({report['requestsPerHour']} vs {report['fixedPerHour']} req/jam)")
 
 def main():
     log("=" * 50)
@@ -165,11 +234,23 @@ def main():
     log("=" * 50)
     log("Locations: Dynamic (from server)")
     log(f"Interval: {BASE_INTERVAL}s ± {RANDOM_VARIATION}s")
+    log(f"Adaptive polling: {'ON' if ADAPTIVE_POLLING else 'OFF'}")
     log(f"Operating Hours: {OPERATING_START_HOUR:02d}:00 - {OPERATING_END_HOUR:02d}:00")
     log(f"Server: {SERVER_URL}")
+    log(f"Concurrency: {SCRAPE_CONCURRENCY} tab(s)")
     log("=" * 50)
     
+    session = create_browser_session()
+    
+    try:
+        run_loop(session)
+    finally:
+        if session:
+            session.quit()
+
+def run_loop(session):
     run_count = 0
+    report_hour = None
     
     while True:
         # Check if within operating hours
@@ -179,21 +260,35 @@ def main():
             wait_minutes = (wait_seconds % 3600) // 60
             log(f"💤 Di luar jam operasi ({OPERATING_START_HOUR:02d}:00 - {OPERATING_END_HOUR:02d}:00)")
             log(f"⏳ Menunggu {wait_hours}j {wait_minutes}m sampai jam {OPERATING_START_HOUR:02d}:00...")
+            # Jangan tahan browser idle semalaman
+            if session:
+                session.quit()
             time.sleep(wait_seconds)
             continue
         
         run_count += 1
+        snapshots.reset_stats()
         log(f"\n--- Run #{run_count} ---")
         
-        # Fetch locations from server setiap run
+        # Locations dari cache (refresh ke server tiap LOCATIONS_TTL, 304 jika tidak berubah)
         locations = get_locations_from_server()
+        # Hanya lokasi yang sudah due, paling urgent dulu (overdue terlama, subscriber terbanyak)
+        location_queue.sync(locations, location_source.subscribers)
+        due = location_queue.pop_due(limit=SCRAPE_MAX_BATCH)
+        if ADAPTIVE_POLLING and locations and datetime.now().hour != report_hour:
+            report_hour = datetime.now().hour
+            log_policy_report(locations)
+        results = []
         
         if not locations:
             log("⚠️ No locations to check, skipping...")
-        elif len(locations) == 1:
+        elif not due:
+            log("⏭️ Belum ada lokasi yang due")
+        elif len(due) == 1:
             # Single location - use standard scraper
-            location = locations[0]
-            result = run_scraper(location)
+            location = due[0]
+            result = run_scraper(location, get_page=warm_page_getter(session))
+            results = [result]
             
             if result.get("error"):
                 log(f"❌ {location}: {result.get('error')}")
@@ -204,17 +299,19 @@ def main():
                 
                 log(f"📊 {location}: {available}/{total} ({elapsed}s)")
                 
-                location_id = result.get("locationId", "BDH01")
-                send_to_server(location, location_id, result)
+                post_started = time.time()
+                client.send_sweep([result], snapshots)
+                record_post([result], time.time() - post_started)
                 
                 if available > 0:
                     log(f"🔔 STOCK TERSEDIA:")
                     for p in result.get("availableProducts", []):
-                        log(f"   - {p.get('title')}")
+                        log(f"   - {p.title}")
         else:
             # Multiple locations - use batch scraper (more efficient!)
-            log(f"🚀 Batch scraping {len(locations)} locations...")
-            results = run_scraper_batch(locations)
+            log(f"🚀 Batch scraping {len(due)}/{len(locations)} locations...")
+            page = get_warm_page(session)
+            results = run_scraper_batch(due, page=page, state=session.state if page else None)
             
             for result in results:
                 if result.get("error"):
@@ -229,19 +326,26 @@ def main():
                 
                 log(f"📊 {location}: {available}/{total} ({elapsed}s)")
                 
-                # Send to server
-                location_id = result.get("locationId", "BDH01")
-                send_to_server(location, location_id, result)
-                
                 # Jika ada stock, log products
                 if available > 0:
                     log(f"🔔 STOCK TERSEDIA:")
                     for p in result.get("availableProducts", []):
-                        log(f"   - {p.get('title')}")
+                        log(f"   - {p.title}")
         
-        # Next interval
-        interval = BASE_INTERVAL + random.randint(-RANDOM_VARIATION, RANDOM_VARIATION)
-        interval = max(30, interval)
+            # Send whole sweep to server (satu request)
+            post_started = time.time()
+            client.send_sweep(results, snapshots)
+            record_post(results, time.time() - post_started)
+        
+        log(f"📨 {snapshots.summary()}")
+        
+        if results:
+            record_results(results)
+        reschedule(locations, due, results)
+        log(f"🗂️ Queue: {location_queue.summary()}")
+        
+        # Next interval: sampai lokasi berikutnya due
+        interval = next_sleep()
         
         log(f"\n⏳ Next in {interval}s...")
         time.sleep(interval)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+scheduler_async.py - asyncio Scheduler (scrape, parse dan server I/O overlap)
+- Hasil tiap lokasi langsung di-POST begitu selesai di-scrape,
+  sementara lokasi berikutnya sudah loading di browser
+- Fetch lokasi + POST server tidak memblok event loop (thread pool)
+- Waktu per stage + freshness (scrape selesai -> server ack) per lokasi
+- Lokasi due dari LocationQueue yang sama dengan scheduler.py; gagal (termasuk
+  error satu batch penuh tanpa location) -> reschedule dengan backoff
+
+Usage: python scheduler_async.py
+"""
+
+import sys
+import time
+import asyncio
+
+from scheduler import (
+    log, client, snapshots, get_locations_from_server,
+    create_browser_session, get_warm_page,
+    is_within_operating_hours, get_next_operating_time,
+    location_queue, location_source, record_results, reschedule, next_sleep,
+    SERVER_URL, SCRAPE_CONCURRENCY, SCRAPE_MAX_BATCH, BASE_INTERVAL, RANDOM_VARIATION,
+    OPERATING_START_HOUR, OPERATING_END_HOUR
+)
+from spans import record_post
+
+class StageTimer:
+    """Total detik per stage + freshness per lokasi untuk satu run"""
+
+    def __init__(self):
+        self.stages = {}
+        self.freshness = []
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+    def summary(self):
+        parts = [f"{name} {secs:.1f}s" for name, secs in self.stages.items()]
+        if self.freshness:
+            avg = sum(self.freshness) / len(self.freshness)
+            parts.append(f"freshness avg {avg:.2f}s max {max(self.freshness):.2f}s")
+        return " | ".join(parts)
+
+async def scrape_stage(locations, page, state, queue, timer):
+    """
+    Scrape di thread, tiap hasil langsung masuk queue (tidak tunggu batch selesai).
+    Returns error batch penuh (hasil tanpa location, tidak lewat on_result)
+    """
+    from scraper_ultrafast import scrape_multiple
+
+    loop = asyncio.get_running_loop()
+
+    def on_result(result):
+        result["_scrapedAt"] = time.time()
+        loop.call_soon_threadsafe(queue.put_nowait, result)
+
+    start = time.time()
+    try:
+        returned = await asyncio.to_thread(
+            scrape_multiple, locations, page=page, concurrency=SCRAPE_CONCURRENCY,
+            state=state, on_result=on_result
+        )
+        failures = [r for r in returned or [] if r.get("error") and not r.get("location")]
+    except Exception as e:
+        failures = [{"error": str(e)}]
+    finally:
+        timer.add("scrape", time.time() - start)
+        await queue.put(None)
+    for failure in failures:
+        log(f"❌ Batch scrape error ({len(locations)} lokasi): {failure['error']}")
+    return failures
+
+async def post_stage(queue, timer):
+    """Consume queue: POST tiap lokasi begitu tersedia. Returns semua hasil per lokasi"""
+    results = []
+    while True:
+        result = await queue.get()
+        if result is None:
+            break
+
+        results.append(result)
+        location = result.get("location", "unknown")
+        if result.get("error"):
+            log(f"❌ {location}: {result.get('error')}")
+            continue
+
+        scraped_at = result.pop("_scrapedAt", time.time())
+        total = result.get("totalProducts", 0)
+        available = len(result.get("availableProducts", []))
+        log(f"📊 {location}: {available}/{total} ({result.get('elapsedSeconds', 0)}s)")
+
+        start = time.time()
+        await asyncio.to_thread(
+            client.send_update, snapshots, location, result.get("locationId", ""), result
+        )
+        done = time.time()
+        timer.add("post", done - start)
+        record_post([result], done - start)
+        timer.freshness.append(done - scraped_at)
+
+        if available > 0:
+            log(f"🔔 STOCK TERSEDIA:")
+            for p in result.get("availableProducts", []):
+                log(f"   - {p.title}")
+    return results
+
+async def run_once(session, timer):
+    start = time.time()
+    locations = await asyncio.to_thread(get_locations_from_server)
+    timer.add("locations", time.time() - start)
+
+    if not locations:
+        log("⚠️ No locations to check, skipping...")
+        return
+
+    location_queue.sync(locations, location_source.subscribers)
+    due = location_queue.pop_due(limit=SCRAPE_MAX_BATCH)
+    if not due:
+        log("⏭️ Belum ada lokasi yang due")
+        return
+
+    log(f"🚀 Scraping {len(due)}/{len(locations)} locations (streaming ke server)...")
+    page = await asyncio.to_thread(get_warm_page, session)
+    state = session.state if page else None
+
+    queue = asyncio.Queue()
+    failures, results = await asyncio.gather(
+        scrape_stage(due, page, state, queue, timer),
+        post_stage(queue, timer)
+    )
+    if results:
+        await asyncio.to_thread(record_results, results)
+    # Error batch penuh tidak punya locationId -> semua lokasi due dianggap gagal (backoff)
+    reschedule(locations, due, results + failures)
+    log(f"🗂️ Queue: {location_queue.summary()}")
+
+async def main_async():
+    log("=" * 50)
+    log("ANTAM GOLD STOCK MONITOR (asyncio)")
+    log("=" * 50)
+    log(f"Interval: {BASE_INTERVAL}s ± {RANDOM_VARIATION}s")
+    log(f"Operating Hours: {OPERATING_START_HOUR:02d}:00 - {OPERATING_END_HOUR:02d}:00")
+    log(f"Server: {SERVER_URL}")
+    log("=" * 50)
+
+    session = create_browser_session()
+    run_count = 0
+
+    try:
+        while True:
+            if not is_within_operating_hours():
+                wait_seconds = get_next_operating_time()
+                log(f"💤 Di luar jam operasi, tunggu {wait_seconds // 3600}j {(wait_seconds % 3600) // 60}m")
+                if session:
+                    session.quit()
+                await asyncio.sleep(wait_seconds)
+                continue
+
+            run_count += 1
+            snapshots.reset_stats()
+            log(f"\n--- Run #{run_count} ---")
+
+            timer = StageTimer()
+            start = time.time()
+            await run_once(session, timer)
+            timer.add("total", time.time() - start)
+
+            log(f"⏱️ {timer.summary()}")
+            log(f"📨 {snapshots.summary()}")
+
+            # Sampai lokasi berikutnya due
+            interval = next_sleep()
+
+            log(f"\n⏳ Next in {interval}s...")
+            await asyncio.sleep(interval)
+    finally:
+        if session:
+            session.quit()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        log("\n\n👋 Stopped")
+        sys.exit(0)
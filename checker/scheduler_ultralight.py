@@ -7,11 +7,14 @@ import os
 import sys
 import time
 import random
-import requests
 import signal
 import gc
 from datetime import datetime, timedelta
 from pathlib import Path
+from snapshot import SnapshotTracker
+from stock_client import StockClient
+from location_source import LocationSource
+from spans import record_post
 
 def load_env():
     env_path = Path(__file__).parent.parent / "server" / ".env"
@@ -35,6 +38,7 @@ OPERATING_START_HOUR = 8
 OPERATING_END_HOUR = 20
 
 shutdown_requested = False
+snapshots = SnapshotTracker()
 
 def log(msg):
     ts = datetime.now().strftime("%H:%M:%S")
@@ -43,6 +47,11 @@ def log(msg):
     except:
         print(f"[{ts}] {msg.encode('ascii','ignore').decode()}", flush=True)
 
+# Pooled HTTP client ke server (batch per sweep, fallback per-lokasi)
+client = StockClient(SERVER_URL, CHECKER_SECRET, log=log)
+location_source = LocationSource(SERVER_URL, CHECKER_SECRET, defaults=DEFAULT_LOCATIONS,
+                                 session=client.session, log=log)
+
 def signal_handler(signum, frame):
     global shutdown_requested
     log("Shutdown...")
@@ -65,54 +74,10 @@ def get_next_operating_time():
     return int((next_start - now).total_seconds())
 
 def get_locations_from_server():
-    try:
-        url = f"{SERVER_URL}/api/checker/locations"
-        headers = {}
-        if CHECKER_SECRET:
-            headers["Authorization"] = f"Bearer {CHECKER_SECRET}"
-        
-        resp = requests.get(url, headers=headers, timeout=10)
-        
-        if resp.status_code == 200:
-            data = resp.json()
-            locations = data.get("locations", [])
-            if locations:
-                return locations
-        
-        return DEFAULT_LOCATIONS
-    except:
-        return DEFAULT_LOCATIONS
-
-def send_to_server(location, location_id, stock_data):
-    try:
-        url = f"{SERVER_URL}/api/stock/update"
-        
-        payload = {
-            "locationId": location_id,
-            "locationName": location.capitalize(),
-            "stockData": {
-                "hasStock": stock_data.get("hasStock", False),
-                "availableProducts": stock_data.get("availableProducts", []),
-                "allProducts": stock_data.get("allProducts", []),
-                "totalProducts": stock_data.get("totalProducts", 0),
-                "timestamp": stock_data.get("timestamp"),
-                "checkedCount": stock_data.get("totalProducts", 0)
-            }
-        }
-        
-        if CHECKER_SECRET:
-            payload["secret"] = CHECKER_SECRET
-        
-        resp = requests.post(url, json=payload, timeout=30)
-        
-        if resp.status_code == 200:
-            result = resp.json()
-            notified = result.get("data", {}).get("notified", 0)
-            log(f"✓ {notified} notified")
-            return True
-        return False
-    except:
-        return False
+    locations = location_source.get()
+    # Subscriber baru -> full update (heartbeat tidak memicu notifikasi di server)
+    snapshots.update_subscribers(location_source.subscribers, location_source.subscriber_sets)
+    return locations
 
 def main():
     log("="*50)
@@ -121,6 +86,16 @@ def main():
     log(f"Interval: {BASE_INTERVAL}s ± {RANDOM_VARIATION}s")
     log("="*50)
     
+    # Chromium sisa run sebelumnya yang crash (owner mati)
+    try:
+        import chrome_process
+        from scraper_ultralight import PROFILE_DIR
+        reaped = chrome_process.reap_orphans(PROFILE_DIR)
+        if reaped:
+            log(f"Reaped {reaped} orphan Chromium")
+    except Exception as e:
+        log(f"Orphan sweep gagal: {e}")
+    
     run_count = 0
     
     while not shutdown_requested:
@@ -137,6 +112,7 @@ def main():
             continue
         
         run_count += 1
+        snapshots.reset_stats()
         log(f"\n--- Run #{run_count} ---")
         
         locations = get_locations_from_server()
@@ -165,19 +141,23 @@ def main():
                         
                         log(f"📊 {location} [{location_id}]: {available}/{total} ({elapsed}s)")
                         
-                        send_to_server(location, location_id, result)
-                        
                         if available > 0:
                             log(f"📢 STOCK available!")
                             for p in result.get("availableProducts", [])[:3]:
-                                log(f"   {p.get('title')}")
+                                log(f"   {p.title}")
                 
+                # Send whole sweep to server (satu request)
+                post_started = time.time()
+                client.send_sweep(results, snapshots)
+                record_post(results, time.time() - post_started)
                 gc.collect()
                 
             except Exception as e:
                 log(f"Scraper error: {e}")
                 gc.collect()
         
+        log(f"📨 {snapshots.summary()}")
+        
         interval = BASE_INTERVAL + random.randint(-RANDOM_VARIATION, RANDOM_VARIATION)
         interval = max(30, interval)
         
@@ -1,22 +1,57 @@
 #!/usr/bin/env python3
 """
 scraper_ultrafast.py - Ultra-Fast Scraper with Traffic Handling
-- Block images/fonts/analytics only, keep CSS
+- HTTP fast path (requests + saved_cookies.json), fallback ke Chromium
+- Blocking gold page dari resource_policy.py (CSS/script yang dipelajari, bukan list tetap)
+- Network accounting per resource type (CDP) di result["network"]
+- Gold page: body dokumen diambil dari CDP dan di-parse langsung (gold_capture.py),
+  live DOM hanya jika row kurang dari yang diharapkan
 - Retry logic untuk high traffic (up to 3 retries)
 - Extended timeout untuk slow response
+- --record / --replay: rekam session ke archive, replay offline (net_replay.py)
+- Timing per fase (spans.py) di result["spans"] + SPAN_LOG
 """
 
-import sys, os, time, json
+import sys, os, time, json, threading
 from datetime import datetime
-from bs4 import BeautifulSoup
+from parsers import get_parser, read_products
+from product import json_default
+import net_replay
+from spans import SpanTimer, record as record_spans
+from resource_policy import NetworkStats, get_policy
+from gold_capture import GoldCapture, stop_loading
+from page_ready import ReadyReport, wait_selector, wait_navigation, wait_rows_stable, wait_network_idle
 
 PROFILE_DIR = os.path.join(os.path.dirname(__file__), 'browser_profile')
+# Runtime data (session cookies), tidak di-commit (.gitignore)
+COOKIES_FILE = os.environ.get("COOKIES_FILE",
+                              os.path.join(os.path.dirname(__file__), 'saved_cookies.json'))
 LOCATION_URL = "https://www.logammulia.com/id/change-location"
 GOLD_URL = "https://www.logammulia.com/id/purchase/gold"
 
 # Timeout settings
 ELEMENT_TIMEOUT = 10  # Timeout untuk wait element (naik dari 5)
 MAX_RETRIES = 3       # Max retry jika 0 products
+MIN_PRODUCTS = 5      # Minimal products supaya hasil dianggap valid
+# network: parse body dokumen gold page dari CDP; dom: selalu tunggu live DOM
+GOLD_CAPTURE = os.environ.get("GOLD_CAPTURE", "network")
+# GOLD_CAPTURE=network: tiap N load gold page satu load lewat live DOM dengan probe,
+# supaya resource policy tetap belajar unit baru (0 = tidak pernah probe)
+PROBE_EVERY = int(os.environ.get("POLICY_PROBE_EVERY", "10"))
+
+# HTTP fast path (tanpa browser)
+HTTP_TIMEOUT = 15
+HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "id-ID,id;q=0.9,en;q=0.8",
+}
+# Satu requests.Session untuk semua fetch_gold_http (connection pool + TLS keep-alive lintas run)
+_http = None
+_http_lock = threading.Lock()
+# Marker halaman challenge / block (Cloudflare, captcha)
+BLOCK_MARKERS = ('cf-chl', 'challenge-platform', 'just a moment', 'captcha', 'access denied')
 
 LOCATION_ID_MAP = {
     # Jakarta
@@ -67,187 +102,378 @@ def log(msg):
     ts = datetime.now().strftime("%d/%m/%Y, %H.%M.%S")
     print(f"[{ts}] {msg}", file=sys.stderr)
 
-def parse_products(html):
-    soup = BeautifulSoup(html, 'lxml')
-    products = []
+def parse_products(html, backend=None):
+    """Parse product table (backend: PARSER_BACKEND - bs4 / lxml / stream)"""
+    return get_parser(backend)(html)
+
+def worker_profile_dir(worker_id):
+    """
+    Profile dir khusus worker (browser_profile_w1, _w2, ...).
+    Di-seed sekali dari PROFILE_DIR supaya cookies/clearance ikut terbawa.
+    """
+    import shutil
     
-    for row in soup.select('.ct-body .ctr'):
+    path = f"{PROFILE_DIR}_w{worker_id}"
+    if not os.path.isdir(path) and os.path.isdir(PROFILE_DIR):
         try:
-            col = row.select_one('.ctd.item-1 .ngc-text')
-            if not col: continue
-            
-            title = col.get_text(strip=True).split('\n')[0]
-            if 'perak' in title.lower() or 'silver' in title.lower():
-                continue
-            if not any(x in title.lower() for x in ['emas', 'batangan', 'gram']):
-                continue
-            
-            price = row.select_one('.ctd.item-2')
-            price = price.get_text(strip=True) if price else ""
-            has_stock = not row.select_one('span.no-stock')
-            
-            products.append({"title": title, "price": price, "hasStock": has_stock})
-        except:
-            continue
+            shutil.copytree(PROFILE_DIR, path, ignore=shutil.ignore_patterns(
+                'Singleton*', '*Cache*', 'Crashpad', 'lockfile'))
+        except Exception as e:
+            log(f"⚠️ Seed profile w{worker_id} gagal: {e}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def create_browser_options(profile_dir=PROFILE_DIR):
+    """ChromiumOptions standar (hidden window, speed flags, profile_dir)"""
+    from DrissionPage import ChromiumOptions
     
-    return products
+    os.makedirs(profile_dir, exist_ok=True)
+    
+    opts = ChromiumOptions()
+    # Standard flags
+    opts.set_argument('--disable-blink-features=AutomationControlled')
+    opts.set_argument('--lang=id-ID')
+    opts.set_argument('--no-sandbox')
+    opts.set_argument('--disable-dev-shm-usage')
+    opts.set_argument('--disable-gpu')
+    
+    # HIDE BROWSER WINDOW - Position off-screen
+    opts.set_argument('--window-position=-2400,-2400')
+    opts.set_argument('--window-size=1,1')
+    
+    # SPEED OPTIMIZATION FLAGS
+    opts.set_argument('--disable-extensions')
+    opts.set_argument('--disable-plugins')
+    opts.set_argument('--disable-sync')
+    opts.set_argument('--disable-translate')
+    opts.set_argument('--disable-background-networking')
+    opts.set_argument('--disable-default-apps')
+    opts.set_argument('--disable-hang-monitor')
+    opts.set_argument('--disable-popup-blocking')
+    opts.set_argument('--disable-prompt-on-repost')
+    opts.set_argument('--disable-client-side-phishing-detection')
+    opts.set_argument('--disable-component-update')
+    opts.set_argument('--no-first-run')
+    opts.set_argument('--no-default-browser-check')
+    
+    for arg in net_replay.browser_arguments():
+        opts.set_argument(arg)
+    
+    opts.set_user_data_path(profile_dir)
+    opts.auto_port()
+    
+    return opts
+
+def setup_page(page):
+    """Setting page standar untuk warm browser (BrowserSession)"""
+    page.set.window.size(800, 600)
+    page.set.load_mode.eager()
+
+def resolve_storage_id(location):
+    """locationId ("201") atau city name ("bandung") -> storage_id, None jika tidak dikenal"""
+    location_str = str(location)
+    if location_str in LOCATION_ID_MAP:
+        return location_str
+    if location_str.lower() in LOCATION_MAP:
+        return LOCATION_MAP[location_str.lower()][0]
+    return None
+
+def load_saved_cookies():
+    """Load saved_cookies.json -> (storage_id, cookies, user_agent). (None, [], None) jika tidak ada"""
+    try:
+        with open(COOKIES_FILE, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None, [], None
+    storage_id = data.get("locationId") or resolve_storage_id(data.get("location", ""))
+    return storage_id, data.get("cookies", []), data.get("userAgent")
+
+def save_cookies(location, storage_id, cookies, user_agent=None):
+    """
+    Simpan cookies browser supaya run berikutnya bisa pakai HTTP fast path.
+    user_agent: UA browser yang mendapat cookies (challenge cookie terikat ke UA)
+    """
+    try:
+        data = {
+            "location": str(location),
+            "locationId": storage_id,
+            "userAgent": user_agent,
+            "cookies": [
+                {"name": c.get("name"), "value": c.get("value"), "domain": c.get("domain", ".logammulia.com")}
+                for c in cookies if c.get("name")
+            ],
+            "saved_at": datetime.now().isoformat()
+        }
+        with open(COOKIES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    except Exception as e:
+        log(f"⚠️ Gagal simpan cookies: {e}")
+
+def http_session():
+    """requests.Session milik module, dibuat sekali dengan HTTP_HEADERS"""
+    global _http
+    if _http is None:
+        import requests
+        _http = requests.Session()
+        _http.headers.update(HTTP_HEADERS)
+    return _http
+
+def fetch_gold_http(storage_id):
+    """
+    GET GOLD_URL pakai http_session() + saved cookies (tanpa Chromium).
+    Returns (html, reason) - html None jika tidak bisa dipakai.
+    """
+    try:
+        import requests
+    except ImportError:
+        return None, "requests not installed"
+    
+    saved_id, cookies, user_agent = load_saved_cookies()
+    if not cookies:
+        return None, "no saved cookies"
+    # Cookie session terikat ke satu lokasi (geoloc_storage_id)
+    if saved_id != storage_id:
+        return None, f"cookies untuk lokasi {saved_id}"
+    
+    jar = requests.cookies.RequestsCookieJar()
+    for c in cookies:
+        jar.set(c["name"], c["value"], domain=c.get("domain", ".logammulia.com"))
+    geoloc = jar.get("geoloc_storage_id")
+    headers = {"User-Agent": user_agent} if user_agent else None
+    
+    session = http_session()
+    with _http_lock:
+        # Cookie dari response sebelumnya dibuang: yang dikirim hanya saved cookies
+        session.cookies.clear()
+        try:
+            resp = session.get(GOLD_URL, cookies=jar, headers=headers, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            return None, f"request error: {e}"
+    net_replay.record_response(resp)
+    
+    if resp.status_code != 200:
+        return None, f"HTTP {resp.status_code}"
+    
+    html = resp.text
+    head = html[:5000].lower()
+    if any(m in head for m in BLOCK_MARKERS):
+        return None, "blocked (challenge page)"
+    
+    # Server reset lokasi -> session sudah tidak valid untuk lokasi ini
+    new_geoloc = resp.cookies.get("geoloc_storage_id")
+    if geoloc and new_geoloc and new_geoloc != geoloc:
+        return None, "location reset by server"
+    
+    return html, "ok"
+
+def scrape_http(location, storage_id, parser=parse_products, timer=None):
+    """HTTP fast path. Returns result dict, atau None jika harus fallback ke browser"""
+    start = time.time()
+    timer = timer or SpanTimer()
+    with timer.span("http_fetch"):
+        html, reason = fetch_gold_http(storage_id)
+    if html is None:
+        log(f"HTTP fast path skip: {reason}")
+        return None
+    
+    with timer.span("parse"):
+        products = parser(html)
+    del html
+    if len(products) < MIN_PRODUCTS:
+        log(f"HTTP fast path: {len(products)} products, fallback ke browser")
+        return None
+    
+    available = [p for p in products if p.has_stock]
+    elapsed = round(time.time() - start, 1)
+    log(f"Done (http): {len(products)} products in {elapsed}s")
+    
+    return record_spans({
+        "blocked": False,
+        "hasStock": len(available) > 0,
+        "availableProducts": available,
+        "allProducts": products,
+        "totalProducts": len(products),
+        "location": location,
+        "locationId": storage_id,
+        "elapsedSeconds": elapsed,
+        "timestamp": datetime.now().isoformat(),
+        "source": "http"
+    }, timer)
 
-def scrape(location="bandung"):
+def scrape(location="bandung", page=None, state=None, get_page=None):
+    """
+    Single location: locationId ("200") atau city name ("bandung").
+    page: ChromiumPage milik caller (warm browser), tidak di-quit
+    state: dict milik caller (BrowserSession.state) untuk cache spec form lokasi
+    get_page: callable -> (page, state), dipanggil hanya jika HTTP fast path gagal
+              (warm browser tidak di-cek / launch untuk run yang cukup lewat HTTP)
+    """
     start = time.time()
     
-    if location not in LOCATION_MAP:
-        location = "bandung"
-    storage_id, city_name = LOCATION_MAP[location]
+    targets = resolve_targets([location])
+    if not targets:
+        # Jangan diam-diam scrape lokasi lain (hasilnya terkirim atas nama lokasi ini)
+        return error_result(location, None, f"Unknown location: {location}")
+    _, storage_id, city_name = targets[0]
     
     log(f"Starting: {location}")
+    timer = SpanTimer()
     
-    try:
-        from DrissionPage import ChromiumPage, ChromiumOptions
-    except ImportError:
-        return {"error": "DrissionPage not installed", "blocked": True}
+    # Fast path: plain HTTP GET, browser hanya jika blocked / products < MIN_PRODUCTS
+    result = scrape_http(location, storage_id, timer=timer)
+    if result:
+        return result
+    if page is None and get_page is not None:
+        page, state = get_page()
+    
+    owns_page = page is None
+    if owns_page:
+        try:
+            from DrissionPage import ChromiumPage
+        except ImportError:
+            return {"error": "DrissionPage not installed", "blocked": True}
+    
+    ready = ReadyReport()
     
-    page = None
     try:
-        os.makedirs(PROFILE_DIR, exist_ok=True)
-        
-        opts = ChromiumOptions()
-        # Standard flags
-        opts.set_argument('--disable-blink-features=AutomationControlled')
-        opts.set_argument('--lang=id-ID')
-        opts.set_argument('--no-sandbox')
-        opts.set_argument('--disable-dev-shm-usage')
-        opts.set_argument('--disable-gpu')
-        
-        # HIDE BROWSER WINDOW - Position off-screen
-        opts.set_argument('--window-position=-2400,-2400')
-        opts.set_argument('--window-size=1,1')
-        
-        # SPEED OPTIMIZATION FLAGS
-        opts.set_argument('--disable-extensions')
-        opts.set_argument('--disable-plugins')
-        opts.set_argument('--disable-sync')
-        opts.set_argument('--disable-translate')
-        opts.set_argument('--disable-background-networking')
-        opts.set_argument('--disable-default-apps')
-        opts.set_argument('--disable-hang-monitor')
-        opts.set_argument('--disable-popup-blocking')
-        opts.set_argument('--disable-prompt-on-repost')
-        opts.set_argument('--disable-client-side-phishing-detection')
-        opts.set_argument('--disable-component-update')
-        opts.set_argument('--no-first-run')
-        opts.set_argument('--no-default-browser-check')
-        
-        opts.set_user_data_path(PROFILE_DIR)
-        opts.auto_port()
-        
-        page = ChromiumPage(opts)
-        page.set.window.size(1280, 720)
-        page.set.load_mode.eager()
-        
-        # NOTE: Do NOT block resources for change-location page
-        # It needs CSS/JS to work properly
-        
-        # Go to change-location
-        log("Loading change-location...")
-        page.get(LOCATION_URL)
+        if owns_page:
+            with timer.span("launch"):
+                page = ChromiumPage(create_browser_options())
+                page.set.window.size(1280, 720)
+                page.set.load_mode.eager()
+        else:
+            # Warm browser: blocked_urls dari run sebelumnya masih aktif
+            try:
+                page.set.blocked_urls([])
+            except: pass
+        net_replay.attach(page)
         
-        # Select AND Submit in ONE JS call (faster!)
-        log("Selecting + Submitting...")
-        page.run_js(f'''
-            // Wait for DOM ready
-            function selectAndSubmit() {{
-                var select = document.querySelector('select');
-                if (select) {{
-                    for (var i = 0; i < select.options.length; i++) {{
-                        if (select.options[i].text.toLowerCase().includes('{city_name.lower()}')) {{
-                            select.selectedIndex = i;
-                            select.dispatchEvent(new Event('change'));
-                            break;
+        # Warm browser: switch via form POST jika spec form sudah diketahui
+        switched = False
+        if state is not None and state.get('form'):
+            log("Switch via form POST...")
+            try:
+                with timer.span("switch_post"):
+                    switched = switch_location_post(page, state['form'], storage_id, city_name)
+            except Exception as e:
+                log(f"POST switch error: {e}")
+            if not switched:
+                state['form'] = None
+
+        if not switched:
+            # NOTE: Do NOT block resources for change-location page
+            # It needs CSS/JS to work properly
+
+            # Go to change-location
+            log("Loading change-location...")
+            with timer.span("change_location"):
+                page.get(LOCATION_URL)
+
+                if state is not None and wait_selector(page, 'select', report=ready):
+                    try:
+                        state['form'] = page.run_js(LOCATION_FORM_JS)
+                    except Exception:
+                        state['form'] = None
+
+            # Select AND Submit in ONE JS call (faster!)
+            log("Selecting + Submitting...")
+            with timer.span("submit"):
+                page.run_js(f'''
+                    // Wait for DOM ready
+                    function selectAndSubmit() {{
+                        var select = document.querySelector('select');
+                        if (select) {{
+                            // Value = storage_id, text hanya fallback
+                            var index = -1;
+                            for (var i = 0; i < select.options.length; i++) {{
+                                if (select.options[i].value == '{storage_id}') {{ index = i; break; }}
+                                if (index < 0 && select.options[i].text.toLowerCase().includes('{city_name.lower()}')) index = i;
+                            }}
+                            if (index >= 0) {{
+                                select.selectedIndex = index;
+                                select.dispatchEvent(new Event('change'));
+                            }}
+                            // Click submit immediately
+                            var btn = document.querySelector('.btn-primary');
+                            if (btn) btn.click();
+                        }} else {{
+                            // Retry after 100ms
+                            setTimeout(selectAndSubmit, 100);
                         }}
                     }}
-                    // Click submit immediately
-                    var btn = document.querySelector('.btn-primary');
-                    if (btn) btn.click();
-                }} else {{
-                    // Retry after 100ms
-                    setTimeout(selectAndSubmit, 100);
-                }}
-            }}
-            selectAndSubmit();
-        ''')
-        
-        # Wait for navigation after form submit
-        # The form redirects to gold page, so wait for that
-        time.sleep(2)
-        
+                    selectAndSubmit();
+                ''')
+
+                # Wait for navigation after form submit
+                # The form redirects to gold page, so wait for that
+                wait_navigation(page, 'change-location', report=ready)
+
         # Now we should be on gold page already via redirect
-        # Block resources for faster parsing
+        # Block resources for faster parsing (policy yang terakhir sukses + probe)
         log("Blocking resources for gold page...")
-        css_blocked = True
-        try:
-            page.set.blocked_urls([
-                '*.css', '*.less', '*.scss',
-                '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
-                '*.woff', '*.woff2', '*.ttf', '*.eot',
-                '*google-analytics*', '*googletagmanager*', '*facebook*',
-                '*hotjar*', '*clarity*'
-            ])
-        except: 
-            css_blocked = False
+        policy = get_policy()
+        plan = policy.plan(every=probe_every())
+        blocking = apply_plan(page, plan)
+        stats = NetworkStats(page).start()
         
-        # Go to gold page
+        # Go to gold page (body dokumen cukup -> tanpa tunggu DOM)
         log("Loading gold page...")
-        page.get(GOLD_URL)
+        products = load_gold_page(page, storage_id, timer, body=plan.probe is None)
+        captured = products is not None
         
         # Wait for products with retry logic
-        products = []
-        for attempt in range(MAX_RETRIES):
-            try:
-                page.ele('css:.ct-body', timeout=ELEMENT_TIMEOUT)
-            except:
-                pass
-            
-            products = parse_products(page.html)
-            
-            if len(products) >= 5:
-                break
-            
-            if attempt < MAX_RETRIES - 1:
-                wait_time = 1 + attempt  # 1s, 2s, 3s
-                log(f"⏳ Retry {attempt + 1}/{MAX_RETRIES} in {wait_time}s...")
-                time.sleep(wait_time)
+        if not captured:
+            with timer.span("rows_wait"):
+                wait_rows_stable(page, timeout=ELEMENT_TIMEOUT, report=ready)
+            with timer.span("extract"):
+                products = read_products(page, parse_products)
         
-        # FALLBACK: Jika masih 0 products dan CSS blocked, retry tanpa blocking
-        if len(products) < 5 and css_blocked:
-            log("⚠️ CSS blocking gagal, retry tanpa blocking...")
-            try:
-                # COMPLETELY clear blocked URLs
-                page.set.blocked_urls([])
-            except: pass
-            
-            # Hard reload with cache bypass
-            try:
-                page.refresh(ignore_cache=True)
-            except:
-                page.get(GOLD_URL)
-            
-            time.sleep(3)  # Longer wait for full page
-            
-            # Wait for product container explicitly
-            try:
-                page.ele('css:.ct-body', timeout=10)
-            except: pass
-            
-            products = parse_products(page.html)
+        if len(products) < MIN_PRODUCTS:
+            with timer.span("retry"):
+                for attempt in range(1, MAX_RETRIES):
+                    budget = attempt  # 1s, 2s
+                    log(f"⏳ Retry {attempt}/{MAX_RETRIES} (wait up to {budget}s)...")
+                    wait_network_idle(page, timeout=budget, report=ready)
+                    wait_rows_stable(page, timeout=budget, min_rows=MIN_PRODUCTS, report=ready)
+                    products = read_products(page, parse_products)
+                    if len(products) >= MIN_PRODUCTS:
+                        break
+        
+        network = stats.stop()
+        
+        # FALLBACK: Jika masih < MIN_PRODUCTS dengan blocking, reload dengan policy lebih longgar
+        ok = len(products) >= MIN_PRODUCTS
+        fallback_ok = None
+        if not ok and blocking:
+            products = blocking_fallback(page, policy, plan, ready, timer)
+            fallback_ok = len(products) >= MIN_PRODUCTS
+        # Body dokumen tidak menguji script/CSS -> verdict hanya dari live DOM
+        if blocking and not captured:
+            policy.record(plan, ok, network, fallback_ok)
+        else:
+            policy.observe(network)
+        remember_rows(storage_id, products)
         
-        available = [p for p in products if p.get('hasStock')]
+        available = [p for p in products if p.has_stock]
         elapsed = round(time.time() - start, 1)
         
-        log(f"Done: {len(products)} products in {elapsed}s")
+        readiness = ready.as_dict()
+        log(f"Done: {len(products)} products in {elapsed}s "
+            f"(wait {readiness['waitSeconds']}s / work {readiness['workSeconds']}s)")
         
-        page.quit()
+        # Refresh cookies untuk HTTP fast path run berikutnya
+        if len(products) >= MIN_PRODUCTS:
+            try:
+                save_cookies(location, storage_id, page.cookies(all_domains=True),
+                             getattr(page, 'user_agent', None))
+            except Exception:
+                pass
         
-        return {
+        net_replay.collect(page)
+        if owns_page:
+            page.quit()
+        
+        return record_spans({
             "blocked": False,
             "hasStock": len(available) > 0,
             "availableProducts": available,
@@ -256,209 +482,484 @@ def scrape(location="bandung"):
             "location": location,
             "locationId": storage_id,
             "elapsedSeconds": elapsed,
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": datetime.now().isoformat(),
+            "source": "browser",
+            "capture": "document" if captured else "dom",
+            "readiness": readiness,
+            "network": network_summary(network, plan)
+        }, timer)
         
     except Exception as e:
         log(f"Error: {e}")
         if page:
+            net_replay.collect(page)
+        if page and owns_page:
             try: page.quit()
             except: pass
-        return {"blocked": False, "error": str(e), "timestamp": datetime.now().isoformat()}
+        return record_spans({"blocked": False, "error": str(e), "location": location,
+                             "locationId": storage_id, "timestamp": datetime.now().isoformat()}, timer)
+
+def probe_every():
+    """
+    Probe hanya teruji di load live DOM. GOLD_CAPTURE=dom: tiap load.
+    GOLD_CAPTURE=network: body dokumen biasanya cukup, jadi hanya tiap
+    PROBE_EVERY load; load yang mem-probe melewati capture body dokumen.
+    """
+    return 1 if GOLD_CAPTURE != "network" else PROBE_EVERY
+
+def apply_plan(tab, plan):
+    """Set blocked_urls dari resource_policy.Plan. Returns False jika CDP menolak"""
+    try:
+        tab.set.blocked_urls(plan.patterns)
+        return True
+    except Exception:
+        return False
+
+def blocking_fallback(tab, policy, plan, ready, timer):
+    """
+    Gold page tidak lengkap dengan plan: reload dengan policy.fallback(plan).
+    Probe gagal -> policy terakhir yang sukses; selain itu tanpa blocking
+    sama sekali + hard reload (fallback lama). Returns products
+    """
+    fallback = policy.fallback(plan)
+    if fallback:
+        log(f"⚠️ Probe block {plan.probe} gagal, reload dengan policy terakhir yang sukses...")
+    else:
+        log("⚠️ Blocking gagal, retry tanpa blocking...")
+    with timer.span("fallback"):
+        try:
+            tab.set.blocked_urls(fallback.patterns if fallback else [])
+        except: pass
+        
+        if fallback:
+            tab.get(GOLD_URL)
+        else:
+            # Hard reload with cache bypass
+            try:
+                tab.refresh(ignore_cache=True)
+            except:
+                tab.get(GOLD_URL)
+        
+        # Tunggu network idle lalu row stabil
+        wait_network_idle(tab, timeout=3, report=ready)
+        wait_rows_stable(tab, timeout=10, min_rows=MIN_PRODUCTS, report=ready)
+        return read_products(tab, parse_products)
+
+_expected_rows = {}   # locationId -> jumlah row hasil sukses terakhir
+
+def expected_rows(storage_id):
+    return max(MIN_PRODUCTS, _expected_rows.get(storage_id, 0))
+
+def remember_rows(storage_id, products):
+    if len(products) >= MIN_PRODUCTS:
+        _expected_rows[storage_id] = len(products)
+
+def load_gold_page(tab, storage_id, timer, parser=parse_products, body=True):
+    """
+    Navigasi ke GOLD_URL. GOLD_CAPTURE=network: body dokumen dari CDP di-parse
+    langsung; jika row >= expected_rows(), loading di-stop dan products
+    dikembalikan. Returns None jika caller harus lanjut lewat live DOM
+    (page tetap loading seperti biasa). body=False: selalu live DOM (load probe).
+    """
+    capture = GoldCapture(tab, GOLD_URL)
+    if GOLD_CAPTURE == "network" and body:
+        capture.start()
+    if not capture.active:
+        with timer.span("gold_load"):
+            tab.get(GOLD_URL)
+        return None
+    
+    try:
+        with timer.span("gold_load"):
+            # load_mode none: get() return sebelum DOM siap, body ditunggu di capture
+            tab.set.load_mode.none()
+            try:
+                tab.get(GOLD_URL)
+            finally:
+                tab.set.load_mode.eager()
+            html = capture.wait(ELEMENT_TIMEOUT)
+    finally:
+        capture.stop()
+    if not html:
+        log(f"[{storage_id}] Body dokumen tidak tertangkap, lanjut live DOM")
+        return None
+    
+    with timer.span("parse"):
+        products = parser(html)
+    del html
+    expected = expected_rows(storage_id)
+    if len(products) < expected:
+        log(f"[{storage_id}] Body dokumen: {len(products)}/{expected} row, lanjut live DOM")
+        return None
+    stop_loading(tab)
+    return products
+
+def network_summary(network, plan):
+    """result["network"]: accounting per resource type + plan blocking (tanpa daftar script)"""
+    summary = {k: v for k, v in (network or {}).items() if k != "scripts"}
+    summary["policy"] = plan.as_dict()
+    return summary
+
+def resolve_targets(locations):
+    """List lokasi -> [(location, storage_id, display_name)], skip yang tidak dikenal"""
+    targets = []
+    for location in locations:
+        # Location can be locationId (like "200") or city name (like "jakarta")
+        location_str = str(location)
+        
+        # Try locationId lookup first, then city name
+        if location_str in LOCATION_ID_MAP:
+            targets.append((location, location_str, LOCATION_ID_MAP[location_str]))
+        elif location_str.lower() in LOCATION_MAP:
+            storage_id, display_name = LOCATION_MAP[location_str.lower()]
+            targets.append((location, storage_id, display_name))
+        else:
+            log(f"⚠️ Unknown location: {location}, skipping")
+    return targets
+
+# Baca spec form change-location: action, field select, hidden inputs (_token), options
+LOCATION_FORM_JS = '''
+    var select = document.querySelector('select');
+    if (!select || !select.form) return null;
+    var form = select.form;
+    var hidden = {};
+    form.querySelectorAll('input[type=hidden]').forEach(function(i) {
+        if (i.name) hidden[i.name] = i.value;
+    });
+    var options = [];
+    for (var i = 0; i < select.options.length; i++) {
+        options.push([select.options[i].value, select.options[i].text.toLowerCase()]);
+    }
+    return {action: form.action, method: (form.method || 'post').toLowerCase(),
+            selectName: select.name, hidden: hidden, options: options};
+'''
+
+def location_search_text(display_name):
+    # Extract first word of display_name for matching (e.g., "Bandung" from "Bandung")
+    return display_name.split(' - ')[0].split()[0].lower()
+
+def switch_location_page(tab, storage_id, display_name, ready, timer=None):
+    """
+    Switch lokasi lewat render /change-location + klik submit.
+    Returns spec form (untuk switch_location_post berikutnya) atau None.
+    """
+    timer = timer or SpanTimer()
+    # Go directly to change-location page
+    # (Simpler and more reliable than trying in-page modal)
+    log(f"[{storage_id}] Loading change-location...")
+    with timer.span("change_location"):
+        tab.get(LOCATION_URL)
+        
+        form = None
+        if wait_selector(tab, 'select', report=ready):
+            try:
+                form = tab.run_js(LOCATION_FORM_JS)
+            except Exception:
+                form = None
+    
+    # Select dropdown by TEXT matching (using display_name)
+    search_text = location_search_text(display_name)
+    log(f"[{storage_id}] Selecting '{search_text}'...")
+    with timer.span("submit"):
+        tab.run_js(f'''
+            function selectAndSubmit() {{
+                var select = document.querySelector('select');
+                if (select) {{
+                    for (var i = 0; i < select.options.length; i++) {{
+                        if (select.options[i].text.toLowerCase().includes('{search_text}')) {{
+                            select.selectedIndex = i;
+                            select.dispatchEvent(new Event('change'));
+                            break;
+                        }}
+                    }}
+                    var btn = document.querySelector('.btn-primary');
+                    if (btn) btn.click();
+                }} else {{
+                    setTimeout(selectAndSubmit, 100);
+                }}
+            }}
+            selectAndSubmit();
+        ''')
+        wait_navigation(tab, 'change-location', report=ready)
+    
+    return form if form and form.get('selectName') and form.get('action') else None
 
-def scrape_multiple(locations):
+def switch_location_post(tab, form, storage_id, display_name):
+    """
+    Switch lokasi tanpa render /change-location: POST form langsung dari tab
+    (same-origin fetch, cookie session + CSRF token). Returns True jika berhasil.
+    """
+    values = [v for v, _ in form['options']]
+    if storage_id in values:
+        value = storage_id
+    else:
+        search_text = location_search_text(display_name)
+        value = next((v for v, text in form['options'] if search_text in text), None)
+    if not value:
+        return False
+    
+    fields = dict(form.get('hidden', {}))
+    fields[form['selectName']] = value
+    
+    status = tab.run_js(f'''
+        var fields = {json.dumps(fields)};
+        var meta = document.querySelector('meta[name="csrf-token"]');
+        if (meta && fields._token !== undefined) fields._token = meta.content;
+        var xsrf = document.cookie.match(/XSRF-TOKEN=([^;]+)/);
+        var headers = {{'Content-Type': 'application/x-www-form-urlencoded'}};
+        if (xsrf) headers['X-XSRF-TOKEN'] = decodeURIComponent(xsrf[1]);
+        return fetch({json.dumps(form['action'])}, {{
+            method: 'POST', credentials: 'same-origin', redirect: 'follow',
+            headers: headers, body: new URLSearchParams(fields).toString()
+        }}).then(function(r) {{ return r.status; }}).catch(function() {{ return 0; }});
+    ''')
+    return isinstance(status, int) and 200 <= status < 400
+
+def scrape_location(tab, location, storage_id, display_name, block_after_select=False, state=None,
+                    timer=None):
+    """
+    Satu lokasi di tab/page yang sudah terbuka: switch lokasi -> gold page.
+    block_after_select: set blocked_urls dari resource_policy setelah submit (lokasi pertama
+    di tab ini); lokasi berikutnya hanya jika plan berubah
+    state: dict per tab; menyimpan spec form supaya lokasi berikutnya switch via POST
+    timer: SpanTimer milik caller (mis. sudah berisi span launch); span error ikut tercatat
+    """
+    start_loc = time.time()
+    ready = ReadyReport()
+    state = state if state is not None else {}
+    timer = timer if timer is not None else SpanTimer()
+    
+    switched = False
+    if state.get('form'):
+        log(f"[{storage_id}] Switch via form POST...")
+        try:
+            with timer.span("switch_post"):
+                switched = switch_location_post(tab, state['form'], storage_id, display_name)
+        except Exception as e:
+            log(f"[{storage_id}] POST switch error: {e}")
+        if not switched:
+            log(f"[{storage_id}] POST switch gagal, fallback ke change-location page")
+            state['form'] = None
+    
+    if not switched:
+        state['form'] = switch_location_page(tab, storage_id, display_name, ready, timer)
+    
+    # Block resources BEFORE loading gold page
+    policy = get_policy()
+    plan = policy.plan(every=probe_every())
+    if block_after_select or state.get('blocked') != plan.patterns:
+        log(f"[{storage_id}] Blocking resources ({len(plan.denied)} learned"
+            f"{', probe ' + plan.probe if plan.probe else ''})...")
+        state['blocked'] = plan.patterns if apply_plan(tab, plan) else None
+    blocking = state.get('blocked') is not None
+    stats = NetworkStats(tab).start()
+    
+    log(f"[{storage_id}] Loading gold page...")
+    products = load_gold_page(tab, storage_id, timer, body=plan.probe is None)
+    captured = products is not None
+    
+    # Wait for products container (row count stabil)
+    if not captured:
+        with timer.span("rows_wait"):
+            wait_rows_stable(tab, timeout=ELEMENT_TIMEOUT, report=ready)
+        with timer.span("extract"):
+            products = read_products(tab, parse_products)
+    
+    # Retry if needed
+    if len(products) < MIN_PRODUCTS:
+        with timer.span("retry"):
+            wait_network_idle(tab, report=ready)
+            wait_rows_stable(tab, timeout=2, min_rows=MIN_PRODUCTS, report=ready)
+            products = read_products(tab, parse_products)
+    network = stats.stop()
+    
+    ok = len(products) >= MIN_PRODUCTS
+    fallback_ok = None
+    if not ok and blocking:
+        products = blocking_fallback(tab, policy, plan, ready, timer)
+        fallback_ok = len(products) >= MIN_PRODUCTS
+        state['blocked'] = None  # Tab masih pakai blocking fallback
+    if blocking and not captured:
+        policy.record(plan, ok, network, fallback_ok)
+    else:
+        policy.observe(network)
+    remember_rows(storage_id, products)
+    
+    available = [p for p in products if p.has_stock]
+    elapsed = round(time.time() - start_loc, 1)
+    readiness = ready.as_dict()
+    
+    log(f"[{storage_id}] Done: {len(products)} products in {elapsed}s "
+        f"(wait {readiness['waitSeconds']}s / work {readiness['workSeconds']}s)")
+    
+    return record_spans({
+        "blocked": False,
+        "hasStock": len(available) > 0,
+        "availableProducts": available,
+        "allProducts": products,
+        "totalProducts": len(products),
+        "location": location,
+        "locationId": storage_id,
+        "elapsedSeconds": elapsed,
+        "timestamp": datetime.now().isoformat(),
+        "source": "browser",
+        "capture": "document" if captured else "dom",
+        "readiness": readiness,
+        "network": network_summary(network, plan)
+    }, timer)
+
+def error_result(location, storage_id, e):
+    return {
+        "blocked": False,
+        "error": str(e),
+        "location": location,
+        "locationId": storage_id,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def open_isolated_tab(page):
+    """
+    Tab baru di browser context sendiri (cookie jar terpisah), supaya
+    geoloc cookie tiap tab tidak saling menimpa. Returns (tab, context_id)
+    """
+    browser = getattr(page, 'browser', page)
+    context_id = browser.run_cdp('Target.createBrowserContext')['browserContextId']
+    target_id = browser.run_cdp('Target.createTarget', url='about:blank',
+                                browserContextId=context_id)['targetId']
+    tab = page.get_tab(target_id)
+    tab.set.load_mode.eager()
+    net_replay.attach(tab)
+    return tab, context_id
+
+def close_isolated_tab(page, tab, context_id):
+    net_replay.collect(tab)
+    try:
+        tab.close()
+    except: pass
+    try:
+        getattr(page, 'browser', page).run_cdp('Target.disposeBrowserContext', browserContextId=context_id)
+    except: pass
+
+def scrape_concurrent(page, targets, concurrency, on_result=None, first_timer=None):
+    """
+    N lokasi sekaligus, masing-masing worker punya tab + browser context sendiri.
+    Urutan hasil sama dengan urutan targets.
+    first_timer: SpanTimer untuk target pertama (berisi span launch browser)
+    """
+    import threading
+    from queue import Queue, Empty
+    
+    work = Queue()
+    for i, target in enumerate(targets):
+        work.put((i, target))
+    results = [None] * len(targets)
+    
+    def worker(worker_id):
+        tab = context_id = None
+        first = True
+        state = {}
+        try:
+            tab, context_id = open_isolated_tab(page)
+        except Exception as e:
+            log(f"⚠️ Worker {worker_id}: gagal buka tab ({e})")
+        while True:
+            try:
+                i, (location, storage_id, display_name) = work.get_nowait()
+            except Empty:
+                break
+            if tab is None:
+                results[i] = error_result(location, storage_id, "tab unavailable")
+                continue
+            timer = first_timer if i == 0 and first_timer else SpanTimer()
+            try:
+                # change-location pertama di tab ini tanpa blocking (butuh CSS/JS)
+                results[i] = scrape_location(tab, location, storage_id, display_name,
+                                             block_after_select=first, state=state, timer=timer)
+            except Exception as e:
+                log(f"Error for {location}: {e}")
+                results[i] = record_spans(error_result(location, storage_id, e), timer)
+            first = False
+            if on_result:
+                on_result(results[i])
+        if tab is not None:
+            close_isolated_tab(page, tab, context_id)
+    
+    workers = min(concurrency, len(targets))
+    log(f"Concurrent scrape: {len(targets)} locations, {workers} tabs")
+    threads = [threading.Thread(target=worker, args=(w + 1,), daemon=True) for w in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    return [r for r in results if r is not None]
+
+def scrape_multiple(locations, page=None, concurrency=1, profile_dir=PROFILE_DIR, state=None,
+                    on_result=None):
     """
     Scrape multiple locations dalam satu browser session
-    OPTIMIZED: Hanya ke /change-location sekali, setelah itu gunakan 
-    tombol "Ubah Lokasi" di gold page untuk perpindahan lebih cepat
+    page: ChromiumPage milik caller (warm browser) - tidak di-quit di sini
+    concurrency > 1: beberapa lokasi paralel, tiap tab di browser context sendiri
+    profile_dir: user data dir untuk browser baru (worker pool pakai dir sendiri)
+    state: dict milik caller (warm browser) untuk cache spec form lintas run
+    on_result: callback(result) dipanggil begitu tiap lokasi selesai (bisa dari thread lain)
+    Tanpa HTTP fast path: saved cookies hanya valid untuk satu lokasi
+    (geoloc_storage_id), jadi paling banyak satu lokasi per batch yang bisa
+    dilayani tanpa browser. Fast path hanya ada di scrape() (satu lokasi).
     """
     start_total = time.time()
     results = []
     
     log(f"Starting multi-location scrape: {locations}")
     
-    try:
-        from DrissionPage import ChromiumPage, ChromiumOptions
-    except ImportError:
-        return [{"error": "DrissionPage not installed", "blocked": True}]
+    owns_page = page is None
+    if owns_page:
+        try:
+            from DrissionPage import ChromiumPage
+        except ImportError:
+            return [{"error": "DrissionPage not installed", "blocked": True}]
     
-    page = None
+    first_timer = SpanTimer()
     try:
-        os.makedirs(PROFILE_DIR, exist_ok=True)
-        
-        opts = ChromiumOptions()
-        opts.set_argument('--disable-blink-features=AutomationControlled')
-        opts.set_argument('--lang=id-ID')
-        opts.set_argument('--no-sandbox')
-        opts.set_argument('--disable-dev-shm-usage')
-        opts.set_argument('--disable-gpu')
-        
-        # HIDE BROWSER WINDOW - Position off-screen
-        opts.set_argument('--window-position=-2400,-2400')
-        opts.set_argument('--window-size=1,1')
-        
-        opts.set_argument('--disable-extensions')
-        opts.set_argument('--disable-plugins')
-        opts.set_argument('--disable-sync')
-        opts.set_argument('--disable-translate')
-        opts.set_argument('--disable-background-networking')
-        opts.set_argument('--no-first-run')
-        opts.set_argument('--no-default-browser-check')
-        opts.set_user_data_path(PROFILE_DIR)
-        opts.auto_port()
-        
-        page = ChromiumPage(opts)
-        # Small window size to reduce RAM usage (browser is hidden anyway)
-        page.set.window.size(800, 600)
-        page.set.load_mode.eager()
+        if owns_page:
+            with first_timer.span("launch"):
+                page = ChromiumPage(create_browser_options(profile_dir))
+                # Small window size to reduce RAM usage (browser is hidden anyway)
+                page.set.window.size(800, 600)
+                page.set.load_mode.eager()
+        else:
+            # Warm browser: change-location pertama harus load tanpa blocking
+            try:
+                page.set.blocked_urls([])
+            except: pass
+        net_replay.attach(page)
         
-        # Block heavy resources for faster loading (except for change-location page)
-        # Note: Don't block CSS on change-location as it needs JS/CSS to work
-        # We'll set this after first location is done
+        targets = resolve_targets(locations)
         
-        # Loop through each location (locationId like "200", "201")
-        for idx, location in enumerate(locations):
-            start_loc = time.time()
-            
-            # Location can be locationId (like "200") or city name (like "jakarta")
-            location_str = str(location)
-            
-            # Try locationId lookup first, then city name
-            if location_str in LOCATION_ID_MAP:
-                storage_id = location_str
-                display_name = LOCATION_ID_MAP[location_str]
-            elif location_str.lower() in LOCATION_MAP:
-                storage_id, display_name = LOCATION_MAP[location_str.lower()]
-            else:
-                log(f"⚠️ Unknown location: {location}, skipping")
-                continue
-            
-            log(f"\n--- {display_name} [{storage_id}] ({idx + 1}/{len(locations)}) ---")
-            
-            try:
-                if idx == 0:
-                    # FIRST LOCATION: Use /change-location page
-                    log("Loading change-location (first location)...")
-                    page.get(LOCATION_URL)
-                    
-                    # Select dropdown by TEXT matching (using display_name)
-                    # Extract first word of display_name for matching (e.g., "Bandung" from "Bandung")
-                    search_text = display_name.split(' - ')[0].split()[0].lower()
-                    log(f"Selecting '{search_text}'...")
-                    page.run_js(f'''
-                        function selectAndSubmit() {{
-                            var select = document.querySelector('select');
-                            if (select) {{
-                                for (var i = 0; i < select.options.length; i++) {{
-                                    if (select.options[i].text.toLowerCase().includes('{search_text}')) {{
-                                        select.selectedIndex = i;
-                                        select.dispatchEvent(new Event('change'));
-                                        break;
-                                    }}
-                                }}
-                                var btn = document.querySelector('.btn-primary');
-                                if (btn) btn.click();
-                            }} else {{
-                                setTimeout(selectAndSubmit, 100);
-                            }}
-                        }}
-                        selectAndSubmit();
-                    ''')
-                    time.sleep(1)
-                    
-                    # Block resources BEFORE loading gold page
-                    # Block CSS too for faster loading
-                    log("Blocking CSS/images/fonts for speed...")
-                    try:
-                        page.set.blocked_urls([
-                            # Block CSS, images, fonts, analytics
-                            '*.css', '*.less', '*.scss', '*.sass',
-                            '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
-                            '*.woff', '*.woff2', '*.ttf', '*.eot', '*.otf',
-                            '*.mp4', '*.webm', '*.mp3', '*.wav',
-                            '*google-analytics*', '*googletagmanager*', '*facebook*',
-                            '*hotjar*', '*clarity*', '*doubleclick*'
-                        ])
-                    except: pass
-                    
-                    # Load gold page (now without CSS/images)
-                    log("Loading gold page...")
-                    page.get(GOLD_URL)
-                else:
-                    # SUBSEQUENT LOCATIONS: Go directly to change-location page
-                    # (Simpler and more reliable than trying in-page modal)
-                    log("Loading change-location...")
-                    page.get(LOCATION_URL)
-                    
-                    # Select location by text matching
-                    search_text = display_name.split(' - ')[0].split()[0].lower()
-                    log(f"Selecting '{search_text}'...")
-                    page.run_js(f'''
-                        function selectAndSubmit() {{
-                            var select = document.querySelector('select');
-                            if (select) {{
-                                for (var i = 0; i < select.options.length; i++) {{
-                                    if (select.options[i].text.toLowerCase().includes('{search_text}')) {{
-                                        select.selectedIndex = i;
-                                        select.dispatchEvent(new Event('change'));
-                                        break;
-                                    }}
-                                }}
-                                var btn = document.querySelector('.btn-primary');
-                                if (btn) btn.click();
-                            }} else {{
-                                setTimeout(selectAndSubmit, 100);
-                            }}
-                        }}
-                        selectAndSubmit();
-                    ''')
-                    time.sleep(1)
-                    
-                    # Load gold page
-                    log("Loading gold page...")
-                    page.get(GOLD_URL)
-                
-                # Wait for products container
+        if concurrency > 1 and len(targets) > 1:
+            results = scrape_concurrent(page, targets, concurrency, on_result=on_result,
+                                        first_timer=first_timer)
+        else:
+            # Block heavy resources for faster loading (except for change-location page)
+            # Note: Don't block CSS on change-location as it needs JS/CSS to work
+            # We'll set this after first location is done
+            state = state if state is not None else {}
+            for idx, (location, storage_id, display_name) in enumerate(targets):
+                log(f"\n--- {display_name} [{storage_id}] ({idx + 1}/{len(targets)}) ---")
+                timer = first_timer if idx == 0 else SpanTimer()
                 try:
-                    page.ele('css:.ct-body', timeout=ELEMENT_TIMEOUT)
-                except: pass
-                
-                time.sleep(1)
-                products = parse_products(page.html)
-                
-                # Retry if needed
-                if len(products) < 5:
-                    time.sleep(1)
-                    products = parse_products(page.html)
-                
-                available = [p for p in products if p.get('hasStock')]
-                elapsed = round(time.time() - start_loc, 1)
-                
-                log(f"Done: {len(products)} products in {elapsed}s")
-                
-                results.append({
-                    "blocked": False,
-                    "hasStock": len(available) > 0,
-                    "availableProducts": available,
-                    "allProducts": products,
-                    "totalProducts": len(products),
-                    "location": location,
-                    "locationId": storage_id,
-                    "elapsedSeconds": elapsed,
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-            except Exception as e:
-                log(f"Error for {location}: {e}")
-                results.append({
-                    "blocked": False,
-                    "error": str(e),
-                    "location": location,
-                    "locationId": storage_id,
-                    "timestamp": datetime.now().isoformat()
-                })
+                    results.append(scrape_location(page, location, storage_id, display_name,
+                                                   block_after_select=(idx == 0), state=state,
+                                                   timer=timer))
+                except Exception as e:
+                    log(f"Error for {location}: {e}")
+                    results.append(record_spans(error_result(location, storage_id, e), timer))
+                if on_result:
+                    on_result(results[-1])
         
-        page.quit()
+        net_replay.collect(page)
+        if owns_page:
+            page.quit()
         
         total_elapsed = round(time.time() - start_total, 1)
         log(f"\n=== TOTAL: {len(results)} locations in {total_elapsed}s ===")
@@ -468,32 +969,93 @@ def scrape_multiple(locations):
     except Exception as e:
         log(f"Error: {e}")
         if page:
+            net_replay.collect(page)
+        if page and owns_page:
             try: page.quit()
             except: pass
         return [{"blocked": False, "error": str(e), "timestamp": datetime.now().isoformat()}]
 
+def _pool_worker(args):
+    """Entry point proses worker: satu Chromium + profile sendiri per shard"""
+    worker_id, shard = args
+    profile_dir = worker_profile_dir(worker_id)
+    log(f"Worker {worker_id}: {len(shard)} locations ({profile_dir})")
+    return scrape_multiple(shard, profile_dir=profile_dir)
+
+def scrape_pool(locations, workers=2):
+    """
+    Shard locations ke N proses worker (round-robin), tiap worker punya
+    Chromium + profile dir sendiri. Hasil di-merge sesuai urutan input.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    start_total = time.time()
+    workers = max(1, min(workers, len(locations)))
+    if workers == 1:
+        return scrape_multiple(locations)
+    
+    shards = [(w + 1, locations[w::workers]) for w in range(workers)]
+    log(f"Worker pool: {len(locations)} locations, {workers} workers")
+    
+    merged = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_pool_worker, shard) for shard in shards]
+        for (worker_id, shard), future in zip(shards, futures):
+            try:
+                merged.extend(future.result())
+            except Exception as e:
+                log(f"Worker {worker_id} error: {e}")
+                merged.extend(error_result(loc, resolve_storage_id(loc), e) for loc in shard)
+    
+    # Urutkan sesuai urutan input locations
+    order = {str(loc): i for i, loc in enumerate(locations)}
+    merged.sort(key=lambda r: order.get(str(r.get("location")), len(order)))
+    
+    total_elapsed = round(time.time() - start_total, 1)
+    log(f"\n=== POOL TOTAL: {len(merged)} locations in {total_elapsed}s ===")
+    return merged
+
 def main():
     # Check for multiple locations
     locations = []
     single_loc = None
+    concurrency = 1
+    workers = 1
     
     for arg in sys.argv:
         if arg.startswith("--location="):
             single_loc = arg.split("=")[1].lower()
+        elif arg.startswith("--concurrency="):
+            # Format: --concurrency=3 (jumlah tab paralel)
+            concurrency = max(1, int(arg.split("=")[1]))
+        elif arg.startswith("--workers="):
+            # Format: --workers=4 (jumlah proses Chromium, profile terpisah)
+            workers = max(1, int(arg.split("=")[1]))
         elif arg.startswith("--locations="):
             # Format: --locations=bandung,jakarta,surabaya
             locs = arg.split("=")[1].lower()
             locations = [l.strip() for l in locs.split(",")]
     
+    # --record=archive.json / --replay=archive.json (lihat net_replay.py)
+    import resource_policy
+    replay_session = net_replay.install(net_replay.from_argv(sys.argv), [sys.modules[__name__], resource_policy])
+    if replay_session and workers > 1:
+        log("Record/replay hanya untuk satu proses, --workers diabaikan")
+        workers = 1
+    
     if locations:
         # Multiple locations
-        results = scrape_multiple(locations)
-        print(json.dumps(results, indent=2))
+        if workers > 1:
+            results = scrape_pool(locations, workers)
+        else:
+            results = scrape_multiple(locations, concurrency=concurrency)
+        print(json.dumps(results, indent=2, default=json_default))
     else:
         # Single location
         loc = single_loc or "bandung"
         result = scrape(loc)
-        print(json.dumps(result, indent=2))
+        print(json.dumps(result, indent=2, default=json_default))
+    net_replay.finish()
 
 if __name__ == "__main__":
     main()
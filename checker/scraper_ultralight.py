@@ -2,11 +2,25 @@
 """
 scraper_ultralight.py - Ultra Lightweight Version
 TARGET: 200-300MB memory usage
+- HTTP fast path (tanpa browser) via scraper_ultrafast.scrape_http
+- --record / --replay: rekam session ke archive, replay offline (net_replay.py)
+- Timing per fase (spans.py) di result["spans"] + SPAN_LOG
+- scrape_multiple: browser di-recycle berdasarkan RSS / renderer Chromium
+- Chromium di process group sendiri + watchdog deadline per lokasi (chrome_process.py)
+- Gold page dari body dokumen (CDP) jika lengkap, live DOM hanya jika row kurang
 """
 
 import sys, os, time, json, gc
 from datetime import datetime
-from bs4 import BeautifulSoup
+from parsers import get_parser, read_products
+from product import json_default
+import net_replay
+import chrome_process
+from spans import SpanTimer, record as record_spans
+from resource_policy import get_policy
+from scraper_ultrafast import load_gold_page, remember_rows, resolve_targets, error_result
+from browser_session import browser_pid, process_tree_stats, tree_memory_mb
+from page_ready import ReadyReport, wait_selector, wait_navigation, wait_rows_stable, wait_network_idle
 
 PROFILE_DIR = os.path.join(os.path.dirname(__file__), 'browser_profile')
 LOCATION_URL = "https://www.logammulia.com/id/change-location"
@@ -14,6 +28,19 @@ GOLD_URL = "https://www.logammulia.com/id/purchase/gold"
 
 ELEMENT_TIMEOUT = 8
 MAX_RETRIES = 2
+# Watchdog: batas waktu satu lokasi sebelum process group browser di-kill
+LOCATION_DEADLINE = int(os.environ.get("LOCATION_DEADLINE", "90"))
+
+# Browser recycling (scrape_multiple): restart jika process tree Chromium
+# melewati high-water mark, tapi tidak sebelum MIN_PAGES_PER_BROWSER lokasi.
+# Diukur dengan PSS (USS jika PSS tidak ada), bukan RSS: RSS tree Chromium
+# sudah > 250 MB setelah satu page karena shared page dihitung per proses.
+# Default = target peak PSS memory_monitor.py (TARGET_MB)
+RECYCLE_PSS_MB = int(os.environ.get("RECYCLE_PSS_MB", "300"))
+RECYCLE_MAX_RENDERERS = int(os.environ.get("RECYCLE_MAX_RENDERERS", "3"))
+MIN_PAGES_PER_BROWSER = int(os.environ.get("MIN_PAGES_PER_BROWSER", "2"))
+# Tanpa psutil memory tidak bisa diukur -> restart tiap N lokasi (perilaku lama)
+FALLBACK_PAGES_PER_BROWSER = 2
 
 LOCATION_ID_MAP = {
     # Jakarta
@@ -63,13 +90,54 @@ def log(msg):
     ts = datetime.now().strftime("%H:%M:%S")
     print(f"[{ts}] {msg}", file=sys.stderr)
 
-def kill_chrome():
-    """Kill any stuck chrome processes"""
+def launch_browser():
+    """
+    ChromiumPage di process group sendiri (chrome_process.launch).
+    Returns (page, BrowserProcess); BrowserProcess None jika Chromium tidak
+    ditemukan dan DrissionPage yang launch sendiri.
+    """
+    from DrissionPage import ChromiumPage
+    opts = create_minimal_browser()
+    browser = None
+    try:
+        browser = chrome_process.launch(opts, PROFILE_DIR)
+    except Exception as e:
+        log(f"⚠️ Launch Chromium gagal ({e}), pakai launch DrissionPage")
+        opts = create_minimal_browser()
+    try:
+        page = ChromiumPage(opts)
+    except Exception:
+        if browser:
+            browser.kill("connect gagal")
+        raise
+    page.set.window.size(800, 600)
+    page.set.load_mode.eager()
+    page.set.timeouts(base=30, page_load=30, script=10)  # Set timeouts
+    net_replay.attach(page)
+    return page, browser
+
+def kill_chrome(page=None, browser=None, force=False):
+    """
+    Tutup satu browser: page.quit() lalu kill process group-nya (renderer sisa).
+    force=True (timeout / hang): langsung kill tanpa quit. Browser lain di mesin
+    tidak disentuh (dulu: taskkill /IM chrome.exe).
+    """
+    pid = None
+    if page is not None:
+        net_replay.collect(page)
+        if browser is None:
+            pid = browser_pid(page)
+        if not force:
+            try:
+                page.quit()
+            except Exception:
+                pass
     try:
-        import subprocess
-        subprocess.run(['taskkill', '/F', '/IM', 'chrome.exe'], 
-                      capture_output=True, timeout=5)
-    except:
+        if browser is not None:
+            browser.kill("timeout" if force else "quit")
+        elif force and pid:
+            chrome_process.kill_tree(pid)
+    except Exception:
         pass
 
 def force_gc():
@@ -79,41 +147,9 @@ def force_gc():
     gc.collect()
 
 def parse_products_minimal(html):
-    """Parse dengan minimal memory footprint"""
+    """Parse dengan minimal memory footprint (lxml/stream backend, tanpa soup tree)"""
     try:
-        soup = BeautifulSoup(html, 'lxml')
-        products = []
-        
-        for row in soup.select('.ct-body .ctr'):
-            try:
-                col = row.select_one('.ctd.item-1 .ngc-text')
-                if not col:
-                    continue
-                
-                title = col.get_text(strip=True).split('\n')[0]
-                
-                if 'perak' in title.lower() or 'silver' in title.lower():
-                    continue
-                if not any(x in title.lower() for x in ['emas', 'batangan', 'gram']):
-                    continue
-                
-                price_elem = row.select_one('.ctd.item-2')
-                price = price_elem.get_text(strip=True) if price_elem else ""
-                has_stock = not row.select_one('span.no-stock')
-                
-                products.append({
-                    "title": title,
-                    "price": price,
-                    "hasStock": has_stock
-                })
-            except:
-                continue
-        
-        soup.decompose()
-        del soup
-        force_gc()
-        
-        return products
+        return get_parser()(html)
     except Exception as e:
         log(f"Parse error: {e}")
         return []
@@ -144,6 +180,8 @@ def create_minimal_browser():
     opts.set_argument('--disable-component-update')
     opts.set_argument('--no-first-run')
     opts.set_argument('--no-default-browser-check')
+    for arg in net_replay.browser_arguments():
+        opts.set_argument(arg)
     
     opts.set_user_data_path(PROFILE_DIR)
     opts.auto_port()
@@ -154,96 +192,101 @@ def scrape(location="bandung"):
     """Single location scrape"""
     start = time.time()
     
-    location_str = str(location)
-    if location_str in LOCATION_ID_MAP:
-        storage_id = location_str
-        city_name = LOCATION_ID_MAP[location_str]
-    elif location_str.lower() in LOCATION_MAP:
-        storage_id, city_name = LOCATION_MAP[location_str.lower()]
-    else:
-        storage_id, city_name = "201", "Bandung"
+    targets = resolve_targets([location])
+    if not targets:
+        # Jangan diam-diam scrape Bandung (hasilnya terkirim atas nama lokasi ini)
+        return error_result(location, None, f"Unknown location: {location}")
+    _, storage_id, city_name = targets[0]
     
     log(f"Start: {city_name} [{storage_id}]")
+    timer = SpanTimer()
+    
+    # Fast path: plain HTTP GET (~0.1x memory), fallback ke browser
+    try:
+        from scraper_ultrafast import scrape_http
+        result = scrape_http(location, storage_id, parser=parse_products_minimal, timer=timer)
+        if result:
+            return result
+    except ImportError:
+        pass
     
     try:
         from DrissionPage import ChromiumPage
     except ImportError:
         return {"error": "DrissionPage not installed"}
     
-    page = None
+    page = browser = None
+    watchdog = chrome_process.Watchdog().start()
     try:
         os.makedirs(PROFILE_DIR, exist_ok=True)
         
-        opts = create_minimal_browser()
-        page = ChromiumPage(opts)
-        page.set.window.size(800, 600)
-        page.set.load_mode.eager()
-        page.set.timeouts(base=30, page_load=30, script=10)  # Set timeouts
+        with timer.span("launch"):
+            page, browser = launch_browser()
+        if browser:
+            watchdog.arm(browser, LOCATION_DEADLINE, storage_id)
         
         # Change location (don't block CSS here)
+        ready = ReadyReport()
         log("Change loc...")
-        page.get(LOCATION_URL)
-        time.sleep(1)
+        with timer.span("change_location"):
+            page.get(LOCATION_URL)
+            wait_selector(page, 'select', report=ready)
         
         search_text = city_name.split(' - ')[-1].split()[0].lower()
-        page.run_js(f'''
-            (function() {{
-                var s = document.querySelector('select');
-                if (s) {{
-                    for (var i = 0; i < s.options.length; i++) {{
-                        if (s.options[i].text.toLowerCase().includes('{search_text}')) {{
-                            s.selectedIndex = i;
-                            s.dispatchEvent(new Event('change'));
-                            break;
+        with timer.span("submit"):
+            page.run_js(f'''
+                (function() {{
+                    var s = document.querySelector('select');
+                    if (s) {{
+                        for (var i = 0; i < s.options.length; i++) {{
+                            if (s.options[i].text.toLowerCase().includes('{search_text}')) {{
+                                s.selectedIndex = i;
+                                s.dispatchEvent(new Event('change'));
+                                break;
+                            }}
                         }}
+                        var b = document.querySelector('.btn-primary');
+                        if (b) b.click();
                     }}
-                    var b = document.querySelector('.btn-primary');
-                    if (b) b.click();
-                }}
-            }})();
-        ''')
+                }})();
+            ''')
         
-        time.sleep(2)
+            wait_navigation(page, 'change-location', report=ready)
         force_gc()
         
-        # Block ALL resources for gold page (CSS, images, fonts, analytics)
+        # Block resources for gold page: policy yang sudah dipelajari (tanpa probe)
         log("Block CSS...")
         try:
-            page.set.blocked_urls([
-                '*.css', '*.less', '*.scss', '*.sass',
-                '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
-                '*.woff', '*.woff2', '*.ttf', '*.eot', '*.otf',
-                '*google-analytics*', '*googletagmanager*', '*facebook*', '*hotjar*', '*clarity*'
-            ])
+            page.set.blocked_urls(get_policy().plan(probe=False).patterns)
         except:
             pass
         
         log("Load gold...")
-        # Force fresh load without cache
-        page.get(GOLD_URL)
+        products = load_gold_page(page, storage_id, timer, parser=parse_products_minimal)
+        captured = products is not None
         
-        try:
-            page.ele('css:.ct-body', timeout=ELEMENT_TIMEOUT)
-        except:
-            pass
-        
-        time.sleep(1)
-        
-        html = page.html
-        products = parse_products_minimal(html)
+        if not captured:
+            with timer.span("rows_wait"):
+                wait_rows_stable(page, timeout=ELEMENT_TIMEOUT, report=ready)
+            
+            # In-browser extraction (JSON kecil), page.html hanya fallback
+            with timer.span("extract"):
+                products = read_products(page, parse_products_minimal)
         
         if len(products) < 5:
-            time.sleep(2)
-            html = page.html
-            products = parse_products_minimal(html)
+            with timer.span("retry"):
+                wait_network_idle(page, report=ready)
+                wait_rows_stable(page, timeout=2, min_rows=5, report=ready)
+                products = read_products(page, parse_products_minimal)
+        remember_rows(storage_id, products)
         
-        del html
         force_gc()
         
-        available = [p for p in products if p.get('hasStock')]
+        available = [p for p in products if p.has_stock]
         elapsed = round(time.time() - start, 1)
         
-        log(f"Done: {len(products)} in {elapsed}s")
+        readiness = ready.as_dict()
+        log(f"Done: {len(products)} in {elapsed}s (wait {readiness['waitSeconds']}s)")
         
         result = {
             "blocked": False,
@@ -254,10 +297,23 @@ def scrape(location="bandung"):
             "location": location,
             "locationId": storage_id,
             "elapsedSeconds": elapsed,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "source": "browser",
+            "capture": "document" if captured else "dom",
+            "readiness": readiness
         }
+        record_spans(result, timer)
+        
+        if len(products) >= 5:
+            try:
+                from scraper_ultrafast import save_cookies
+                save_cookies(location, storage_id, page.cookies(all_domains=True),
+                             getattr(page, 'user_agent', None))
+            except Exception:
+                pass
         
-        page.quit()
+        watchdog.disarm()
+        kill_chrome(page, browser)
         del page
         force_gc()
         
@@ -265,131 +321,161 @@ def scrape(location="bandung"):
         
     except Exception as e:
         log(f"Error: {e}")
+        if watchdog.disarm():
+            e = f"Deadline {LOCATION_DEADLINE}s exceeded ({e})"
         if page:
-            try:
-                page.quit()
-            except:
-                pass
+            kill_chrome(page, browser, force=browser is not None and browser.killed is not None)
         force_gc()
-        return {
+        return record_spans({
             "blocked": False,
             "error": str(e),
             "location": location,
+            "locationId": storage_id,
             "timestamp": datetime.now().isoformat()
-        }
+        }, timer)
+    finally:
+        watchdog.stop()
+
+def recycle_reason(page, pages, browser=None):
+    """
+    Alasan restart browser sebelum lokasi berikutnya, None jika browser masih dipakai.
+    Returns dict {"reason", "pages", "rssMB", "pssMB"/"ussMB", "renderers"}
+    """
+    if pages < MIN_PAGES_PER_BROWSER:
+        return None
+    pid = browser.pid if browser else browser_pid(page)
+    stats = process_tree_stats(pid, full=True) if pid else None
+    if stats is None:
+        if pages >= FALLBACK_PAGES_PER_BROWSER:
+            return {"reason": "pages (memory tidak terukur)", "pages": pages}
+        return None
+    memory, metric = tree_memory_mb(stats)
+    info = {"pages": pages, "rssMB": round(stats["rssMB"], 1), f"{metric}MB": round(memory, 1),
+            "renderers": stats["renderers"]}
+    if memory > RECYCLE_PSS_MB:
+        return {"reason": f"{metric} {memory:.0f}MB > {RECYCLE_PSS_MB}MB", **info}
+    if stats["renderers"] > RECYCLE_MAX_RENDERERS:
+        return {"reason": f"{stats['renderers']} renderer > {RECYCLE_MAX_RENDERERS}", **info}
+    return None
 
 def scrape_multiple(locations):
-    """Scrape multiple locations"""
+    """
+    Scrape multiple locations. Browser di-restart hanya jika recycle_reason()
+    (PSS / jumlah renderer) atau setelah timeout; alasan tiap launch dicatat
+    di result["browserLaunch"] lokasi berikutnya dan di log akhir.
+    HTTP fast path tidak dipakai (cookies hanya valid untuk satu lokasi), hanya di scrape().
+    """
     start_total = time.time()
     results = []
+    launches = []
     
     log(f"Multi-scrape: {locations}")
+    # Lokasi tidak dikenal di-skip sebelum browser diluncurkan
+    targets = resolve_targets(locations)
+    if not targets:
+        return []
     
     try:
         from DrissionPage import ChromiumPage
     except ImportError:
         return [{"error": "DrissionPage not installed"}]
     
-    page = None
+    page = browser = None
+    pages = 0
+    launch_reason = {"reason": "initial"}
+    watchdog = chrome_process.Watchdog().start()
     
     try:
         os.makedirs(PROFILE_DIR, exist_ok=True)
         
-        for idx, location in enumerate(locations):
-            if idx % 2 == 0:
-                if page:
-                    log("Restart browser (memory cleanup)...")
-                    page.quit()
+        for idx, (location, storage_id, display_name) in enumerate(targets):
+            timer = SpanTimer()
+            if page is not None:
+                launch_reason = recycle_reason(page, pages, browser)
+                if launch_reason:
+                    log(f"♻️ Restart browser: {launch_reason['reason']} ({pages} lokasi)")
+                    kill_chrome(page, browser)
                     del page
+                    page = browser = None
                     force_gc()
                     time.sleep(0.5)
-                
-                opts = create_minimal_browser()
-                page = ChromiumPage(opts)
-                page.set.window.size(800, 600)
-                page.set.load_mode.eager()
-                page.set.timeouts(base=30, page_load=30, script=10)  # Set timeouts
             
-            start_loc = time.time()
+            if page is None:
+                launch_reason = dict(launch_reason or {"reason": "restart"}, index=idx)
+                launches.append(launch_reason)
+                pages = 0
+                with timer.span("launch"):
+                    page, browser = launch_browser()
             
-            location_str = str(location)
-            if location_str in LOCATION_ID_MAP:
-                storage_id = location_str
-                display_name = LOCATION_ID_MAP[location_str]
-            elif location_str.lower() in LOCATION_MAP:
-                storage_id, display_name = LOCATION_MAP[location_str.lower()]
-            else:
-                log(f"Unknown: {location}")
-                continue
+            start_loc = time.time()
             
-            log(f"{idx+1}/{len(locations)}: {display_name} [{storage_id}]")
+            log(f"{idx+1}/{len(targets)}: {display_name} [{storage_id}]")
+            pages += 1
+            if browser:
+                watchdog.arm(browser, LOCATION_DEADLINE, storage_id)
             
             try:
-                page.get(LOCATION_URL)
-                time.sleep(1)
+                ready = ReadyReport()
+                with timer.span("change_location"):
+                    page.get(LOCATION_URL)
+                    wait_selector(page, 'select', report=ready)
                 
                 search_text = display_name.split(' - ')[-1].split()[0].lower()
                 
-                page.run_js(f'''
-                    (function() {{
-                        var s = document.querySelector('select');
-                        if (s) {{
-                            for (var i = 0; i < s.options.length; i++) {{
-                                if (s.options[i].text.toLowerCase().includes('{search_text}')) {{
-                                    s.selectedIndex = i;
-                                    s.dispatchEvent(new Event('change'));
-                                    break;
+                with timer.span("submit"):
+                    page.run_js(f'''
+                        (function() {{
+                            var s = document.querySelector('select');
+                            if (s) {{
+                                for (var i = 0; i < s.options.length; i++) {{
+                                    if (s.options[i].text.toLowerCase().includes('{search_text}')) {{
+                                        s.selectedIndex = i;
+                                        s.dispatchEvent(new Event('change'));
+                                        break;
+                                    }}
                                 }}
+                                var b = document.querySelector('.btn-primary');
+                                if (b) b.click();
                             }}
-                            var b = document.querySelector('.btn-primary');
-                            if (b) b.click();
-                        }}
-                    }})();
-                ''')
+                        }})();
+                    ''')
                 
-                time.sleep(2)
+                    wait_navigation(page, 'change-location', report=ready)
                 force_gc()
                 
-                # Block ALL resources for gold page
+                # Block resources for gold page: policy yang sudah dipelajari (tanpa probe)
                 log("Block CSS...")
                 try:
-                    page.set.blocked_urls([
-                        '*.css', '*.less', '*.scss', '*.sass',
-                        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
-                        '*.woff', '*.woff2', '*.ttf', '*.eot', '*.otf',
-                        '*google-analytics*', '*googletagmanager*', '*facebook*', '*hotjar*', '*clarity*'
-                    ])
+                    page.set.blocked_urls(get_policy().plan(probe=False).patterns)
                 except:
                     pass
                 
                 log("Load gold...")
-                page.get(GOLD_URL)
-                
-                try:
-                    page.ele('css:.ct-body', timeout=ELEMENT_TIMEOUT)
-                except:
-                    pass
+                products = load_gold_page(page, storage_id, timer, parser=parse_products_minimal)
+                captured = products is not None
                 
-                time.sleep(1)
-                
-                html = page.html
-                products = parse_products_minimal(html)
-                del html
-                force_gc()
+                if not captured:
+                    with timer.span("rows_wait"):
+                        wait_rows_stable(page, timeout=ELEMENT_TIMEOUT, report=ready)
+                    
+                    with timer.span("extract"):
+                        products = read_products(page, parse_products_minimal)
                 
                 if len(products) < 5:
-                    time.sleep(2)
-                    html = page.html
-                    products = parse_products_minimal(html)
-                    del html
-                    force_gc()
+                    with timer.span("retry"):
+                        wait_network_idle(page, report=ready)
+                        wait_rows_stable(page, timeout=2, min_rows=5, report=ready)
+                        products = read_products(page, parse_products_minimal)
+                remember_rows(storage_id, products)
+                force_gc()
                 
-                available = [p for p in products if p.get('hasStock')]
+                available = [p for p in products if p.has_stock]
                 elapsed = round(time.time() - start_loc, 1)
                 
-                log(f"✓ {len(products)} in {elapsed}s")
+                readiness = ready.as_dict()
+                log(f"✓ {len(products)} in {elapsed}s (wait {readiness['waitSeconds']}s)")
                 
-                results.append({
+                results.append(record_spans({
                     "blocked": False,
                     "hasStock": len(available) > 0,
                     "availableProducts": available,
@@ -398,77 +484,91 @@ def scrape_multiple(locations):
                     "location": location,
                     "locationId": storage_id,
                     "elapsedSeconds": elapsed,
-                    "timestamp": datetime.now().isoformat()
-                })
+                    "timestamp": datetime.now().isoformat(),
+                    "source": "browser",
+                    "capture": "document" if captured else "dom",
+                    "readiness": readiness
+                }, timer))
                 
             except TimeoutError as e:
                 log(f"⚠️ Timeout! Restarting browser...")
-                # Kill stuck browser and restart
+                launch_reason = {"reason": "timeout"}
+                # Kill stuck browser (process group-nya saja) and restart
                 if page:
-                    try:
-                        page.quit()
-                    except:
-                        pass
+                    kill_chrome(page, browser, force=True)
                     del page
-                    page = None
-                kill_chrome()
+                    page = browser = None
                 force_gc()
                 time.sleep(2)
                 
-                results.append({
+                results.append(record_spans({
                     "blocked": False,
                     "error": f"Timeout: {e}",
                     "location": location,
                     "locationId": storage_id,
                     "timestamp": datetime.now().isoformat()
-                })
+                }, timer))
                 
             except Exception as e:
                 log(f"Error: {e}")
                 # Check if it's a timeout-like error
                 if "timeout" in str(e).lower() or "stuck" in str(e).lower():
                     log("Killing stuck browser...")
+                    launch_reason = {"reason": "stuck"}
                     if page:
-                        try:
-                            page.quit()
-                        except:
-                            pass
+                        kill_chrome(page, browser, force=True)
                         del page
-                        page = None
-                    kill_chrome()
+                        page = browser = None
                     force_gc()
                     time.sleep(2)
                 
-                results.append({
+                results.append(record_spans({
                     "blocked": False,
                     "error": str(e),
                     "location": location,
                     "locationId": storage_id,
                     "timestamp": datetime.now().isoformat()
-                })
+                }, timer))
+            
+            # Watchdog sudah kill browser -> hasil lokasi ini error, launch ulang
+            expired = watchdog.disarm()
+            if expired:
+                log(f"⏰ Deadline {LOCATION_DEADLINE}s lewat [{storage_id}], browser di-kill")
+                launch_reason = {"reason": "deadline"}
+                if page:
+                    kill_chrome(page, browser, force=True)
+                    del page
+                    page = browser = None
+                force_gc()
+                # Hasil yang sempat selesai tepat sebelum kill tetap dipakai
+                if results[-1].get("error"):
+                    results[-1]["error"] = f"Deadline {LOCATION_DEADLINE}s exceeded ({results[-1]['error']})"
+            
+            # Lokasi yang memicu launch browser mencatat alasannya
+            if launches and launches[-1]["index"] == idx and results:
+                results[-1]["browserLaunch"] = launches[-1]
         
         if page:
-            try:
-                page.quit()
-            except:
-                pass
+            kill_chrome(page, browser)
             del page
         force_gc()
         
         total_elapsed = round(time.time() - start_total, 1)
-        log(f"DONE: {len(results)} in {total_elapsed}s")
+        log(f"DONE: {len(results)} in {total_elapsed}s, {len(launches)} browser launch")
+        for launch in launches:
+            detail = f" setelah {launch['pages']} lokasi" if "pages" in launch else ""
+            log(f"  #{launch['index'] + 1}: {launch['reason']}{detail}")
         
         return results
         
     except Exception as e:
         log(f"Fatal: {e}")
         if page:
-            try:
-                page.quit()
-            except:
-                pass
+            kill_chrome(page, browser)
         force_gc()
         return [{"error": str(e)}]
+    finally:
+        watchdog.stop()
 
 def main():
     locations = []
@@ -481,13 +581,18 @@ def main():
             locs = arg.split("=")[1].lower()
             locations = [l.strip() for l in locs.split(",")]
     
+    # --record=archive.json / --replay=archive.json (lihat net_replay.py)
+    import scraper_ultrafast, resource_policy
+    net_replay.install(net_replay.from_argv(sys.argv), [sys.modules[__name__], scraper_ultrafast, resource_policy])
+    
     if locations:
         results = scrape_multiple(locations)
-        print(json.dumps(results, indent=2))
+        print(json.dumps(results, indent=2, default=json_default))
     else:
         loc = single_loc or "bandung"
         result = scrape(loc)
-        print(json.dumps(result, indent=2))
+        print(json.dumps(result, indent=2, default=json_default))
+    net_replay.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+snapshot.py - Change detection per lokasi
+- Hash konten product list (normalized) per locationId
+- Full update ke server hanya jika hash berubah
+- Lokasi tanpa perubahan cukup kirim heartbeat
+- Lokasi berubah: delta (row berubah saja) terhadap snapshot yang sudah di-ack server (seq)
+- Set subscriber lokasi berubah (atau jumlahnya bertambah, server lama) -> full update
+  berikutnya (heartbeat tidak menjalankan notifikasi di server, subscriber baru tidak
+  perlu tunggu FULL_SYNC_INTERVAL)
+"""
+
+import time, json, hashlib
+
+# Paksa full update berkala walau hash sama (jaga-jaga server kehilangan state)
+FULL_SYNC_INTERVAL = 15 * 60
+
+def normalize_products(products):
+    """Urutan dan field yang stabil supaya hash tidak berubah karena urutan row"""
+    return sorted(
+        (p.key, p.price or 0, p.has_stock)
+        for p in products or []
+    )
+
+def snapshot_hash(result):
+    payload = json.dumps(normalize_products(result.get("allProducts")), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class SnapshotTracker:
+    """Simpan hash terakhir yang sukses terkirim per lokasi + statistik POST"""
+
+    def __init__(self, full_sync_interval=FULL_SYNC_INTERVAL):
+        self.full_sync_interval = full_sync_interval
+        self.last = {}   # locationId -> (hash, sent_at)
+        self.acked = {}  # locationId -> (seq, {key: product json}) snapshot yang dipegang server
+        self.subscribers = {}    # locationId -> jumlah subscriber terakhir dari server
+        self.subscriber_sets = {}  # locationId -> hash set userId terakhir dari server
+        self.force_full = set()  # Lokasi dengan subscriber baru sejak full/delta terakhir
+        self.total_suppressed = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"full": 0, "delta": 0, "heartbeat": 0, "suppressed": 0}
+
+    def plan(self, location_id, digest):
+        """'full', 'delta' atau 'heartbeat' untuk snapshot ini"""
+        entry = self.last.get(location_id)
+        if entry is None:
+            return "full"
+        last_hash, sent_at = entry
+        if time.time() - sent_at > self.full_sync_interval or location_id in self.force_full:
+            return "full"
+        if last_hash == digest:
+            return "heartbeat"
+        return "delta" if location_id in self.acked else "full"
+
+    def update_subscribers(self, counts, sets=None):
+        """
+        Subscriber per lokasi dari server -> full update berikutnya (notifikasi) jika
+        hash set userId berubah (user baru, walau jumlahnya sama). Tanpa hash
+        (server lama): jika jumlahnya bertambah
+        """
+        sets = sets or {}
+        for location_id, count in (counts or {}).items():
+            location_id = str(location_id)
+            previous = self.subscribers.get(location_id)
+            previous_set = self.subscriber_sets.get(location_id)
+            current_set = sets.get(location_id)
+            self.subscribers[location_id] = count
+            self.subscriber_sets[location_id] = current_set
+            if previous is None or location_id not in self.last:
+                continue
+            if current_set and previous_set:
+                changed = current_set != previous_set
+            else:
+                changed = count > previous
+            if changed:
+                self.force_full.add(location_id)
+
+    def needs_full(self, location_id, digest):
+        return self.plan(location_id, digest) != "heartbeat"
+
+    def build_delta(self, location_id, products):
+        """
+        Delta products (list json) terhadap snapshot ack terakhir:
+        {"baseSeq", "delta": {"upsert", "remove"}}. None jika full lebih masuk akal.
+        """
+        base = self.acked.get(location_id)
+        if base is None:
+            return None
+        seq, base_products = base
+        current = {p["key"]: p for p in products}
+        if len(current) != len(products):
+            return None  # Key dobel, delta per key tidak aman
+
+        upsert = [p for key, p in current.items() if base_products.get(key) != p]
+        remove = [key for key in base_products if key not in current]
+        if len(upsert) + len(remove) >= len(current):
+            return None  # Hampir semua berubah, full sama saja
+        return {"baseSeq": seq, "delta": {"upsert": upsert, "remove": remove}}
+
+    def mark_sent(self, location_id, digest, seq=None, products=None, delta=False):
+        """Snapshot diterima server. seq + products -> base untuk delta berikutnya"""
+        sent_at = self.last[location_id][1] if delta else time.time()
+        self.last[location_id] = (digest, sent_at)
+        self.force_full.discard(location_id)
+        if seq is not None and products is not None:
+            self.acked[location_id] = (seq, {p["key"]: p for p in products})
+        else:
+            self.acked.pop(location_id, None)
+        self.stats["delta" if delta else "full"] += 1
+
+    def mark_heartbeat(self, location_id):
+        self.stats["heartbeat"] += 1
+        self.stats["suppressed"] += 1
+        self.total_suppressed += 1
+
+    def forget(self, location_id):
+        self.last.pop(location_id, None)
+        self.acked.pop(location_id, None)
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['full']} full, {s['delta']} delta, {s['heartbeat']} heartbeat "
+                f"({s['suppressed']} POST suppressed, total {self.total_suppressed})")
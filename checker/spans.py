@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+spans.py - Timing per fase scrape
+- SpanTimer: `with timer.span("gold_load"):` -> {"phase", "start", "ms"}
+- Disimpan di result["spans"] dan di-append ke SPAN_LOG (satu JSON line per scrape)
+- CLI: percentile latency per fase (dan per lokasi) dari SPAN_LOG
+
+Fase: launch, http_fetch, parse, switch_post, change_location, submit,
+gold_load, rows_wait, extract, retry, fallback, post
+
+Usage: python spans.py [--location=201] [--hours=24] [--by-location]
+"""
+
+import os, sys, json, time, threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Kosongkan (SPAN_LOG=) untuk tidak menulis file
+SPAN_LOG = os.environ.get("SPAN_LOG", os.path.join(os.path.dirname(__file__), 'scrape_spans.jsonl'))
+
+_write_lock = threading.Lock()
+_listeners = []
+
+def add_listener(fn):
+    """fn(phase) dipanggil saat fase mulai, fn(None) saat fase selesai (mis. memory sampler)"""
+    _listeners.append(fn)
+
+def remove_listener(fn):
+    if fn in _listeners:
+        _listeners.remove(fn)
+
+def _notify(phase):
+    for fn in list(_listeners):
+        try:
+            fn(phase)
+        except Exception:
+            pass
+
+class SpanTimer:
+    """Span berurutan untuk satu lokasi; start relatif ke pembuatan timer"""
+
+    def __init__(self):
+        self.origin = time.time()
+        self.spans = []
+
+    @contextmanager
+    def span(self, phase):
+        started = time.time()
+        _notify(phase)
+        try:
+            yield
+        finally:
+            self.add(phase, time.time() - started, started)
+            _notify(None)
+
+    def add(self, phase, seconds, started=None):
+        started = started if started is not None else time.time() - seconds
+        self.spans.append({
+            "phase": phase,
+            "start": round(started - self.origin, 3),
+            "ms": round(seconds * 1000, 1),
+        })
+
+    def as_list(self):
+        return list(self.spans)
+
+def emit(location, location_id, spans, **extra):
+    """Append satu JSON line ke SPAN_LOG"""
+    if not SPAN_LOG or not spans:
+        return
+    line = {
+        "ts": datetime.now().isoformat(timespec='seconds'),
+        "location": str(location),
+        "locationId": location_id,
+        **extra,
+        "spans": spans,
+    }
+    try:
+        with _write_lock, open(SPAN_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line) + "\n")
+    except OSError:
+        pass
+
+def record(result, timer):
+    """Simpan span timer ke result["spans"] dan emit (dipanggil sekali per scrape)"""
+    result["spans"] = timer.as_list()
+    emit(result.get("location"), result.get("locationId"), result["spans"],
+         source=result.get("source"), error=result.get("error"))
+    return result
+
+def record_post(results, seconds):
+    """Span `post`: waktu kirim ke server, ditambahkan ke tiap hasil sukses"""
+    for result in results:
+        if result.get("error"):
+            continue
+        span = {"phase": "post", "start": None, "ms": round(seconds * 1000, 1)}
+        result.setdefault("spans", []).append(span)
+        emit(result.get("location"), result.get("locationId"), [span])
+
+# =====================================================
+# Report
+# =====================================================
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+def load(path=SPAN_LOG, location=None, since=None):
+    """{(locationId, phase): [ms, ...]} dari SPAN_LOG"""
+    samples = {}
+    try:
+        f = open(path, encoding='utf-8')
+    except OSError:
+        return samples
+    with f:
+        for raw in f:
+            try:
+                line = json.loads(raw)
+            except ValueError:
+                continue
+            if location and str(line.get("locationId")) != location and line.get("location") != location:
+                continue
+            if since and line.get("ts", "") < since:
+                continue
+            for span in line.get("spans", []):
+                key = (str(line.get("locationId")), span["phase"])
+                samples.setdefault(key, []).append(span["ms"])
+    return samples
+
+def main():
+    location, hours, by_location = None, None, "--by-location" in sys.argv
+    for arg in sys.argv:
+        if arg.startswith("--location="):
+            location = arg.split("=")[1]
+        elif arg.startswith("--hours="):
+            hours = float(arg.split("=")[1])
+
+    since = None
+    if hours:
+        since = datetime.fromtimestamp(time.time() - hours * 3600).isoformat(timespec='seconds')
+    samples = load(location=location, since=since)
+    if not samples:
+        print(f"Tidak ada span di {SPAN_LOG}")
+        return
+
+    rows = {}
+    for (location_id, phase), values in samples.items():
+        key = (location_id, phase) if by_location else ("*", phase)
+        rows.setdefault(key, []).extend(values)
+
+    print(f"{'lokasi':<8} {'fase':<16} {'n':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (ms)")
+    for (location_id, phase), values in sorted(rows.items()):
+        print(f"{location_id:<8} {phase:<16} {len(values):>6} {percentile(values, 0.5):>9.0f} "
+              f"{percentile(values, 0.9):>9.0f} {percentile(values, 0.99):>9.0f} {max(values):>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+stock_client.py - Client untuk kirim hasil scrape ke server
+- Satu requests.Session (connection pooling) untuk semua POST
+- Satu sweep = satu POST gzip ke /api/stock/update-batch
+- Lokasi berubah -> delta (row berubah saja) terhadap seq yang sudah di-ack server
+- Fallback per-lokasi (/api/stock/update + /heartbeat) untuk server lama
+"""
+
+import gzip, json
+import requests
+
+from snapshot import snapshot_hash
+from product import products_json
+
+GZIP_MIN_BYTES = 1024
+
+def build_stock_data(result):
+    return {
+        "hasStock": result.get("hasStock", False),
+        "availableProducts": products_json(result.get("availableProducts")),
+        "allProducts": products_json(result.get("allProducts")),  # Include all products
+        "totalProducts": result.get("totalProducts", 0),
+        "timestamp": result.get("timestamp"),
+        "checkedCount": result.get("totalProducts", 0)  # For client display
+    }
+
+def full_item(location, location_id, stock_data):
+    return {
+        "locationId": location_id,
+        "locationName": str(location).capitalize(),
+        "stockData": stock_data
+    }
+
+def delta_item(location, location_id, delta, timestamp):
+    delta["delta"]["timestamp"] = timestamp
+    return {
+        "locationId": location_id,
+        "locationName": str(location).capitalize(),
+        **delta
+    }
+
+class StockClient:
+    def __init__(self, server_url, secret="", log=print):
+        self.server_url = server_url
+        self.secret = secret
+        self.log = log
+        self.session = requests.Session()
+        self.batch_supported = True
+        self.delta_supported = True
+
+    def post(self, path, payload, timeout=30):
+        if self.secret:
+            payload["secret"] = self.secret
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        return self.session.post(f"{self.server_url}{path}", data=body, headers=headers, timeout=timeout)
+
+    # =====================================================
+    # Per-lokasi (server lama)
+    # =====================================================
+    def send_full(self, location, location_id, result, tracker=None, digest=None):
+        try:
+            stock_data = build_stock_data(result)
+            resp = self.post("/api/stock/update", full_item(location, location_id, stock_data))
+
+            if resp.status_code == 200:
+                data = resp.json().get("data", {})
+                self.log(f"✅ Server: {data.get('notified', 0)} users notified")
+                if tracker is not None:
+                    tracker.mark_sent(location_id, digest, data.get("seq"), stock_data["allProducts"])
+                return True
+            self.log(f"⚠️ Server: {resp.status_code}")
+            return False
+
+        except requests.exceptions.ConnectionError:
+            self.log(f"❌ Cannot connect to {self.server_url}")
+            return False
+        except Exception as e:
+            self.log(f"❌ Server error: {e}")
+            return False
+
+    def send_heartbeat(self, location_id, timestamp=None):
+        """Heartbeat murah untuk lokasi tanpa perubahan (server tidak re-run notifikasi)"""
+        try:
+            resp = self.post("/api/stock/heartbeat", {"locationId": location_id, "timestamp": timestamp},
+                             timeout=10)
+            return resp.status_code == 200
+        except Exception:
+            return False
+
+    def send_delta(self, tracker, location, location_id, result, digest):
+        """True jika delta diterima, False -> caller kirim full"""
+        stock_data = build_stock_data(result)
+        delta = tracker.build_delta(location_id, stock_data["allProducts"])
+        if delta is None:
+            return False
+        try:
+            resp = self.post("/api/stock/update-delta",
+                             delta_item(location, location_id, delta, stock_data["timestamp"]))
+        except Exception:
+            return False
+
+        if resp.status_code in (404, 405):
+            self.log("⚠️ Server tanpa /update-delta, pakai full update")
+            self.delta_supported = False
+            return False
+        if resp.status_code != 200:
+            # 409 = seq server beda (restart / update lain) -> resync full
+            tracker.forget(location_id)
+            return False
+
+        data = resp.json().get("data", {})
+        tracker.mark_sent(location_id, digest, data.get("seq"), stock_data["allProducts"], delta=True)
+        return True
+
+    def send_update(self, tracker, location, location_id, result):
+        """Snapshot sama -> heartbeat, berubah -> delta, selain itu full update"""
+        digest = snapshot_hash(result)
+        plan = tracker.plan(location_id, digest)
+
+        if plan == "heartbeat":
+            if self.send_heartbeat(location_id, result.get("timestamp")):
+                tracker.mark_heartbeat(location_id)
+                return True
+            # Server belum punya cache / endpoint lama -> kirim full
+            tracker.forget(location_id)
+
+        if plan == "delta" and self.delta_supported:
+            if self.send_delta(tracker, location, location_id, result, digest):
+                return True
+
+        return self.send_full(location, location_id, result, tracker, digest)
+
+    # =====================================================
+    # Batch (satu POST per sweep)
+    # =====================================================
+    def send_batch(self, updates):
+        """POST updates ke /update-batch. None jika endpoint tidak ada / gagal"""
+        try:
+            resp = self.post("/api/stock/update-batch", {"updates": updates}, timeout=60)
+        except requests.exceptions.ConnectionError:
+            self.log(f"❌ Cannot connect to {self.server_url}")
+            return None
+        except Exception as e:
+            self.log(f"❌ Server error: {e}")
+            return None
+
+        if resp.status_code in (404, 405):
+            self.log("⚠️ Server tanpa /update-batch, fallback per-lokasi")
+            self.batch_supported = False
+            return None
+        if resp.status_code != 200:
+            self.log(f"⚠️ Server batch: {resp.status_code}")
+            return None
+        return resp.json().get("data", {}).get("results", [])
+
+    def send_sweep(self, results, tracker):
+        """
+        Kirim semua hasil sukses satu sweep. Lokasi berubah -> delta item
+        (atau full jika belum ada base seq), tidak berubah -> heartbeat item,
+        semua dalam satu request.
+        """
+        entries = []
+        for result in results:
+            if result.get("error"):
+                continue
+            location = result.get("location", "unknown")
+            location_id = result.get("locationId", "")
+            entries.append((location, location_id, result, snapshot_hash(result)))
+        if not entries:
+            return
+
+        if not self.batch_supported:
+            for location, location_id, result, _ in entries:
+                self.send_update(tracker, location, location_id, result)
+            return
+
+        updates, by_id = [], {}
+        for location, location_id, result, digest in entries:
+            stock_data = build_stock_data(result)
+            by_id[location_id] = (location, stock_data, digest)
+            plan = tracker.plan(location_id, digest)
+            if plan == "heartbeat":
+                updates.append({"locationId": location_id, "heartbeat": True,
+                                "timestamp": stock_data["timestamp"]})
+                continue
+            delta = tracker.build_delta(location_id, stock_data["allProducts"]) if plan == "delta" else None
+            if delta is not None:
+                updates.append(delta_item(location, location_id, delta, stock_data["timestamp"]))
+            else:
+                updates.append(full_item(location, location_id, stock_data))
+
+        statuses = self.send_batch(updates)
+        if statuses is None:
+            if not self.batch_supported:
+                self.send_sweep(results, tracker)
+            return
+
+        # Heartbeat 404 (server belum punya snapshot) / delta 409 (seq beda) -> kirim ulang full
+        resend = []
+        notified = 0
+        for item in statuses:
+            location_id = item.get("locationId")
+            if location_id not in by_id:
+                continue
+            location, stock_data, digest = by_id[location_id]
+            if item.get("status") == 200:
+                if item.get("heartbeat"):
+                    tracker.mark_heartbeat(location_id)
+                else:
+                    tracker.mark_sent(location_id, digest, item.get("seq"), stock_data["allProducts"],
+                                      delta=bool(item.get("delta")))
+                    notified += item.get("notified", 0) or 0
+            elif item.get("heartbeat") or item.get("delta"):
+                tracker.forget(location_id)
+                resend.append(full_item(location, location_id, stock_data))
+
+        if resend:
+            for item in self.send_batch(resend) or []:
+                if item.get("status") == 200 and item.get("locationId") in by_id:
+                    _, stock_data, digest = by_id[item["locationId"]]
+                    tracker.mark_sent(item["locationId"], digest, item.get("seq"), stock_data["allProducts"])
+                    notified += item.get("notified", 0) or 0
+
+        self.log(f"✅ Server batch: {len(updates)} updates, {notified} users notified")
@@ -0,0 +1,64 @@
+"""Fake DrissionPage tab + environment isolasi untuk test checker (tanpa Chromium)"""
+
+import os, sys, tempfile
+
+CHECKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(CHECKER_DIR, 'bench', 'fixtures')
+
+def isolate_env():
+    """File runtime (span log, history, policy, cookies) ke temp dir. Panggil sebelum import modul checker"""
+    tmp = tempfile.mkdtemp(prefix='checker_test_')
+    os.environ['SPAN_LOG'] = ''
+    os.environ['HISTORY_DB'] = os.path.join(tmp, 'stock_history.db')
+    os.environ['RESOURCE_POLICY_FILE'] = os.path.join(tmp, 'resource_policy.json')
+    os.environ['COOKIES_FILE'] = os.path.join(tmp, 'saved_cookies.json')
+    if CHECKER_DIR not in sys.path:
+        sys.path.insert(0, CHECKER_DIR)
+    return tmp
+
+def fixture_html(name='normal'):
+    with open(os.path.join(FIXTURES, f'{name}.html'), encoding='utf-8') as f:
+        return f.read()
+
+class _LoadMode:
+    def none(self): pass
+    def eager(self): pass
+
+class _Set:
+    def __init__(self, tab):
+        self.tab = tab
+        self.load_mode = _LoadMode()
+
+    def blocked_urls(self, patterns):
+        self.tab.blocked = list(patterns)
+
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+class FakeTab:
+    """Tab tanpa CDP driver: gold page langsung berisi html, run_js dicatat"""
+
+    def __init__(self, html):
+        self.gold_html = html
+        self.html = ''
+        self.url = ''
+        self.blocked = []
+        self.scripts = []
+        self.set = _Set(self)
+
+    def get(self, url):
+        self.url = url
+        self.html = self.gold_html if 'gold' in url else '<html></html>'
+
+    def run_js(self, js, *args, **kwargs):
+        self.scripts.append(js)
+        return None
+
+    def refresh(self, ignore_cache=False):
+        self.get(self.url)
+
+    def stop_loading(self):
+        pass
+
+    def cookies(self, all_domains=False):
+        return []
@@ -0,0 +1,83 @@
+"""chrome_process.reap_orphans: hanya kill leader yang terverifikasi (create_time + profile)"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from fakes import isolate_env
+
+TMP = isolate_env()
+
+import chrome_process
+
+PROFILE = os.path.join(TMP, 'browser_profile')
+
+def dead_pid():
+    proc = subprocess.Popen(['true'])
+    proc.wait()
+    return proc.pid
+
+@unittest.skipUnless(chrome_process.IS_POSIX, "process group hanya di POSIX")
+class ReapOrphansTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(chrome_process, 'PID_FILE',
+                                    tempfile.mktemp(prefix='chrome_pids_', dir=TMP))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Stand-in Chromium: group sendiri, --user-data-dir di cmdline
+        self.proc = subprocess.Popen(
+            [sys.executable, '-c', 'import time; time.sleep(30)', f'--user-data-dir={PROFILE}'],
+            start_new_session=True)
+        self.addCleanup(self.cleanup)
+
+    def cleanup(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+    def register(self, **overrides):
+        entry = {
+            "pgid": self.proc.pid,
+            "profile": PROFILE,
+            "owner": dead_pid(),
+            "ownerStarted": None,
+            "leaderStarted": chrome_process._process_started(self.proc.pid),
+        }
+        entry.update(overrides)
+        chrome_process._save_registry({str(self.proc.pid): entry})
+
+    def assert_alive_and_dropped(self):
+        self.assertEqual(chrome_process.reap_orphans(), 0)
+        self.assertIsNone(self.proc.poll())
+        self.assertEqual(chrome_process.load_registry(), {})
+
+    def test_verified_orphan_is_killed(self):
+        self.register()
+        self.assertEqual(chrome_process.reap_orphans(), 1)
+        self.assertIsNotNone(self.proc.wait(timeout=5))
+        self.assertEqual(chrome_process.load_registry(), {})
+
+    def test_reused_pid_with_other_start_time_is_not_killed(self):
+        self.register(leaderStarted=123.45)
+        self.assert_alive_and_dropped()
+
+    def test_other_profile_is_not_killed(self):
+        self.register(profile=os.path.join(TMP, 'other_profile'))
+        self.assert_alive_and_dropped()
+
+    def test_legacy_entry_without_leader_info_is_not_killed(self):
+        self.register(leaderStarted=None)
+        self.assert_alive_and_dropped()
+
+    def test_live_owner_keeps_entry(self):
+        self.register(owner=os.getpid(), ownerStarted=chrome_process._process_started(os.getpid()))
+        self.assertEqual(chrome_process.reap_orphans(), 0)
+        self.assertIsNone(self.proc.poll())
+        self.assertIn(str(self.proc.pid), chrome_process.load_registry())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""scraper_ultrafast.fetch_gold_http: satu requests.Session bersama, cookies + UA dari saved_cookies.json"""
+
+import unittest
+from unittest import mock
+
+from fakes import isolate_env, fixture_html
+
+isolate_env()
+
+import scraper_ultrafast
+
+UA = "Mozilla/5.0 (X11; Linux x86_64) Chrome/131.0.0.0"
+
+def response():
+    return mock.Mock(status_code=200, text=fixture_html(), cookies={})
+
+class SharedSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(scraper_ultrafast, '_http', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        scraper_ultrafast.save_cookies("200", "200", [{"name": "geoloc_storage_id", "value": "200"}], UA)
+
+    def test_session_reused_with_saved_cookies_and_user_agent(self):
+        session = scraper_ultrafast.http_session()
+        sent = []
+
+        def get(url, cookies=None, headers=None, timeout=None):
+            sent.append((dict(session.cookies), cookies.get("geoloc_storage_id"), headers))
+            # Cookie dari response masuk jar session (seperti requests asli)
+            session.cookies.set("stale", "1")
+            return response()
+
+        with mock.patch.object(session, 'get', side_effect=get):
+            for _ in range(2):
+                html, reason = scraper_ultrafast.fetch_gold_http("200")
+                self.assertEqual(reason, "ok")
+            self.assertIs(scraper_ultrafast.http_session(), session)
+
+        self.assertEqual(sent, [({}, "200", {"User-Agent": UA})] * 2)
+        self.assertIn("Accept-Language", session.headers)
+
+    def test_other_location_skips_request(self):
+        with mock.patch.object(scraper_ultrafast.http_session(), 'get') as get:
+            self.assertEqual(scraper_ultrafast.fetch_gold_http("201"), (None, "cookies untuk lokasi 200"))
+        get.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""LocationQueue: prioritas subscriber + reschedule scheduler berdasarkan locationId"""
+
+import time
+import unittest
+from unittest import mock
+
+from fakes import isolate_env
+
+isolate_env()
+
+import location_queue
+import scheduler
+from location_queue import LocationQueue, subscriber_factor
+
+# sync() menjadwalkan lokasi baru pada time.time()
+NOW = time.time() + 5
+
+class SubscriberPriorityTest(unittest.TestCase):
+
+    def setUp(self):
+        # Tanpa jitter: urutan murni dari interval
+        patcher = mock.patch.object(location_queue.random, 'uniform', lambda a, b: 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_more_subscribers_is_due_first(self):
+        queue = LocationQueue()
+        queue.sync(["200", "201"], {"200": 1, "201": 8})
+        self.assertEqual(sorted(queue.pop_due(now=NOW)), ["200", "201"])
+        # Dicek bersamaan dengan interval yang sama (ADAPTIVE_POLLING=0)
+        queue.complete("200", True, 100, now=NOW)
+        queue.complete("201", True, 100, now=NOW)
+
+        self.assertEqual(queue.pop_due(now=NOW + 1000, limit=1), ["201"])
+        self.assertEqual(queue.pop_due(now=NOW + 45), [])
+        self.assertLess(queue.states["201"].next_due, queue.states["200"].next_due)
+
+    def test_busy_location_due_even_when_quiet_one_is_not(self):
+        queue = LocationQueue()
+        queue.sync(["200", "201"], {"200": 1, "201": 4})
+        queue.pop_due(now=NOW)
+        queue.complete("200", True, 100, now=NOW)
+        queue.complete("201", True, 100, now=NOW)
+        self.assertEqual(queue.pop_due(now=NOW + 60), ["201"])
+
+    def test_unweighted_interval_when_caller_already_weighted(self):
+        queue = LocationQueue()
+        queue.sync(["201"], {"201": 8})
+        queue.pop_due(now=NOW)
+        queue.complete("201", True, 100, now=NOW, weighted=False)
+        self.assertEqual(queue.states["201"].next_due, NOW + 100)
+
+    def test_factor_bounds(self):
+        self.assertEqual(subscriber_factor(1), 1.0)
+        self.assertEqual(subscriber_factor(0), 1.0)
+        self.assertEqual(subscriber_factor(10 ** 6), location_queue.MIN_FACTOR)
+
+class RescheduleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = LocationQueue()
+        patchers = [mock.patch.object(scheduler, 'location_queue', self.queue),
+                    mock.patch.object(scheduler, 'ADAPTIVE_POLLING', False)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.queue.sync(["200"], {"200": 1})
+        self.queue.pop_due()
+
+    def test_success_keyed_on_location_id(self):
+        scheduler.reschedule(["200"], ["200"], [{"location": "Jakarta", "locationId": "200"}])
+        self.assertEqual(self.queue.states["200"].failures, 0)
+
+    def test_result_for_other_location_is_not_success(self):
+        # Scraper mengembalikan lokasi lain (mis. default bandung) -> "200" backoff
+        scheduler.reschedule(["200"], ["200"], [{"location": "200", "locationId": "201"}])
+        self.assertEqual(self.queue.states["200"].failures, 1)
+
+if __name__ == "__main__":
+    unittest.main()
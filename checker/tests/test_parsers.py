@@ -0,0 +1,56 @@
+"""Semua parser backend menghasilkan output identik (fixture bench + response kosong)"""
+
+import glob
+import json
+import os
+import unittest
+from unittest import mock
+
+from fakes import isolate_env, fixture_html, FIXTURES
+
+isolate_env()
+
+import parsers
+from parsers import get_parser
+from product import products_json
+
+BACKENDS = ('lxml', 'bs4', 'stream')
+BLANK = ('', '   \n\t', '<!DOCTYPE html>', '<!-- blocked -->',
+         '<?xml version="1.0" encoding="utf-8"?><html><body></body></html>')
+FIXTURE_NAMES = sorted(os.path.basename(p)[:-5] for p in glob.glob(os.path.join(FIXTURES, '*.html')))
+
+def expected(name):
+    with open(os.path.join(FIXTURES, f'{name}.expected.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+class BlankDocumentTest(unittest.TestCase):
+
+    def test_blank_documents_return_empty_list(self):
+        for backend in BACKENDS:
+            for html in BLANK:
+                with self.subTest(backend=backend, html=html):
+                    self.assertEqual(get_parser(backend)(html), [])
+
+class BackendEquivalenceTest(unittest.TestCase):
+
+    def test_fixtures_include_multiple_ct_body(self):
+        self.assertGreater(fixture_html('split_sections').count('class="ct-body"'), 1)
+
+    def test_backends_match_expected_on_every_fixture(self):
+        for name in FIXTURE_NAMES:
+            html = fixture_html(name)
+            for backend in BACKENDS:
+                with self.subTest(fixture=name, backend=backend):
+                    self.assertEqual(products_json(get_parser(backend)(html)), expected(name))
+
+    def test_stream_independent_of_chunk_boundaries(self):
+        # Chunk kecil memotong tag dan text node di banyak tempat
+        for size in (1, 7, 333):
+            with mock.patch.object(parsers, 'STREAM_CHUNK', size):
+                for name in FIXTURE_NAMES:
+                    with self.subTest(fixture=name, chunk=size):
+                        self.assertEqual(products_json(parsers.parse_stream(fixture_html(name))),
+                                         expected(name))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""scraper_ultralight.recycle_reason dan BrowserSession.health_problem: high-water mark PSS, bukan RSS tree"""
+
+import unittest
+from unittest import mock
+
+from fakes import isolate_env
+
+isolate_env()
+
+import browser_session
+import scraper_ultralight
+from browser_session import BrowserSession
+from scraper_ultralight import recycle_reason, RECYCLE_PSS_MB
+
+class Browser:
+    pid = 4242
+
+def stats(rss, pss, uss=None, renderers=1):
+    return {"rssMB": rss, "pssMB": pss, "ussMB": uss, "processes": 6, "renderers": renderers}
+
+class RecycleReasonTest(unittest.TestCase):
+
+    def reason(self, tree, pages=5):
+        with mock.patch.object(scraper_ultralight, 'process_tree_stats', return_value=tree) as measure:
+            reason = recycle_reason(None, pages, Browser())
+        measure.assert_called_with(Browser.pid, full=True)
+        return reason
+
+    def test_shared_pages_in_rss_do_not_trigger_recycle(self):
+        # RSS tree Chromium jauh di atas threshold setelah satu page, PSS tidak
+        self.assertIsNone(self.reason(stats(rss=RECYCLE_PSS_MB * 2, pss=RECYCLE_PSS_MB * 0.6)))
+
+    def test_pss_over_threshold_recycles(self):
+        reason = self.reason(stats(rss=RECYCLE_PSS_MB * 3, pss=RECYCLE_PSS_MB + 20))
+        self.assertTrue(reason["reason"].startswith("pss "))
+        self.assertIn("pssMB", reason)
+
+    def test_uss_when_pss_unavailable(self):
+        reason = self.reason(stats(rss=RECYCLE_PSS_MB * 3, pss=None, uss=RECYCLE_PSS_MB + 1))
+        self.assertTrue(reason["reason"].startswith("uss "))
+
+    def test_not_before_min_pages(self):
+        with mock.patch.object(scraper_ultralight, 'process_tree_stats', return_value=stats(9999, 9999)):
+            self.assertIsNone(recycle_reason(None, 0, Browser()))
+
+class Page:
+    process_id = 4242
+
+    def run_js(self, script, timeout=None):
+        return 1
+
+class HealthProblemTest(unittest.TestCase):
+
+    def problem(self, tree):
+        session = BrowserSession(None, max_pss_mb=500)
+        session.page = Page()
+        with mock.patch.object(browser_session, 'process_tree_stats', return_value=tree) as measure:
+            problem = session.health_problem()
+        measure.assert_called_with(Page.process_id, full=True)
+        return problem
+
+    def test_tree_rss_over_threshold_is_healthy(self):
+        self.assertIsNone(self.problem(stats(rss=1400, pss=350)))
+
+    def test_pss_over_threshold_relaunches(self):
+        self.assertEqual(self.problem(stats(rss=1400, pss=520)), "pss 520MB > 500MB")
+
+    def test_uss_when_pss_unavailable(self):
+        self.assertEqual(self.problem(stats(rss=1400, pss=None, uss=600)), "uss 600MB > 500MB")
+
+    def test_process_gone(self):
+        self.assertEqual(self.problem(None), "crash (process gone)")
+
+if __name__ == "__main__":
+    unittest.main()
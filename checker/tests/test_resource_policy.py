@@ -0,0 +1,104 @@
+"""resource_policy: belajar di jalur default GOLD_CAPTURE=network (body dokumen + probe tiap N load)"""
+
+import os
+import unittest
+from unittest import mock
+
+from fakes import isolate_env, fixture_html, FakeTab
+
+TMP = isolate_env()
+
+import scraper_ultrafast
+from resource_policy import ResourcePolicy, STYLESHEET
+
+SCRIPT = "https://www.logammulia.com/js/app.js"
+
+def network(script_bytes=120000, css_bytes=30000):
+    return {
+        "requests": 3, "bytes": script_bytes + css_bytes, "blocked": 0, "failed": 0, "ms": 100,
+        "byType": {"Script": {"requests": 1, "bytes": script_bytes, "blocked": 0, "ms": 50},
+                   "Stylesheet": {"requests": 1, "bytes": css_bytes, "blocked": 0, "ms": 20}},
+        "scripts": {SCRIPT: script_bytes},
+    }
+
+def ready(*args, **kwargs):
+    return True
+
+class PolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(TMP, f"{self.id()}.json")
+        self.policy = ResourcePolicy(self.path)
+
+    def test_observe_records_accounting_without_verdict(self):
+        self.policy.observe(network())
+        self.assertEqual(self.policy.units[SCRIPT], {"verdict": None, "ok": 0, "needed": 0, "bytes": 120000})
+        self.assertEqual(self.policy.units[STYLESHEET]["bytes"], 30000)
+        self.assertEqual(self.policy.runs, {"ok": 0, "fallback": 0, "failed": 0})
+        # Tersimpan: proses berikutnya tetap tahu unit ini
+        self.assertIn(SCRIPT, ResourcePolicy(self.path).units)
+
+    def test_probe_only_when_requested(self):
+        self.policy.observe(network())
+        self.assertIsNone(self.policy.plan(probe=False).probe)
+        self.assertEqual(self.policy.plan().probe, SCRIPT)
+
+    def test_probe_every_n_plans(self):
+        self.policy.observe(network())
+        self.assertEqual([self.policy.plan(every=3).probe for _ in range(6)],
+                         [None, None, SCRIPT, None, None, SCRIPT])
+        self.assertIsNone(self.policy.plan(every=0).probe)
+
+    def test_fallback_to_last_good_only_after_probe(self):
+        self.policy.observe(network())
+        self.policy.record(self.policy.plan(probe=False), ok=True)
+        probe = self.policy.plan()
+        self.assertEqual(probe.probe, SCRIPT)
+        self.assertEqual(self.policy.fallback(probe).denied, self.policy.last_good)
+        self.assertIsNone(self.policy.fallback(self.policy.plan(probe=False)))
+
+@mock.patch.object(scraper_ultrafast, 'fetch_gold_http', lambda storage_id: (None, "skip"))
+@mock.patch.object(scraper_ultrafast, 'save_cookies', lambda *a: None)
+@mock.patch.multiple(scraper_ultrafast, wait_selector=ready, wait_navigation=ready,
+                     wait_rows_stable=ready, wait_network_idle=ready)
+class CapturedLoadTest(unittest.TestCase):
+    """Load gold page dari body dokumen: tanpa probe, accounting tetap dicatat; load probe lewat live DOM"""
+
+    def scrape(self, gold_capture, captured, probe_every=10):
+        policy = ResourcePolicy(os.path.join(TMP, f"{self.id()}.json"))
+        policy.observe(network())
+
+        def load_gold_page(tab, storage_id, timer, body=True):
+            tab.get(scraper_ultrafast.GOLD_URL)
+            return scraper_ultrafast.parse_products(tab.html) if captured and body else None
+
+        stats = mock.Mock(**{"return_value.start.return_value.stop.return_value": network(script_bytes=90000)})
+        with mock.patch.object(scraper_ultrafast, 'GOLD_CAPTURE', gold_capture), \
+                mock.patch.object(scraper_ultrafast, 'PROBE_EVERY', probe_every), \
+                mock.patch.object(scraper_ultrafast, 'get_policy', return_value=policy), \
+                mock.patch.object(scraper_ultrafast, 'NetworkStats', stats), \
+                mock.patch.object(scraper_ultrafast, 'load_gold_page', load_gold_page):
+            result = scraper_ultrafast.scrape("201", page=FakeTab(fixture_html()), state={})
+        self.assertIsNone(result.get("error"))
+        return policy, result
+
+    def test_default_capture_learns_accounting_without_probe(self):
+        policy, result = self.scrape("network", captured=True)
+        self.assertEqual(result["capture"], "document")
+        self.assertIsNone(result["network"]["policy"]["probe"])
+        self.assertEqual(policy.units[SCRIPT]["bytes"], 90000)
+        self.assertIsNone(policy.units[SCRIPT]["verdict"])
+
+    def test_default_capture_probes_every_n_loads_via_live_dom(self):
+        policy, result = self.scrape("network", captured=True, probe_every=1)
+        self.assertEqual(result["capture"], "dom")
+        self.assertEqual(result["network"]["policy"]["probe"], SCRIPT)
+        self.assertEqual(policy.units[SCRIPT]["verdict"], "deny")
+
+    def test_dom_capture_probes_and_records_verdict(self):
+        policy, result = self.scrape("dom", captured=False)
+        self.assertEqual(result["network"]["policy"]["probe"], SCRIPT)
+        self.assertEqual(policy.units[SCRIPT]["verdict"], "deny")
+
+if __name__ == "__main__":
+    unittest.main()
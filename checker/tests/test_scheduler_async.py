@@ -0,0 +1,97 @@
+"""scheduler_async: error satu batch penuh (tanpa location) di-log dan di-reschedule dengan backoff,
+hasil run masuk history store"""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from fakes import isolate_env
+
+TMP = isolate_env()
+
+import scheduler
+import scheduler_async
+import scraper_ultrafast
+from location_queue import LocationQueue
+from history_store import HistoryStore
+from polling_policy import RestockHistory
+
+LOCATIONS = ["200", "201"]
+
+class BatchErrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = LocationQueue()
+        self.posted = []
+        self.history = HistoryStore(os.path.join(TMP, f"{self.id()}.db"))
+        self.addCleanup(self.history.close)
+        patchers = [
+            mock.patch.object(scheduler, 'history_store', self.history),
+            mock.patch.object(scheduler, 'restock_history', RestockHistory(os.path.join(TMP, f"{self.id()}.json"))),
+            mock.patch.object(scheduler, 'location_queue', self.queue),
+            mock.patch.object(scheduler_async, 'location_queue', self.queue),
+            mock.patch.object(scheduler, 'ADAPTIVE_POLLING', False),
+            mock.patch.object(scheduler_async, 'get_locations_from_server', lambda: list(LOCATIONS)),
+            mock.patch.object(scheduler_async, 'get_warm_page', lambda session: None),
+            mock.patch.object(scheduler_async, 'record_post', lambda *a: None),
+            mock.patch.object(scheduler_async.client, 'send_update',
+                              lambda snapshots, location, location_id, result: self.posted.append(location_id)),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_once(self, scrape_multiple):
+        with mock.patch.object(scraper_ultrafast, 'scrape_multiple', scrape_multiple), \
+                mock.patch.object(scheduler_async, 'log') as log:
+            asyncio.run(scheduler_async.run_once(None, scheduler_async.StageTimer()))
+        return " ".join(str(call.args[0]) for call in log.call_args_list)
+
+    def test_whole_batch_error_is_logged_and_backed_off(self):
+        def scrape_multiple(locations, **kwargs):
+            return [{"error": "DrissionPage not installed", "blocked": True}]
+
+        logged = self.run_once(scrape_multiple)
+        self.assertIn("DrissionPage not installed", logged)
+        self.assertEqual(self.posted, [])
+        for location in LOCATIONS:
+            self.assertEqual(self.queue.states[location].failures, 1)
+            self.assertFalse(self.queue.states[location].in_flight)
+
+    def test_exception_backs_off_all_due_locations(self):
+        def scrape_multiple(locations, **kwargs):
+            raise RuntimeError("browser crashed")
+
+        self.assertIn("browser crashed", self.run_once(scrape_multiple))
+        self.assertEqual([self.queue.states[l].failures for l in LOCATIONS], [1, 1])
+
+    def test_streamed_results_rescheduled_by_location_id(self):
+        def scrape_multiple(locations, on_result=None, **kwargs):
+            results = [{"location": "200", "locationId": "200", "totalProducts": 5, "availableProducts": []},
+                       {"location": "201", "locationId": "201", "error": "timeout"}]
+            for result in results:
+                on_result(result)
+            return results
+
+        self.run_once(scrape_multiple)
+        self.assertEqual(self.posted, ["200"])
+        self.assertEqual(self.queue.states["200"].failures, 0)
+        self.assertEqual(self.queue.states["201"].failures, 1)
+
+    def test_results_reach_history_store(self):
+        def scrape_multiple(locations, on_result=None, **kwargs):
+            results = [{"location": "200", "locationId": "200", "source": "http",
+                        "totalProducts": 0, "availableProducts": []},
+                       {"location": "201", "locationId": "201", "error": "timeout"}]
+            for result in results:
+                on_result(result)
+            return results
+
+        self.run_once(scrape_multiple)
+        self.assertEqual([row[1] for row in self.history.scrapes("200")], ["http"])
+        self.assertEqual([row[5] for row in self.history.scrapes("201")], ["timeout"])
+        self.assertEqual(scheduler.restock_history.last_state, {"200": False})
+
+if __name__ == "__main__":
+    unittest.main()
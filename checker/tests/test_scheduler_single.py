@@ -0,0 +1,84 @@
+"""Scheduler dengan tepat satu lokasi due (jalur run_scraper -> scrape)"""
+
+import unittest
+from unittest import mock
+
+from fakes import isolate_env, fixture_html, FakeTab
+
+isolate_env()
+
+import scheduler
+import scraper_ultrafast
+from location_queue import LocationQueue
+
+def ready(*args, **kwargs):
+    return True
+
+@mock.patch.object(scraper_ultrafast, 'fetch_gold_http', lambda storage_id: (None, "skip"))
+@mock.patch.object(scraper_ultrafast, 'save_cookies', lambda *a: None)
+@mock.patch.multiple(scraper_ultrafast, wait_selector=ready, wait_navigation=ready,
+                     wait_rows_stable=ready, wait_network_idle=ready)
+class SingleDueLocationTest(unittest.TestCase):
+
+    def test_single_non_bandung_id_is_scraped_as_itself(self):
+        queue = LocationQueue()
+        queue.sync(["200"], {"200": 1})
+        due = queue.pop_due()
+        self.assertEqual(due, ["200"])
+
+        tab = FakeTab(fixture_html())
+        result = scheduler.run_scraper(due[0], page=tab, state={})
+
+        self.assertIsNone(result.get("error"))
+        self.assertEqual(result["location"], "200")
+        self.assertEqual(result["locationId"], "200")
+        self.assertGreaterEqual(result["totalProducts"], scraper_ultrafast.MIN_PRODUCTS)
+        # Option dipilih berdasarkan value storage_id, bukan default bandung (201)
+        submit = [js for js in tab.scripts if 'selectAndSubmit' in js]
+        self.assertTrue(submit and "== '200'" in submit[0])
+        self.assertNotIn("'201'", submit[0])
+
+    def test_unknown_location_is_an_error_not_bandung(self):
+        result = scheduler.run_scraper("999", page=FakeTab(fixture_html()), state={})
+        self.assertIn("Unknown location", result["error"])
+        self.assertEqual(result["location"], "999")
+
+class Session:
+    """BrowserSession palsu: ensure() dicatat, selalu return tab yang sama"""
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.state = {}
+        self.ensured = 0
+
+    def ensure(self):
+        self.ensured += 1
+        return self.tab
+
+@mock.patch.object(scraper_ultrafast, 'save_cookies', lambda *a: None)
+@mock.patch.multiple(scraper_ultrafast, wait_selector=ready, wait_navigation=ready,
+                     wait_rows_stable=ready, wait_network_idle=ready)
+class WarmPageAfterHttpTest(unittest.TestCase):
+    """Warm browser baru di-health-check / launch setelah HTTP fast path gagal"""
+
+    def run_single(self, fetched):
+        session = Session(FakeTab(fixture_html()))
+        with mock.patch.object(scraper_ultrafast, 'fetch_gold_http', lambda storage_id: fetched):
+            result = scheduler.run_scraper("200", get_page=scheduler.warm_page_getter(session))
+        self.assertIsNone(result.get("error"))
+        return session, result
+
+    def test_http_fast_path_does_not_touch_browser(self):
+        session, result = self.run_single((fixture_html(), "ok"))
+        self.assertEqual(result["source"], "http")
+        self.assertEqual(session.ensured, 0)
+
+    def test_browser_fallback_uses_warm_page_and_state(self):
+        session, result = self.run_single((None, "blocked (challenge page)"))
+        self.assertEqual(result["source"], "browser")
+        self.assertEqual(session.ensured, 1)
+        self.assertTrue(session.tab.scripts)
+        self.assertIn("form", session.state)
+
+if __name__ == "__main__":
+    unittest.main()
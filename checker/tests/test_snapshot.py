@@ -0,0 +1,62 @@
+"""SnapshotTracker: subscriber baru / set subscriber berubah memaksa full update (heartbeat tidak notifikasi)"""
+
+import unittest
+
+from fakes import isolate_env
+
+isolate_env()
+
+from snapshot import SnapshotTracker
+
+class SubscriberGrowthTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = SnapshotTracker()
+        self.tracker.update_subscribers({"200": 1})
+        self.tracker.mark_sent("200", "abc")
+
+    def test_unchanged_snapshot_is_heartbeat(self):
+        self.tracker.update_subscribers({"200": 1})
+        self.assertEqual(self.tracker.plan("200", "abc"), "heartbeat")
+
+    def test_new_subscriber_forces_full_once(self):
+        self.tracker.update_subscribers({"200": 2})
+        self.assertEqual(self.tracker.plan("200", "abc"), "full")
+        self.tracker.mark_sent("200", "abc")
+        self.assertEqual(self.tracker.plan("200", "abc"), "heartbeat")
+
+    def test_fewer_subscribers_stay_heartbeat(self):
+        self.tracker.update_subscribers({"200": 0})
+        self.assertEqual(self.tracker.plan("200", "abc"), "heartbeat")
+
+    def test_first_count_for_location_is_not_growth(self):
+        self.tracker.mark_sent("201", "def")
+        self.tracker.update_subscribers({"201": 5})
+        self.assertEqual(self.tracker.plan("201", "def"), "heartbeat")
+
+class SubscriberSetTest(unittest.TestCase):
+    """Server mengirim subscriberSets: yang dibandingkan set userId, bukan jumlah"""
+
+    def setUp(self):
+        self.tracker = SnapshotTracker()
+        self.tracker.update_subscribers({"200": 1}, {"200": "user-a"})
+        self.tracker.mark_sent("200", "abc")
+
+    def test_replaced_subscriber_forces_full(self):
+        self.tracker.update_subscribers({"200": 1}, {"200": "user-b"})
+        self.assertEqual(self.tracker.plan("200", "abc"), "full")
+        self.tracker.mark_sent("200", "abc")
+        self.assertEqual(self.tracker.plan("200", "abc"), "heartbeat")
+
+    def test_same_set_stays_heartbeat(self):
+        self.tracker.update_subscribers({"200": 1}, {"200": "user-a"})
+        self.assertEqual(self.tracker.plan("200", "abc"), "heartbeat")
+
+    def test_missing_set_falls_back_to_count_growth(self):
+        self.tracker.update_subscribers({"200": 1})
+        self.assertEqual(self.tracker.plan("200", "abc"), "heartbeat")
+        self.tracker.update_subscribers({"200": 2})
+        self.assertEqual(self.tracker.plan("200", "abc"), "full")
+
+if __name__ == "__main__":
+    unittest.main()
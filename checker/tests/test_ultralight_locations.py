@@ -0,0 +1,37 @@
+"""scraper_ultralight: lokasi tidak dikenal jadi error / di-skip, bukan bandung, tanpa launch browser"""
+
+import unittest
+from unittest import mock
+
+from fakes import isolate_env
+
+isolate_env()
+
+import scraper_ultrafast
+import scraper_ultralight
+
+class UnknownLocationTest(unittest.TestCase):
+
+    def test_scrape_unknown_is_an_error_not_bandung(self):
+        with mock.patch.object(scraper_ultrafast, 'scrape_http') as scrape_http, \
+                mock.patch.object(scraper_ultralight, 'launch_browser') as launch:
+            result = scraper_ultralight.scrape("999")
+        self.assertIn("Unknown location", result["error"])
+        self.assertEqual(result["location"], "999")
+        self.assertIsNone(result["locationId"])
+        scrape_http.assert_not_called()
+        launch.assert_not_called()
+
+    def test_scrape_city_name_resolves_storage_id(self):
+        http_result = {"location": "surabaya", "locationId": "202"}
+        with mock.patch.object(scraper_ultrafast, 'scrape_http', return_value=http_result) as scrape_http:
+            self.assertIs(scraper_ultralight.scrape("surabaya"), http_result)
+        self.assertEqual(scrape_http.call_args.args, ("surabaya", "202"))
+
+    def test_scrape_multiple_without_known_locations_does_not_launch(self):
+        with mock.patch.object(scraper_ultralight, 'launch_browser') as launch:
+            self.assertEqual(scraper_ultralight.scrape_multiple(["999", "atlantis"]), [])
+        launch.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,11 @@
+// Checker sends price as integer rupiah (older cached data: raw string)
+function formatPrice(price) {
+  if (typeof price === 'number') {
+    return `Rp ${price.toLocaleString('id-ID')}`;
+  }
+  return price;
+}
+
 export default function StockCard({ product }) {
   return (
     <div className="card bg-base-100 shadow-xl hover:shadow-2xl transition-shadow">
@@ -10,7 +18,7 @@ export default function StockCard({ product }) {
         {/* Price */}
         {product.price && (
           <p className="text-primary font-bold text-xl">
-            {product.price}
+            {formatPrice(product.price)}
           </p>
         )}
         
@@ -98,7 +98,7 @@ export default function Dashboard() {
         stock.stock.hasStock && stock.stock.products?.length > 0 ? (
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-4">
             {stock.stock.products.map((product, index) => (
-              <StockCard key={index} product={product} />
+              <StockCard key={product.key || index} product={product} />
             ))}
           </div>
         ) : (
@@ -10,7 +10,7 @@ const app = express();
 
 // Middlewares
 app.use(express.urlencoded({ extended: false }));
-app.use(express.json());
+app.use(express.json({ limit: '1mb' })); // batch stock updates from checker (gzip inflated)
 app.use(cors());
 
 // Routes
@@ -1,5 +1,6 @@
 const { User, UserSettings } = require('../models');
 const axios = require('axios');
+const StockController = require('./stockController');
 
 const TELEGRAM_BOT_TOKEN = process.env.TELEGRAM_BOT_TOKEN;
 
@@ -83,6 +84,9 @@ class SettingsController {
         });
       }
 
+      // Location list checker bisa berubah (locationIds / isActive)
+      StockController.clearCheckerLocationsCache();
+
       // If telegramUsername provided, try to resolve Chat ID
       if (telegramUsername !== undefined) {
         const username = telegramUsername.replace('@', '').toLowerCase();
@@ -1,5 +1,10 @@
 const { UserSettings, StockCache, Boutique } = require('../models');
 const NotificationService = require('../services/notificationService');
+const crypto = require('crypto');
+
+// In-memory cache untuk /checker/locations (di-clear saat settings berubah)
+let checkerLocationsCache = null;
+const CHECKER_LOCATIONS_TTL = 60 * 1000; // 1 minute
 
 class StockController {
   static async getStock(req, res, next) {
@@ -42,14 +47,9 @@ class StockController {
       let filteredProducts = stockCache.lastData?.availableProducts || [];
 
       if (targetWeights.length > 0) {
-        filteredProducts = filteredProducts.filter(product => {
-          const productTitle = product.title?.toLowerCase() || '';
-          return targetWeights.some(weight => {
-            const weightLower = weight.toLowerCase();
-            return productTitle.includes(weightLower) || 
-                   productTitle.includes(weightLower.replace(' ', ''));
-          });
-        });
+        filteredProducts = filteredProducts.filter(product =>
+          NotificationService.matchesWeight(product, targetWeights)
+        );
       }
 
       res.json({
@@ -92,6 +92,96 @@ class StockController {
     }
   }
 
+  /**
+   * Save snapshot + match users and send notifications for one location
+   * Every saved snapshot gets the next `seq` (base for checker deltas)
+   */
+  static async processStockUpdate(locationId, locationName, stockData) {
+    // 1. Upsert to stock_caches
+    const previous = await StockCache.findOne({
+      where: { locationId },
+      attributes: ['lastData']
+    });
+    const seq = (previous?.lastData?.seq || 0) + 1;
+
+    await StockCache.upsert({
+      locationId,
+      locationName: locationName || locationId,
+      lastData: { ...stockData, seq }
+    });
+
+    console.log(`[Stock] 💾 Saved stock data for ${locationName || locationId} (seq ${seq})`);
+
+    // 2. Match users and send notifications
+    const result = await NotificationService.handleStockUpdate(
+      locationId,
+      locationName || locationId,
+      stockData
+    );
+    return { ...result, seq };
+  }
+
+  /**
+   * Apply a delta (changed rows only) on top of the snapshot with seq === baseSeq
+   * delta: { upsert: [product], remove: [key], timestamp }
+   * Returns { mismatch: true, seq } when the checker's base is not our snapshot
+   */
+  static async applyStockDelta(locationId, locationName, baseSeq, delta) {
+    const stockCache = await StockCache.findOne({ where: { locationId } });
+    const current = stockCache?.lastData;
+
+    if (!current || current.seq !== baseSeq) {
+      return { mismatch: true, seq: current?.seq ?? null };
+    }
+
+    const byKey = new Map((current.allProducts || []).map(p => [p.key, p]));
+    (delta.remove || []).forEach(key => byKey.delete(key));
+    (delta.upsert || []).forEach(p => byKey.set(p.key, p));
+
+    const allProducts = [...byKey.values()];
+    const availableProducts = allProducts.filter(p => p.hasStock);
+    const stockData = {
+      ...current,
+      hasStock: availableProducts.length > 0,
+      availableProducts,
+      allProducts,
+      totalProducts: allProducts.length,
+      checkedCount: allProducts.length,
+      timestamp: delta.timestamp || current.timestamp,
+      seq: baseSeq + 1
+    };
+
+    stockCache.lastData = stockData;
+    if (locationName) stockCache.locationName = locationName;
+    await stockCache.save();
+
+    console.log(`[Stock] 🧩 Delta for ${locationName || locationId}: ` +
+      `+${(delta.upsert || []).length} -${(delta.remove || []).length} (seq ${stockData.seq})`);
+
+    const result = await NotificationService.handleStockUpdate(
+      locationId,
+      stockCache.locationName,
+      stockData
+    );
+    return { ...result, seq: stockData.seq, hasStock: stockData.hasStock };
+  }
+
+  /**
+   * Refresh updatedAt + lastData.timestamp of an existing snapshot, false if none exists
+   * timestamp: check time from the checker (defaults to now)
+   */
+  static async touchStockCache(locationId, timestamp) {
+    const stockCache = await StockCache.findOne({ where: { locationId } });
+    if (!stockCache) return false;
+
+    if (stockCache.lastData) {
+      stockCache.lastData = { ...stockCache.lastData, timestamp: timestamp || new Date().toISOString() };
+    }
+    stockCache.changed('updatedAt', true);
+    await stockCache.save();
+    return true;
+  }
+
   /**
    * Handle stock update from Checker Bot
    * POST /api/stock/update
@@ -117,27 +207,14 @@ class StockController {
         });
       }
 
-      // 1. Upsert to stock_caches
-      await StockCache.upsert({
-        locationId,
-        locationName: locationName || locationId,
-        lastData: stockData
-      });
-
-      console.log(`[Stock] 💾 Saved stock data for ${locationName || locationId}`);
-
-      // 2. Match users and send notifications
-      const result = await NotificationService.handleStockUpdate(
-        locationId,
-        locationName || locationId,
-        stockData
-      );
+      const result = await StockController.processStockUpdate(locationId, locationName, stockData);
 
       res.json({
         success: true,
         message: 'Stock update processed',
         data: {
           locationId,
+          seq: result.seq,
           hasStock: stockData.hasStock || false,
           notified: result.notified,
           totalUsers: result.total || 0
@@ -150,6 +227,203 @@ class StockController {
     }
   }
 
+  /**
+   * Handle delta stock update from Checker (changed rows only)
+   * POST /api/stock/update-delta
+   * Body: { locationId, locationName, baseSeq, delta: { upsert, remove, timestamp }, secret }
+   * 409 + current seq when baseSeq does not match -> checker sends a full update
+   */
+  static async handleStockDelta(req, res, next) {
+    try {
+      const { locationId, locationName, baseSeq, delta, secret } = req.body;
+
+      const CHECKER_SECRET = process.env.CHECKER_SECRET;
+      if (CHECKER_SECRET && secret !== CHECKER_SECRET) {
+        return res.status(401).json({
+          success: false,
+          message: 'Unauthorized: Invalid checker secret'
+        });
+      }
+
+      if (!locationId || !delta || typeof baseSeq !== 'number') {
+        return res.status(400).json({
+          success: false,
+          message: 'Missing required fields: locationId, baseSeq, delta'
+        });
+      }
+
+      const result = await StockController.applyStockDelta(locationId, locationName, baseSeq, delta);
+
+      if (result.mismatch) {
+        return res.status(409).json({
+          success: false,
+          message: 'Sequence mismatch, send full update',
+          data: { locationId, seq: result.seq }
+        });
+      }
+
+      res.json({
+        success: true,
+        message: 'Stock delta processed',
+        data: {
+          locationId,
+          seq: result.seq,
+          hasStock: result.hasStock,
+          notified: result.notified,
+          totalUsers: result.total || 0
+        }
+      });
+
+    } catch (error) {
+      console.error('[Stock] Delta error:', error.message);
+      next(error);
+    }
+  }
+
+  /**
+   * Handle a whole sweep from Checker in one request
+   * POST /api/stock/update-batch  (body may be gzip-encoded)
+   * Body: { secret, updates: [
+   *   { locationId, locationName, stockData } |
+   *   { locationId, locationName, baseSeq, delta } |
+   *   { locationId, heartbeat: true, timestamp }
+   * ] }
+   */
+  static async handleStockBatch(req, res, next) {
+    try {
+      const { updates, secret } = req.body;
+
+      const CHECKER_SECRET = process.env.CHECKER_SECRET;
+      if (CHECKER_SECRET && secret !== CHECKER_SECRET) {
+        return res.status(401).json({
+          success: false,
+          message: 'Unauthorized: Invalid checker secret'
+        });
+      }
+
+      if (!Array.isArray(updates)) {
+        return res.status(400).json({
+          success: false,
+          message: 'Missing required field: updates (array)'
+        });
+      }
+
+      const results = [];
+      let notified = 0;
+
+      for (const update of updates) {
+        const { locationId, locationName, stockData, heartbeat, delta, baseSeq, timestamp } = update || {};
+
+        if (!locationId || (!heartbeat && !stockData && !delta)) {
+          results.push({ locationId, status: 400, message: 'Missing locationId or stockData' });
+          continue;
+        }
+
+        try {
+          if (heartbeat) {
+            const found = await StockController.touchStockCache(locationId, timestamp);
+            results.push({ locationId, heartbeat: true, status: found ? 200 : 404 });
+            continue;
+          }
+
+          if (delta) {
+            const result = await StockController.applyStockDelta(locationId, locationName, baseSeq, delta);
+            if (result.mismatch) {
+              results.push({ locationId, delta: true, status: 409, seq: result.seq });
+              continue;
+            }
+            notified += result.notified || 0;
+            results.push({
+              locationId,
+              delta: true,
+              status: 200,
+              seq: result.seq,
+              hasStock: result.hasStock,
+              notified: result.notified,
+              totalUsers: result.total || 0
+            });
+            continue;
+          }
+
+          const result = await StockController.processStockUpdate(locationId, locationName, stockData);
+          notified += result.notified || 0;
+          results.push({
+            locationId,
+            status: 200,
+            seq: result.seq,
+            hasStock: stockData.hasStock || false,
+            notified: result.notified,
+            totalUsers: result.total || 0
+          });
+        } catch (error) {
+          console.error(`[Stock] Batch item ${locationId} error:`, error.message);
+          results.push({ locationId, status: 500, message: error.message });
+        }
+      }
+
+      console.log(`[Stock] 📦 Batch: ${updates.length} updates, ${notified} notified`);
+
+      res.json({
+        success: true,
+        message: 'Stock batch processed',
+        data: { results, notified }
+      });
+
+    } catch (error) {
+      console.error('[Stock] Batch error:', error.message);
+      next(error);
+    }
+  }
+
+  /**
+   * Heartbeat from Checker - stock unchanged since last full update
+   * POST /api/stock/heartbeat
+   * Body: { locationId, timestamp, secret }
+   * Only refreshes updatedAt + lastData.timestamp (products untouched), no notification matching.
+   * New subscribers are covered by the checker, which sends a full update when the
+   * subscriber count of a location grows.
+   */
+  static async handleHeartbeat(req, res, next) {
+    try {
+      const { locationId, timestamp, secret } = req.body;
+
+      const CHECKER_SECRET = process.env.CHECKER_SECRET;
+      if (CHECKER_SECRET && secret !== CHECKER_SECRET) {
+        return res.status(401).json({
+          success: false,
+          message: 'Unauthorized: Invalid checker secret'
+        });
+      }
+
+      if (!locationId) {
+        return res.status(400).json({
+          success: false,
+          message: 'Missing required field: locationId'
+        });
+      }
+
+      const found = await StockController.touchStockCache(locationId, timestamp);
+
+      // No snapshot yet -> checker must send a full update
+      if (!found) {
+        return res.status(404).json({
+          success: false,
+          message: 'No stock snapshot for this location, send full update'
+        });
+      }
+
+      res.json({
+        success: true,
+        message: 'Heartbeat recorded',
+        data: { locationId }
+      });
+
+    } catch (error) {
+      console.error('[Stock] Heartbeat error:', error.message);
+      next(error);
+    }
+  }
+
   /**
    * Handle blocked notification from Checker
    * POST /api/stock/blocked
@@ -216,9 +490,12 @@ class StockController {
 
       // Create fake stock data
       const fakeProducts = [
-        { title: weight || '1 Gram Emas Antam', price: 'Rp 1.500.000', hasStock: true },
-        { title: '5 Gram Emas Antam', price: 'Rp 7.200.000', hasStock: true },
-        { title: '10 Gram Emas Antam', price: 'Rp 14.300.000', hasStock: true }
+        {
+          key: 'test-1', title: weight || '1 Gram Emas Antam',
+          gram: NotificationService.parseWeightGrams(weight) || 1, price: 1500000, hasStock: true
+        },
+        { key: 'test-5', title: '5 Gram Emas Antam', gram: 5, price: 7200000, hasStock: true },
+        { key: 'test-10', title: '10 Gram Emas Antam', gram: 10, price: 14300000, hasStock: true }
       ];
 
       const fakeStockData = {
@@ -256,51 +533,85 @@ class StockController {
     }
   }
   /**
-   * Get unique locations to check - untuk Python scheduler
-   * Returns locationIds directly for per-boutique checking
+   * Build checker location list: unique locationIds + active subscribers per locationId
+   * + hash of the subscriber set (userIds) per locationId
    */
-  static async getCheckerLocations(req, res, next) {
-    try {
-      // Get all active settings with locationIds
-      const activeSettings = await UserSettings.findAll({
-        where: { isActive: true },
-        attributes: ['locationIds']
+  static async buildCheckerLocations() {
+    const activeSettings = await UserSettings.findAll({
+      where: { isActive: true },
+      attributes: ['userId', 'locationIds']
+    });
+
+    // Active subscribers per location ID (checker uses the count as priority)
+    const members = {};
+    for (const setting of activeSettings) {
+      const ids = new Set(setting.locationIds || []);
+      ids.forEach(id => {
+        (members[id] = members[id] || []).push(String(setting.userId));
       });
+    }
 
-      if (activeSettings.length === 0) {
-        console.log('[Checker] No active settings found');
-        return res.json({
-          success: true,
-          locations: [],
-          count: 0
-        });
-      }
+    const locations = Object.keys(members).sort();
+    const subscribers = {};
+    // Hash set userId: berubah juga saat satu user menggantikan user lain (jumlah sama),
+    // checker lalu kirim full update supaya user baru dapat notifikasi
+    const subscriberSets = {};
+    for (const id of locations) {
+      subscribers[id] = members[id].length;
+      subscriberSets[id] = crypto.createHash('sha1')
+        .update(members[id].sort().join(','))
+        .digest('hex')
+        .slice(0, 16);
+    }
+    // Version = hash isi list, sama selama list + set subscriber tidak berubah
+    const version = crypto.createHash('sha1')
+      .update(JSON.stringify(locations.map(id => [id, subscribers[id], subscriberSets[id]])))
+      .digest('hex')
+      .slice(0, 16);
 
-      // Collect all unique location IDs from all users
-      const allLocationIds = new Set();
-      for (const setting of activeSettings) {
-        const ids = setting.locationIds || [];
-        ids.forEach(id => allLocationIds.add(id));
-      }
+    return { locations, subscribers, subscriberSets, version };
+  }
 
-      if (allLocationIds.size === 0) {
-        console.log('[Checker] No locations found in user settings');
-        return res.json({
-          success: true,
-          locations: [],
-          count: 0
-        });
+  /**
+   * Drop cached checker locations (dipanggil saat UserSettings berubah)
+   */
+  static clearCheckerLocationsCache() {
+    checkerLocationsCache = null;
+  }
+
+  /**
+   * Get unique locations to check - untuk Python scheduler
+   * Returns locationIds directly for per-boutique checking.
+   * Cached in memory; If-None-Match dengan ETag yang sama -> 304 tanpa body.
+   */
+  static async getCheckerLocations(req, res, next) {
+    try {
+      if (!checkerLocationsCache || Date.now() >= checkerLocationsCache.expiry) {
+        const data = await StockController.buildCheckerLocations();
+        checkerLocationsCache = { ...data, expiry: Date.now() + CHECKER_LOCATIONS_TTL };
+
+        if (data.locations.length === 0) {
+          console.log('[Checker] No locations found in active user settings');
+        } else {
+          console.log(`[Checker] ${data.locations.length} locationIds (version ${data.version}):`, data.locations);
+        }
       }
 
-      // Return locationIds directly (for per-boutique checking)
-      const uniqueLocationIds = [...allLocationIds];
+      const { locations, subscribers, subscriberSets, version } = checkerLocationsCache;
+      const etag = `"${version}"`;
+      res.set('ETag', etag);
 
-      console.log(`[Checker] Returning ${uniqueLocationIds.length} locationIds:`, uniqueLocationIds);
+      if (req.headers['if-none-match'] === etag) {
+        return res.status(304).end();
+      }
 
       res.json({
         success: true,
-        locations: uniqueLocationIds,
-        count: uniqueLocationIds.length
+        locations,
+        subscribers,
+        subscriberSets,
+        version,
+        count: locations.length
       });
 
     } catch (error) {
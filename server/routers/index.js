@@ -41,6 +41,9 @@ router.post('/settings/link-telegram', auth, SettingsController.linkTelegram);
 router.get('/stock', auth, StockController.getStock);
 router.get('/stock/all', StockController.getAllStock);
 router.post('/stock/update', StockController.handleStockUpdate);
+router.post('/stock/update-delta', StockController.handleStockDelta);
+router.post('/stock/update-batch', StockController.handleStockBatch);
+router.post('/stock/heartbeat', StockController.handleHeartbeat);
 router.post('/stock/blocked', StockController.handleBlocked);
 router.post('/stock/test-notify', auth, StockController.testNotify); // TEST: Simulate stock found
 
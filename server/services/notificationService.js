@@ -39,19 +39,43 @@ class NotificationService {
     }
   }
 
+  /**
+   * Parse weight label ("0.5 gr", "1 gr") to grams
+   */
+  static parseWeightGrams(label) {
+    const grams = parseFloat(String(label).replace(',', '.'));
+    return Number.isNaN(grams) ? null : grams;
+  }
+
   /**
    * Check if product matches user's target weights
+   * Products from the checker carry `gram` (number) -> numeric equality,
+   * older cached data (title only) falls back to substring match
    */
-  static matchesWeight(productTitle, targetWeights) {
+  static matchesWeight(product, targetWeights) {
     if (!targetWeights || targetWeights.length === 0) return true;
-    
-    const titleLower = productTitle.toLowerCase();
+
+    if (typeof product.gram === 'number') {
+      return targetWeights.some(weight => this.parseWeightGrams(weight) === product.gram);
+    }
+
+    const titleLower = (product.title || '').toLowerCase();
     return targetWeights.some(weight => {
       const w = weight.toLowerCase();
       return titleLower.includes(w) || titleLower.includes(w.replace(' ', ''));
     });
   }
 
+  /**
+   * Format price for display: integer rupiah -> "Rp 1.500.000"
+   */
+  static formatPrice(price) {
+    if (typeof price === 'number') {
+      return `Rp ${price.toLocaleString('id-ID')}`;
+    }
+    return price ? price.replace('Harga(Belum termasuk pajak)', '').trim() : '';
+  }
+
   /**
    * Build notification message for user
    * Shows location, available stock items with price
@@ -60,8 +84,7 @@ class NotificationService {
     const productList = products.slice(0, 5).map((p, i) => {
       // Extract and clean title
       const title = p.title.replace('Belum tersedia', '').trim();
-      // Extract price - clean up format
-      const price = p.price ? p.price.replace('Harga(Belum termasuk pajak)', '').trim() : '';
+      const price = this.formatPrice(p.price);
       return price ? `  • ${title} (${price})` : `  • ${title}`;
     }).join('\n');
 
@@ -148,7 +171,7 @@ ${productList}${moreText}
 
         // Filter products by user's target weights
         const matchingProducts = stockData.availableProducts.filter(p =>
-          this.matchesWeight(p.title, setting.targetWeights)
+          this.matchesWeight(p, setting.targetWeights)
         );
 
         if (matchingProducts.length === 0) {
@@ -159,7 +182,7 @@ ${productList}${moreText}
         // Check if already notified for these products (prevent spam)
         const lastNotified = setting.lastNotifiedStock || [];
         const newProducts = matchingProducts.filter(p =>
-          !lastNotified.some(n => n.title === p.title)
+          !lastNotified.some(n => (n.key && p.key ? n.key === p.key : n.title === p.title))
         );
 
         if (newProducts.length === 0) {